@@ -0,0 +1,160 @@
+from operator import ne
+
+from kmer import kmers
+from reverse_complement import reverse_complement
+
+# Below this length, seeds are found too often in a genome for seeding to be worth it, and the bit-parallel algorithm
+# is used instead
+MIN_SEED_LENGTH = 5
+
+# Above this number of patterns, the positions of all the seeds are indexed once, instead of being searched pattern by
+# pattern
+MIN_PATTERNS_FOR_INDEX = 64
+
+
+def approximate_matches(genome, pattern, distance, both_strands=False):
+    """
+    Find all the positions where a pattern appears in a genome with at most a certain number of mismatches.
+     - If the pattern is long enough, it is split into distance+1 seeds. A match has at most `distance` mismatches, so
+     at least one of its seeds has no mismatch (pigeonhole principle): the seeds are searched exactly (which is fast),
+     and only the places where one of them is found are checked.
+     - Otherwise, the genome is scanned with a bit-parallel algorithm, counting the mismatches of all the alignments of
+     the pattern at once.
+
+    :param genome: the genome
+    :param pattern: the pattern
+    :param distance: the maximum number of mismatches
+    :param both_strands: should the reverse complement of the pattern be searched too?
+    :return: a ascending sorted list of positions
+    """
+    return approximate_matches_many(genome, [pattern], distance, both_strands)[pattern]
+
+
+def approximate_matches_many(genome, patterns, distance, both_strands=False):
+    """
+    Same as approximate_matches, for many patterns at once
+    :param genome: the genome
+    :param patterns: the patterns
+    :param distance: the maximum number of mismatches
+    :param both_strands: should the reverse complement of the patterns be searched too?
+    :return: a dictionary with the patterns as keys and the ascending sorted lists of positions as values
+    """
+    genome = str(genome)
+    searched = {pattern: [pattern] for pattern in patterns}
+    if both_strands:
+        for pattern in searched:
+            complement = reverse_complement(pattern)
+            if complement != pattern:
+                searched[pattern].append(complement)
+    seeded = [p for p in {p for ps in searched.values() for p in ps} if _seed_length(p, distance) >= MIN_SEED_LENGTH]
+    index = _seeds_index(genome, seeded, distance) if len(seeded) >= MIN_PATTERNS_FOR_INDEX else None
+    result = {}
+    for pattern, strands in searched.items():
+        positions = set()
+        for strand in strands:
+            if _seed_length(strand, distance) >= MIN_SEED_LENGTH:
+                positions.update(_seed_and_verify(genome, strand, distance, index))
+            else:
+                positions.update(_bit_parallel_matches(genome, strand, distance))
+        result[pattern] = sorted(positions)
+    return result
+
+
+def _seed_length(pattern, distance):
+    """
+    Return the length of the shortest seed when splitting a pattern into distance+1 seeds
+    """
+    if distance < 0:
+        return 0
+    return len(pattern) // (distance + 1)
+
+
+def _seeds(pattern, distance):
+    """
+    Split a pattern into distance+1 seeds of (almost) the same size
+    :return: a list of pairs (position of the seed in the pattern, seed)
+    """
+    number = distance + 1
+    bounds = [i * len(pattern) // number for i in range(number + 1)]
+    return [(start, pattern[start:stop]) for start, stop in zip(bounds, bounds[1:])]
+
+
+def _seeds_index(genome, patterns, distance):
+    """
+    Index the positions in the genome of all the seeds of some patterns
+    :return: a dictionary with the seeds as keys, and the lists of their positions as values
+    """
+    seeds_by_length = {}
+    for pattern in patterns:
+        for start, seed in _seeds(pattern, distance):
+            seeds_by_length.setdefault(len(seed), set()).add(seed)
+    index = {}
+    for length, seeds in seeds_by_length.items():  # A single pass over the genome for each length of seeds
+        index.update({seed: [] for seed in seeds})
+        for position, kmer in enumerate(kmers(genome, length)):
+            if kmer in seeds:
+                index[kmer].append(position)
+    return index
+
+
+def _find_all(genome, seed):
+    """
+    Generator to iterate over the positions of a seed in the genome (overlapping occurrences included)
+    """
+    position = genome.find(seed)
+    while position != -1:
+        yield position
+        position = genome.find(seed, position + 1)
+
+
+def _seed_and_verify(genome, pattern, distance, index=None):
+    """
+    Find the approximate matches of a pattern by searching its seeds, and checking the candidates
+    :param index: the positions of the seeds (see _seeds_index), None to search them in the genome
+    :return: a set of positions
+    """
+    len_pattern = len(pattern)
+    max_position = len(genome) - len_pattern
+    checked = set()
+    matches = set()
+    for offset, seed in _seeds(pattern, distance):
+        seed_positions = index[seed] if index is not None else _find_all(genome, seed)
+        for seed_position in seed_positions:
+            position = seed_position - offset
+            if position < 0 or position > max_position or position in checked:
+                continue
+            checked.add(position)
+            if sum(map(ne, genome[position:position + len_pattern], pattern)) <= distance:
+                matches.add(position)
+    return matches
+
+
+def _bit_parallel_matches(genome, pattern, distance):
+    """
+    Find the approximate matches of a pattern with the shift-add algorithm: the state is a single integer made of one
+    field per position of the pattern, field j counting the mismatches of the alignment where the current nucleotide
+    of the genome faces pattern[j]. Reading a nucleotide shifts all the fields and adds the mismatches of this
+    nucleotide at once.
+    :return: a list of positions
+    """
+    len_pattern = len(pattern)
+    if distance < 0 or len_pattern > len(genome):
+        return []
+    if distance >= len_pattern:
+        return list(range(0, len(genome) - len_pattern + 1))
+    bits = len_pattern.bit_length()  # A field can count up to len_pattern mismatches
+    state_mask = (1 << (bits * len_pattern)) - 1
+    last_field = bits * (len_pattern - 1)
+    field_mask = (1 << bits) - 1
+    # mismatches[c] has a 1 in field j if pattern[j] != c
+    all_mismatches = sum(1 << (bits * j) for j in range(len_pattern))
+    mismatches = {}
+    for c in set(genome):
+        mismatches[c] = all_mismatches - sum(1 << (bits * j) for j, p in enumerate(pattern) if p == c)
+    result = []
+    state = 0
+    for i, c in enumerate(genome, 1 - len_pattern):
+        state = ((state << bits) + mismatches[c]) & state_mask
+        if i >= 0 and (state >> last_field) & field_mask <= distance:
+            result.append(i)
+    return result
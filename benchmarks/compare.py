@@ -0,0 +1,55 @@
+import argparse
+import json
+import sys
+
+
+def compare(baseline, report, threshold=0.1):
+    """
+    Compare the results of two runs of the benchmarks, size by size (on the minimum time, the least noisy measure)
+    :param baseline: the results of the reference run (as saved by benchmarks.run)
+    :param report: the results of the new run
+    :param threshold: the relative slowdown from which a benchmark is considered a regression (0.1 for 10%)
+    :return: a list of dictionaries with the name, the size, the times of both runs, their ratio (new / old) and
+    whether it is a regression, for each benchmark and size present in both runs
+    """
+    comparison = []
+    for name, sizes in report['results'].items():
+        for size, result in sizes.items():
+            reference = baseline['results'].get(name, {}).get(size)
+            if reference is None:
+                continue
+            ratio = result['min'] / reference['min']
+            comparison.append({'name': name, 'size': size, 'old': reference['min'], 'new': result['min'],
+                               'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return comparison
+
+
+def print_comparison(comparison):
+    """
+    Print a comparison of two runs (see compare) as a table
+    """
+    print("{:<35} {:>10} {:>12} {:>12} {:>8}".format('benchmark', 'size', 'old (s)', 'new (s)', 'ratio'))
+    for row in comparison:
+        print("{:<35} {:>10} {:>12.6f} {:>12.6f} {:>7.2f}x{}".format(row['name'], row['size'], row['old'], row['new'],
+                                                                      row['ratio'],
+                                                                      '  REGRESSION' if row['regression'] else ''))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Compare two runs of the benchmarks saved by benchmarks.run")
+    parser.add_argument('baseline', help="the JSON file of the reference run")
+    parser.add_argument('report', help="the JSON file of the new run")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help="relative slowdown reported as a regression (0.1 for 10%%)")
+    options = parser.parse_args(arguments)
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    with open(options.report) as file:
+        report = json.load(file)
+    comparison = compare(baseline, report, options.threshold)
+    print_comparison(comparison)
+    return 1 if any(row['regression'] for row in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
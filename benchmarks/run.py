@@ -0,0 +1,112 @@
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.compare import compare, print_comparison
+from benchmarks.suite import BENCHMARKS
+
+# A size is timed with enough calls for one repeat to last at least this number of seconds
+_MIN_REPEAT_TIME = 0.2
+
+
+def time_function(function, repeat=5, min_time=_MIN_REPEAT_TIME):
+    """
+    Time a function: the function is called in a loop long enough to be measured precisely, and the loop is repeated
+    :param function: the function to time (without arguments)
+    :param repeat: the number of times the loop is repeated
+    :param min_time: the minimum duration of a loop, in seconds
+    :return: a dictionary with the minimum, median and maximum time of a call in seconds, the number of calls per loop
+    and the number of loops
+    """
+    number = 1
+    while True:  # We double the number of calls until a loop is long enough (the first loop also warms up)
+        elapsed = _time_loop(function, number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    times = [elapsed / number] + [_time_loop(function, number) / number for _ in range(repeat - 1)]
+    return {'min': min(times), 'median': statistics.median(times), 'max': max(times), 'number': number,
+            'repeat': repeat}
+
+
+def _time_loop(function, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return time.perf_counter() - start
+
+
+def run(pattern=None, quick=False, repeat=5, min_time=_MIN_REPEAT_TIME, verbose=True):
+    """
+    Run the benchmarks
+    :param pattern: a regular expression, to only run the benchmarks whose name matches it (None for all of them)
+    :param quick: if True, only run each benchmark with its smallest size
+    :param repeat: see time_function
+    :param min_time: see time_function
+    :param verbose: print the time of each benchmark as soon as it is measured
+    :return: a dictionary with the results of each benchmark by size (see time_function)
+    """
+    results = {}
+    for name, (build, sizes) in BENCHMARKS.items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        results[name] = {}
+        for size in sizes[:1] if quick else sizes:
+            result = time_function(build(size), repeat, min_time)
+            results[name][str(size)] = result  # JSON keys are strings
+            if verbose:
+                print("{:<35} {:>10} {:>12.6f} s".format(name, size, result['min']), flush=True)
+    return results
+
+
+def environment():
+    """
+    Describe where the benchmarks are run, to know which runs can be compared
+    :return: a dictionary with the commit, the date, the Python version and the machine
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'date': datetime.now(timezone.utc).isoformat(), 'python': platform.python_version(),
+            'implementation': platform.python_implementation(), 'machine': platform.machine(),
+            'processor': platform.processor(), 'system': platform.system()}
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Run the benchmarks of the algorithms")
+    parser.add_argument('-k', '--filter', help="only run the benchmarks whose name matches this regular expression")
+    parser.add_argument('-q', '--quick', action='store_true', help="only run the smallest size of each benchmark")
+    parser.add_argument('-r', '--repeat', type=int, default=5, help="number of timed loops per size")
+    parser.add_argument('-o', '--output', help="save the results in this JSON file")
+    parser.add_argument('-c', '--compare', help="compare the results with the ones saved in this JSON file")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help="relative slowdown reported as a regression by --compare (0.1 for 10%%)")
+    parser.add_argument('-l', '--list', action='store_true', help="list the benchmarks and their sizes, and exit")
+    options = parser.parse_args(arguments)
+    if options.list:
+        for name, (_, sizes) in BENCHMARKS.items():
+            print("{:<35} {}".format(name, ', '.join(str(size) for size in sizes)))
+        return 0
+    report = {'environment': environment(), 'results': run(options.filter, options.quick, options.repeat)}
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+        comparison = compare(baseline, report, options.threshold)
+        print_comparison(comparison)
+        return 1 if any(row['regression'] for row in comparison) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
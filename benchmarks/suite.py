@@ -0,0 +1,165 @@
+# The benchmarks of the algorithms, run by benchmarks.run.
+# Each benchmark is a function taking an input size and returning the function to time (the workload is built once,
+# outside of the timing), and is run for several sizes to show how the algorithm scales.
+import os
+import random
+
+from find_clumps import find_clumps
+from frequent_words import frequency_kmer, frequent_words_mismatch
+from median_string import median_string
+from motifs import gibbs_motifs_search, greedy_motifs_search, randomized_motifs_search
+from neighbors import neighbors
+from pattern_matching import general_pattern_matching, pattern_matching
+from sketch import Sketch
+from skew import skew_values
+
+GENOME_FILENAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'genome.txt')
+
+# The random workloads are always the same, so that the runs of different commits can be compared
+SEED = 42
+
+# name -> (function building the workload of a size, sizes)
+BENCHMARKS = {}
+
+
+def benchmark(*sizes):
+    """
+    Register a benchmark
+    :param sizes: the input sizes to run the benchmark with, in ascending order
+    """
+
+    def register(function):
+        BENCHMARKS[function.__name__] = (function, sizes)
+        return function
+
+    return register
+
+
+def genome(size):
+    """
+    Read the first nucleotides of data/genome.txt
+    :param size: the number of nucleotides
+    :return: the sequence
+    """
+    with open(GENOME_FILENAME) as file:
+        sequence = file.read(size).strip()
+    if len(sequence) < size:
+        raise ValueError("{} has less than {} nucleotides".format(GENOME_FILENAME, size))
+    return sequence
+
+
+def random_sequence(size, generator):
+    """
+    Generate a random DNA sequence
+    :param size: the size of the sequence
+    :param generator: the random generator
+    :return: the sequence
+    """
+    return ''.join(generator.choice('ACGT') for _ in range(size))
+
+
+def implanted_motifs(t, n, k, mutations=2, seed=SEED):
+    """
+    Generate random sequences in which a motif is implanted once, with some mutations (the usual input of the motif
+    searches)
+    :param t: the number of sequences
+    :param n: the size of the sequences
+    :param k: the size of the motif
+    :param mutations: the number of nucleotides of the motif changed in each sequence
+    :param seed: the seed of the random generator
+    :return: the list of sequences
+    """
+    generator = random.Random(seed)
+    motif = random_sequence(k, generator)
+    sequences = []
+    for _ in range(t):
+        copy = list(motif)
+        for position in generator.sample(range(k), mutations):
+            copy[position] = generator.choice('ACGT'.replace(copy[position], ''))
+        position = generator.randint(0, n - k)
+        sequence = random_sequence(n, generator)
+        sequences.append(sequence[:position] + ''.join(copy) + sequence[position + k:])
+    return sequences
+
+
+def seeded(function, *args, **kwargs):
+    """
+    Wrap a randomized function so that each call uses the same random numbers
+    """
+
+    def run():
+        random.seed(SEED)
+        return function(*args, **kwargs)
+
+    return run
+
+
+@benchmark(10000, 100000, 1000000)
+def frequency_kmer_genome(size):
+    sequence = genome(size)
+    return lambda: frequency_kmer(sequence, 9)
+
+
+@benchmark(10000, 100000, 1000000)
+def find_clumps_genome(size):
+    sequence = genome(size)
+    return lambda: find_clumps(sequence, 500, 3, 9)
+
+
+@benchmark(10000, 100000, 1000000)
+def skew_values_genome(size):
+    sequence = genome(size)
+    return lambda: skew_values(sequence)
+
+
+@benchmark(10000, 100000, 1000000)
+def pattern_matching_genome(size):
+    sequence = genome(size)
+    return lambda: pattern_matching(sequence, 'ATGATCAAG')
+
+
+@benchmark(10000, 100000, 1000000)
+def general_pattern_matching_genome(size):
+    sequence = genome(size)
+    return lambda: general_pattern_matching(sequence, 'ATGATCAAG', 2)
+
+
+@benchmark(1, 2, 3)
+def neighbors_distance(size):
+    return lambda: neighbors('ACGTTGCATGCA', size)
+
+
+@benchmark(500, 2000, 10000)
+def frequent_words_mismatch_genome(size):
+    sequence = genome(size)
+    return lambda: frequent_words_mismatch(sequence, 9, 1, True)
+
+
+@benchmark(6, 8, 10)
+def median_string_motif(size):
+    sequences = implanted_motifs(10, 200, size, mutations=1)
+    return lambda: median_string(size, sequences)
+
+
+@benchmark(100, 200, 500)
+def greedy_motifs_search_motif(size):
+    sequences = implanted_motifs(10, size, 12)
+    return lambda: greedy_motifs_search(sequences, 12)
+
+
+@benchmark(100, 200, 500)
+def randomized_motifs_search_motif(size):
+    sequences = implanted_motifs(10, size, 12)
+    return seeded(randomized_motifs_search, sequences, 12, 20)
+
+
+@benchmark(100, 200, 500)
+def gibbs_motifs_search_motif(size):
+    sequences = implanted_motifs(10, size, 12)
+    return seeded(gibbs_motifs_search, sequences, 12, 200, 5)
+
+
+@benchmark(10000, 100000, 1000000)
+def sketch_genome(size):
+    sequence = genome(size)
+    return lambda: Sketch.from_sequence(sequence, 21, w=10)
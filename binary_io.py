@@ -0,0 +1,36 @@
+import struct
+import sys
+from array import array
+
+# The arrays of the binary files (k-mer tables, FM-indexes, sketches...) are stored in little-endian order, so that a
+# file saved on one machine can be opened on any other.
+
+
+def write_array(file, values):
+    """
+    Write an array in a file, in little-endian order
+    :param file: the file, opened in binary mode
+    :param values: the array
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)  # The array of the caller is left as it is
+        values.byteswap()
+    values.tofile(file)
+
+
+def read_array(mapped, start, typecode, size):
+    """
+    Read an array written by write_array in a memory mapped file (or any bytes-like object), without copying it if
+    possible
+    :param mapped: the memory mapped file
+    :param start: the position of the array in the file, in bytes
+    :param typecode: the type of the values of the array (see the array module)
+    :param size: the number of values
+    :return: a memoryview of the file (or an array on big-endian machines)
+    """
+    itemsize = struct.calcsize(typecode)
+    if sys.byteorder == 'big':
+        values = array(typecode, mapped[start:start + itemsize * size])
+        values.byteswap()
+        return values
+    return memoryview(mapped)[start:start + itemsize * size].cast(typecode)
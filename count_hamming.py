@@ -1,15 +1,155 @@
-from hamming_distance import hamming_distance
+import sys
+from array import array
+from itertools import compress, repeat
+from operator import add, ge, xor
+
+from hamming_distance import alternating_mask, hamming_distance, hamming_distances_hashes
+from hash_kmer import hash_kmer, only_nucleotides, reverse_complement_hash
+from kmer_counts import DENSE_MAX_K, count_kmer_hashes, hash_frequencies
+from neighbors import neighbor_hashes
 from reverse_complement import reverse_complement
+from sequence_io import hashable_sequence
 
 
 def count_hamming(genome, kmer, distance):
     """
-    Return the number of occurrences of a given sequence and its similar sequences in a genome
+    Return the number of occurrences of a given sequence and its similar sequences in a genome (see count_hamming_many)
     :param genome: the genome
     :param kmer: the sequence
     :param distance: the maximum hamming distance for 2 sequence to be similar
     :return: the number of occurrences
     """
+    return count_hamming_many(genome, [kmer], distance)[0]
+
+
+def count_hamming_many(genome, patterns, distance, both_strands=False):
+    """
+    Count the approximate occurrences of many patterns in a genome at once: for each pattern, the number of k-mers of
+    the genome within `distance` of it.
+    The k-mers of the genome are counted by hash in a single pass (see kmer_counts.count_kmer_hashes), then each pattern
+    is scored against the distinct k-mers of the genome, whichever is the cheapest of:
+     - looking up the counts of the neighbors of all the patterns, one substitution at a time (see
+     neighbors.neighbor_hashes), when the neighborhood of a pattern is smaller than the number of distinct k-mers;
+     - computing the distance between the pattern and all the distinct k-mers at once (XOR and popcount of the hashes,
+     see hamming_distance.hamming_distances_hashes) otherwise.
+
+    Efficiency: O(n + p * min(|neighborhood|, n)) with n being the size of the genome and p the number of patterns
+
+    :param genome: the genome (a string, a PackedSequence or a MappedSequence)
+    :param patterns: the patterns (strings, that can have different sizes)
+    :param distance: the maximum hamming distance for a k-mer to be an occurrence of a pattern
+    :param both_strands: if True, the approximate occurrences of the reverse complement of each pattern are counted too
+    :return: an array of counts, the i-th one being the count of the i-th pattern
+    """
+    patterns = list(patterns)
+    counts = array('Q', bytes(8 * len(patterns)))
+    hashable = hashable_sequence(genome)
+    patterns_by_size = {}
+    for index, pattern in enumerate(patterns):
+        k = len(pattern)
+        if k > len(genome):
+            continue  # No occurrence
+        if k == 0:  # The empty pattern occurs at every position, and after the last nucleotide
+            if distance >= 0:
+                counts[index] = (len(genome) + 1) * (2 if both_strands else 1)
+        elif hashable and only_nucleotides(pattern):
+            patterns_by_size.setdefault(k, []).append(index)
+        else:
+            counts[index] = _count_hamming_stupid(genome, pattern, distance)
+            if both_strands:
+                counts[index] += _count_hamming_stupid(genome, reverse_complement(pattern), distance)
+    for k, indexes in patterns_by_size.items():
+        codes = [hash_kmer(patterns[index]) for index in indexes]
+        if both_strands:
+            codes += [reverse_complement_hash(code, k) for code in codes]
+        kmer_counts = count_kmer_hashes(genome, k)
+        substitutions = list(neighbor_hashes(0, k, distance))  # The XOR masks of all the neighbors of a k-mer
+        distinct = list(hash_frequencies(kmer_counts))
+        if k <= DENSE_MAX_K and len(codes) * min(len(substitutions), len(distinct)) > 4 ** k:
+            neighborhood_counts = _neighborhood_counts(kmer_counts, k, distance)
+            totals = list(map(neighborhood_counts.__getitem__, codes))
+        elif len(substitutions) <= len(distinct):
+            totals = [0] * len(codes)
+            for substitution in substitutions:
+                totals = list(map(add, totals, map(kmer_counts.__getitem__, map(xor, codes, repeat(substitution)))))
+        else:
+            hashes = [code for code, _ in distinct]
+            frequencies = [count for _, count in distinct]
+            totals = [sum(compress(frequencies, map(ge, repeat(distance), hamming_distances_hashes(code, hashes, k))))
+                      for code in codes]
+        for position, index in enumerate(indexes):
+            counts[index] = totals[position] + (totals[position + len(indexes)] if both_strands else 0)
+    return counts
+
+
+def _neighborhood_counts(kmer_counts, k, distance):
+    """
+    Count the approximate occurrences of every possible k-mer at once, from the dense counts of the k-mers of a genome.
+    The counts are packed in a single integer, one 64-bit field per k-mer, so that a whole array of counts is moved or
+    added by a few operations on integers. Substituting the nucleotide j of every k-mer moves the field of each k-mer to
+    the field of the k-mer with another nucleotide j: flipping the bit b of the hashes swaps the blocks of 2^b fields
+    having this bit equal to 0 and 1, which is two shifts and two masks. The counts at exactly e mismatches are built
+    position by position: counts_e += substituted(counts_{e-1}) for each position j.
+
+    Efficiency: O(k * distance * 4^k) operations done in C on big integers
+
+    :param kmer_counts: the dense counts of the k-mers of the genome (see kmer_counts.count_kmer_hashes)
+    :param k: the size of the k-mers
+    :param distance: the maximum number of mismatches
+    :return: an array of 4^k counts, the count of a k-mer being at the index of its hash
+    """
+    size = 4 ** k
+    masks = [alternating_mask(_FIELD_BITS << bit, size * _FIELD_BITS) for bit in range(2 * k)]
+
+    def flip(packed, bit):
+        """
+        Move the count of each k-mer to the k-mer whose hash only differs by a bit
+        """
+        shift = _FIELD_BITS << bit
+        return ((packed & masks[bit]) << shift) | ((packed >> shift) & masks[bit])
+
+    by_mismatches = [_pack(kmer_counts)] + [0] * distance  # by_mismatches[e]: counts of the k-mers at e mismatches
+    for j in range(k):
+        for mismatches in range(min(distance, j + 1), 0, -1):  # From the highest, to use the counts before position j
+            previous = by_mismatches[mismatches - 1]
+            low = flip(previous, 2 * j)
+            high = flip(previous, 2 * j + 1)
+            by_mismatches[mismatches] += low + high + flip(low, 2 * j + 1)  # The 3 other nucleotides
+    return _unpack(sum(by_mismatches), size)
+
+
+# Number of bits of the field of a k-mer in the packed counts of _neighborhood_counts
+_FIELD_BITS = 64
+
+
+def _pack(counts):
+    """
+    Pack an array of counts in an integer, the count i being in the bits [64i; 64i + 64[
+    """
+    packed = array('Q', counts)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def _unpack(packed, size):
+    """
+    Unpack counts packed by _pack
+    :param size: the number of counts
+    :return: an array of counts
+    """
+    counts = array('Q')
+    counts.frombytes(packed.to_bytes(size * _FIELD_BITS // 8, 'little'))
+    if sys.byteorder == 'big':
+        counts.byteswap()
+    return counts
+
+
+def _count_hamming_stupid(genome, kmer, distance):
+    """
+    Same as count_hamming, by computing the distance between the sequence and every k-mer of the genome (this version
+    also works with other characters than A, C, G and T)
+    """
     k = len(kmer)
     len_genome = len(genome)
     if k > len_genome:
@@ -1,25 +1,55 @@
-from frequent_words import frequency_kmer
+from collections import Counter
+from itertools import tee
 
+from hash_kmer import rolling_kmer_hashes, unhash_kmer
+from kmer import kmers
+from kmer_counts import empty_counts
+from sequence_io import hashable_sequence, read_sequence
 
-def find_clumps(sequence, L, t, k):
+
+def find_clumps(sequence, L, t, k, positions=False):
     """
-    Find (L, t)-clumps of k-mers in a sequence
-    :param sequence: the sequence
+    Find (L, t)-clumps of k-mers in a sequence.
+    The window slides over the sequence one nucleotide at a time, and the counts of the k-mers in the window are
+    updated by adding the k-mer entering the window and removing the one leaving it, instead of being recomputed.
+
+    Efficiency: O(n) with n being the size of the sequence
+
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
     :param L: the length of a window
     :param t: the minimum number of repetitions for a k-mer to be a clump in a window
     :param k: the size of the k-mer
-    :return: a set of k-mers
+    :param positions: if True, also return where the clumps are
+    :return: a set of k-mers, or if positions is True, a dictionary with the k-mers as keys and the list of the starting
+    positions of the windows where each of them becomes a clump (i.e. reaches t repetitions) as values
     """
     len_sequence = len(sequence)
     if len_sequence < L:
         raise ValueError("the sequence has to be larger than the window")
-    clumps = set()
-    end = len_sequence - L + 1
-    for i in range(0, len_sequence - L + 1):
-        print("\r{}%".format(round(i * 100.0 / end, 3)), end='')
-        frequencies = frequency_kmer(sequence[i:i + L], k)
-        clumps.update({clump for clump, freq in frequencies.items() if freq >= t})
-    return clumps
+    if k > L:  # No k-mer fits in a window
+        return {} if positions else set()
+    hashable = hashable_sequence(sequence)
+    if hashable:  # We work on the hashes of the k-mers, and build the k-mers only for the clumps
+        counts = empty_counts(k)
+        entering, leaving = tee(rolling_kmer_hashes(sequence, k))
+    else:
+        counts = Counter()
+        entering, leaving = tee(kmers(sequence, k))
+    kmers_per_window = L - k + 1
+    clumps = {}
+    for i, entering_kmer in enumerate(entering):
+        if i >= kmers_per_window:  # The window is full, the first k-mer leaves it
+            counts[next(leaving)] -= 1
+        counts[entering_kmer] += 1
+        if counts[entering_kmer] == t:
+            window = max(0, i - kmers_per_window + 1)
+            if entering_kmer in clumps:
+                clumps[entering_kmer].append(window)
+            else:
+                clumps[entering_kmer] = [window]
+    if hashable:
+        clumps = {unhash_kmer(code, k): windows for code, windows in clumps.items()}
+    return clumps if positions else set(clumps)
 
 
 def find_clumps_2(sequence, L, t, k):
@@ -50,7 +80,7 @@ def _frequency_kmer_stupid(sequence, k):
     Returns the frequency of all k-mers found in a sequence
     :param sequence: the sequence
     :param k: the size of k-mers
-    :return: a counter with k-mer as keys and number of apparitions as value
+    :return: a dictionary with k-mer as keys and the list of their positions as value
     """
     if k == 0:
         raise ValueError("k has to be positive")
@@ -59,6 +89,15 @@ def _frequency_kmer_stupid(sequence, k):
     if len_text == 0:
         return {}
     frequency_map = {}
+    if hashable_sequence(sequence):
+        # We index the positions by the hash of the k-mers (computed in a single pass), and only build the k-mers
+        # once at the end
+        for i, code in enumerate(rolling_kmer_hashes(sequence, k)):
+            if code in frequency_map:
+                frequency_map[code].append(i)
+            else:
+                frequency_map[code] = [i]
+        return {unhash_kmer(code, k): positions for code, positions in frequency_map.items()}
     for i in range(0, max_index + 1):
         foundKmer = sequence[i:i + k]
         if foundKmer in frequency_map:
@@ -69,14 +108,12 @@ def _frequency_kmer_stupid(sequence, k):
 
 
 def __main__():
-    file = open("ecoli_genome.txt", "r")
-    sequence = file.read()
-    file.close()
+    sequence = read_sequence("ecoli_genome.txt")
     t = 3
     k = 9
     L = 500
 
-    clumps = find_clumps_2(sequence, L, t, k)
+    clumps = find_clumps(sequence, L, t, k)
     print(len(clumps))
     print(list(clumps)[:10])
 
@@ -1,31 +1,62 @@
 from collections import Counter
-from count_hamming import count_hamming
-from hash_kmer import hash_kmer
+from count_hamming import count_hamming_many
+from hash_kmer import reverse_complement_hash, unhash_kmer
 from kmer import kmer
-from neighbors import neighbors
-from reverse_complement import reverse_complement
+from kmer_counts import count_kmer_hashes, empty_counts, hash_frequencies, most_frequent_hashes
+from neighbors import neighbor_hashes, neighbors
+from sequence_io import hashable_sequence
 
 
 def frequent_words_mismatch(genome, k, distance, reverse=False):
     """
-    Return a list of the most frequent words in the genome with mismatches
+    Return a list of the most frequent words in the genome with mismatches.
+    A word is counted once for each k-mer of the genome within `distance` of it, that is once for each k-mer of the
+    genome having it in its neighborhood: the k-mers of the genome are counted, then the count of each distinct k-mer is
+    added to all its neighbors, in a single pass (instead of searching every candidate in the whole genome).
+    The candidates are the words in the neighborhood of a k-mer of the genome.
+
+    Efficiency: O(n * |neighborhood|) with n being the size of the genome
+
     :param genome:the genome
     :param k: the length of the k-mer
     :param distance: the maximum distance
     :param reverse: should we take account of the reverse complements too?
     :return:
     """
+    if not hashable_sequence(genome):
+        return _frequent_words_mismatch_stupid(genome, k, distance, reverse)
+    if k > len(genome):
+        return {}
+    counts = empty_counts(k)
+    for code, count in hash_frequencies(count_kmer_hashes(genome, k)):
+        for neighbor in neighbor_hashes(code, k, distance):
+            counts[neighbor] += count
+    candidates = hash_frequencies(counts)
+    if reverse:  # The reverse complement of a word is within `distance` of a k-mer as many times as it is counted
+        candidates = [(code, count + counts[reverse_complement_hash(code, k)]) for code, count in candidates]
+    result = {}
+    max_count = 0
+    for code, count in candidates:
+        if count > max_count:
+            max_count = count
+            result = {code: count}
+        elif count == max_count:
+            result[code] = count
+    return {unhash_kmer(code, k): count for code, count in result.items()}
+
+
+def _frequent_words_mismatch_stupid(genome, k, distance, reverse=False):
+    """
+    Same as frequent_words_mismatch, by counting the approximate occurrences of every candidate in the whole genome
+    (this version also works with other characters than A, C, G and T)
+    """
     kmers = set()
     max_index = len(genome) - k
-    result = Counter()
     for i in range(0, max_index + 1):
         kmer = genome[i:i + k]
-        kmers = kmers.union(neighbors(kmer, distance))
-    for kmer in kmers:
-        result[kmer] += count_hamming(genome, kmer, distance)
-        if reverse:
-            rev_kmer = reverse_complement(kmer)
-            result[kmer] += count_hamming(genome, rev_kmer, distance)
+        kmers.update(neighbors(kmer, distance))
+    kmers = list(kmers)
+    result = dict(zip(kmers, count_hamming_many(genome, kmers, distance, both_strands=reverse)))
     maxCount = max(result.values())
     frequent_kmers = {word: frequency for word, frequency in result.items() if frequency == maxCount}
     return frequent_kmers
@@ -39,6 +70,9 @@ def frequent_words(text, k):
     :param with_count: flag to ask the function to return the nu;ber of apparitions of the wor or not
     :return: a set of most frequent k-mers
     """
+    if hashable_sequence(text):  # We do not need to build all the k-mers, only the most frequent ones
+        max_count, codes = most_frequent_hashes(count_kmer_hashes(text, k))
+        return {unhash_kmer(code, k): max_count for code in codes}
     frequency_map = frequency_kmer(text, k)
     if len(frequency_map) == 0:
         return {}
@@ -50,7 +84,7 @@ def frequent_words(text, k):
 def frequency_kmer(sequence, k):
     """
     Returns the frequency of all k-mers found in a sequence
-    :param sequence: the sequence
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
     :param k: the size of k-mers
     :return: a counter with k-mer as keys and number of apparitions as value
     """
@@ -60,6 +94,9 @@ def frequency_kmer(sequence, k):
     max_index = len_text - k
     if len_text == 0:
         return {}
+    if hashable_sequence(sequence):  # We count the hashes, so that no k-mer is built for every window
+        counts = count_kmer_hashes(sequence, k)
+        return Counter({unhash_kmer(code, k): frequency for code, frequency in hash_frequencies(counts)})
     frequency_map = Counter()
     for i in range(0, max_index + 1):
         foundKmer = kmer(sequence, position=i, k=k)
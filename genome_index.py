@@ -0,0 +1,225 @@
+import struct
+from array import array
+
+from binary_io import read_array, write_array
+from hash_kmer import only_nucleotides
+
+# Number of nucleotides hashed to sort the suffixes before refining the order (5^12 fits in 32 bits)
+_INITIAL_PREFIX = 12
+
+# Alphabet of the indexed text: '$' marks the end of the text, and is smaller than every nucleotide
+_ALPHABET = "$ACGT"
+_CODES = bytes.maketrans(b'ACGT', b'\x01\x02\x03\x04')
+
+_MAGIC = b'FMIDX1'
+
+
+def suffix_array(text):
+    """
+    Compute the suffix array of a text terminated by '$' (the positions of all the suffixes of text + '$', sorted in
+    lexicographic order).
+    The suffixes are first sorted by their first 12 nucleotides, then the groups of suffixes that are still tied are
+    refined by prefix doubling (Larsson-Sadakane): suffixes tied on their first h nucleotides are sorted by the rank of
+    the suffix starting h nucleotides later, which orders them on their first 2h nucleotides. Only the groups that are
+    still tied are sorted again, so a genome without long repeats is sorted after a few rounds.
+
+    Efficiency: O(n log n)
+
+    :param text: the text (a string containing only A, C, G and T)
+    :return: the suffix array (an array of len(text) + 1 positions)
+    """
+    if not only_nucleotides(text):  # Only A, C, G and T have a code, other characters would be misordered
+        raise ValueError("the text can only contain A, C, G and T")
+    n = len(text) + 1
+    # Hash of the first nucleotides of each suffix, in base 5 ('$' and what follows it being 0)
+    codes = text.encode('ascii').translate(_CODES) + bytes(_INITIAL_PREFIX)
+    modulo = 5 ** _INITIAL_PREFIX
+    key = 0
+    for code in codes[:_INITIAL_PREFIX - 1]:
+        key = key * 5 + code
+    keys = []
+    for code in codes[_INITIAL_PREFIX - 1:_INITIAL_PREFIX - 1 + n]:
+        key = (key * 5 + code) % modulo
+        keys.append(key)
+    order = sorted(range(n), key=keys.__getitem__)
+    # rank[i] is the position in the suffix array of the first suffix of the group of suffix i
+    rank = [0] * n
+    groups = []  # The groups of tied suffixes, as (start, end) in the suffix array
+    start = 0
+    for i in range(1, n + 1):
+        if i == n or keys[order[i]] != keys[order[start]]:
+            for j in range(start, i):
+                rank[order[j]] = start
+            if i - start > 1:
+                groups.append((start, i))
+            start = i
+    del keys
+    h = _INITIAL_PREFIX
+    while groups:
+        next_groups = []
+        for start, end in groups:
+            members = sorted(order[start:end], key=lambda i: rank[i + h])
+            order[start:end] = members
+            sub_keys = [rank[i + h] for i in members]  # Computed before the ranks of the group are updated
+            sub_start = start
+            for j in range(start + 1, end + 1):
+                if j == end or sub_keys[j - start] != sub_keys[sub_start - start]:
+                    for m in range(sub_start, j):
+                        rank[order[m]] = sub_start
+                    if j - sub_start > 1:
+                        next_groups.append((sub_start, j))
+                    sub_start = j
+        groups = next_groups
+        h *= 2
+    return array('L', order)
+
+
+class FMIndex:
+    """
+    FM-index of a genome: its Burrows-Wheeler transform, with the counts of each nucleotide before every 64th position
+    (occurrence table) and the position in the genome of one suffix every 32 nucleotides (sampled suffix array).
+    Counting the occurrences of a pattern takes O(m) time and locating them O(m + 32 * occ) with m being the size of the
+    pattern, whatever the size of the genome.
+    """
+
+    def __init__(self, bwt, first, occurrences, samples, sample_rate, occurrence_rate):
+        """
+        Use FMIndex.build to index a genome, or FMIndex.load to load an index saved with save
+        """
+        self._bwt = bwt
+        self._first = first
+        self._occurrences = occurrences
+        self._samples = samples
+        self._sample_rate = sample_rate
+        self._occurrence_rate = occurrence_rate
+
+    @classmethod
+    def build(cls, genome, sample_rate=32, occurrence_rate=64):
+        """
+        Index a genome
+        :param genome: the genome (a string containing only A, C, G and T)
+        :param sample_rate: one suffix every sample_rate nucleotides of the genome has its position stored (the higher
+        the smaller the index, but the slower locate)
+        :param occurrence_rate: the counts of the nucleotides are stored every occurrence_rate positions (the higher the
+        smaller the index, but the slower count and locate)
+        :return: the index
+        """
+        genome = str(genome)
+        if not only_nucleotides(genome):
+            raise ValueError("the genome can only contain A, C, G and T")
+        positions = suffix_array(genome)
+        text = genome.encode('ascii') + b'$'
+        bwt = bytes(map(text.__getitem__, (position - 1 for position in positions)))  # text[-1] is '$'
+        first = {}  # first[c] is the number of characters of text smaller than c
+        total = 0
+        for c in _ALPHABET.encode('ascii'):
+            first[c] = total
+            total += text.count(c)
+        occurrences = {}
+        for c in _ALPHABET[1:].encode('ascii'):
+            counts = array('L', [0])
+            for start in range(0, len(bwt), occurrence_rate):
+                counts.append(counts[-1] + bwt.count(c, start, start + occurrence_rate))
+            occurrences[c] = counts
+        samples = {row: position for row, position in enumerate(positions) if position % sample_rate == 0}
+        return cls(bwt, first, occurrences, samples, sample_rate, occurrence_rate)
+
+    def __len__(self):
+        """
+        The length of the indexed genome
+        """
+        return len(self._bwt) - 1
+
+    def _occurrence(self, c, row):
+        """
+        Count the number of times a character appears in the BWT before a row
+        """
+        block = row // self._occurrence_rate
+        return self._occurrences[c][block] + self._bwt.count(c, block * self._occurrence_rate, row)
+
+    def _rows(self, pattern):
+        """
+        Find the rows of the sorted suffixes starting with a pattern (backward search)
+        :return: (first row, last row + 1)
+        """
+        if len(pattern) == 0:
+            raise ValueError("The pattern cannot be empty")
+        if not only_nucleotides(pattern):
+            return 0, 0
+        top, bottom = 0, len(self._bwt)
+        for c in reversed(pattern.encode('ascii')):
+            top = self._first[c] + self._occurrence(c, top)
+            bottom = self._first[c] + self._occurrence(c, bottom)
+            if top >= bottom:
+                return 0, 0
+        return top, bottom
+
+    def count(self, pattern):
+        """
+        Count the number of times a pattern appears in the genome
+        :param pattern: the pattern
+        :return: the number of occurrences (overlapping ones included)
+        """
+        top, bottom = self._rows(pattern)
+        return bottom - top
+
+    def locate(self, pattern):
+        """
+        Find where a pattern appears in the genome
+        :param pattern: the pattern
+        :return: an ascending sorted list of positions
+        """
+        top, bottom = self._rows(pattern)
+        return sorted(self._position(row) for row in range(top, bottom))
+
+    def _position(self, row):
+        """
+        Find the position in the genome of the suffix of a row, by walking back the genome (LF-mapping) until a sampled
+        suffix is found
+        """
+        steps = 0
+        while row not in self._samples:
+            c = self._bwt[row]
+            row = self._first[c] + self._occurrence(c, row)
+            steps += 1
+        return self._samples[row] + steps
+
+    def save(self, filename):
+        """
+        Save the index in a file, to be loaded with FMIndex.load
+        :param filename: the name of the file
+        """
+        rows = array('L', self._samples.keys())
+        positions = array('L', self._samples.values())
+        with open(filename, 'wb') as file:
+            file.write(_MAGIC)
+            file.write(struct.pack('<QQQQ', len(self._bwt), len(rows), self._sample_rate, self._occurrence_rate))
+            file.write(struct.pack('<5Q', *(self._first[c] for c in _ALPHABET.encode('ascii'))))
+            file.write(self._bwt)
+            for c in _ALPHABET[1:].encode('ascii'):
+                write_array(file, array('Q', self._occurrences[c]))
+            write_array(file, array('Q', rows))
+            write_array(file, array('Q', positions))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load an index saved with save
+        :param filename: the name of the file
+        :return: the index
+        """
+        with open(filename, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("{} is not an FM-index file".format(filename))
+            length, number_of_samples, sample_rate, occurrence_rate = struct.unpack('<QQQQ', file.read(32))
+            first = dict(zip(_ALPHABET.encode('ascii'), struct.unpack('<5Q', file.read(40))))
+            bwt = file.read(length)
+            data = file.read()
+        occurrences = {}
+        blocks = (length + occurrence_rate - 1) // occurrence_rate + 1
+        for i, c in enumerate(_ALPHABET[1:].encode('ascii')):
+            occurrences[c] = read_array(data, 8 * blocks * i, 'Q', blocks)
+        start = 8 * blocks * (len(_ALPHABET) - 1)
+        rows = read_array(data, start, 'Q', number_of_samples)
+        positions = read_array(data, start + 8 * number_of_samples, 'Q', number_of_samples)
+        return cls(bwt, first, occurrences, dict(zip(rows, positions)), sample_rate, occurrence_rate)
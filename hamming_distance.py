@@ -1,3 +1,7 @@
+from itertools import repeat
+from operator import and_, ne, or_, rshift, xor
+
+from hash_kmer import hash_kmer, only_nucleotides, rolling_kmer_hashes
 from kmer import kmers
 
 
@@ -28,11 +32,7 @@ def hamming_distance(seq1, haystack):
         :param s2: the second string
         :return: the hamming distance between the two strings
         """
-        distance = 0
-        for c1, c2 in zip(s1, s2):
-            if c1 != c2:  # We compare the two string char-by-char
-                distance += 1
-        return distance
+        return sum(map(ne, s1, s2))  # We compare the two string char-by-char (in C)
 
     def hamming_distance_two_strings(s1, s2):
         """
@@ -48,6 +48,9 @@ def hamming_distance(seq1, haystack):
         """
         k = len(s1)
 
+        if 0 < k <= len(s2) and only_nucleotides(s1) and only_nucleotides(s2):
+            return min(hamming_distances(s1, s2))  # Bit-parallel version
+
         min_distance = float("inf")
 
         # We compute the hamming distance between seq1 and s for s being all the possibles strings the same size as seq1
@@ -64,6 +67,82 @@ def hamming_distance(seq1, haystack):
         return hamming_distance_two_strings(seq1, haystack)
 
 
+# Number of bits set in an integer (int.bit_count only exists since Python 3.10)
+_popcount = getattr(int, 'bit_count', lambda x: bin(x).count('1'))
+
+
+def _low_bits_mask(k):
+    """
+    Return a mask with the lowest of the two bits of each of the k nucleotides of a hash set: 0b0101...01
+    """
+    return int('01' * k, 2) if k > 0 else 0
+
+
+def alternating_mask(run, size):
+    """
+    Build a mask of `size` bits alternating `run` bits set and `run` bits clear, starting with set bits: bit i is set if
+    the bit log2(run) of i is 0. Applied to a bitset (or to packed counts, with fields of several bits), it selects the
+    elements whose index has this bit equal to 0.
+    :param run: the number of consecutive bits set (a power of 2)
+    :param size: the number of bits of the mask
+    :return: the mask, as an integer
+    """
+    length = (size + 7) // 8  # In bytes
+    if run < 8:  # The pattern fits in a byte
+        pattern = bytes([{1: 0x55, 2: 0x33, 4: 0x0F}[run]])
+    else:
+        pattern = b'\xff' * (run // 8) + bytes(run // 8)
+    return int.from_bytes((pattern * (length // len(pattern) + 1))[:length], 'little')
+
+
+def hamming_distance_hashes(hash1, hash2, k):
+    """
+    Compute the hamming distance between two k-mers, from their hashes (see hash_kmer.hash_kmer).
+    Each nucleotide takes 2 bits in a hash: the XOR of the hashes has a non-null pair of bits where the nucleotides are
+    different. Folding each pair of bits onto its lowest bit and counting the bits set gives the distance, without
+    looking at the nucleotides one by one.
+
+    Efficiency: O(1) for k <= 32 (the hashes fit in a machine word)
+
+    :param hash1: the hash of the first k-mer
+    :param hash2: the hash of the second k-mer
+    :param k: the size of the k-mers
+    :return: the hamming distance between the two k-mers
+    """
+    difference = hash1 ^ hash2
+    return _popcount((difference | (difference >> 1)) & _low_bits_mask(k))
+
+
+def hamming_distances(pattern, text):
+    """
+    Compute the hamming distance between a pattern and every k-mer of a text (k being the size of the pattern), in a
+    single pass over the text: the hashes of the k-mers are rolled (see hash_kmer.rolling_kmer_hashes) and compared to
+    the hash of the pattern with hamming_distance_hashes.
+
+    Efficiency: O(n) with n being the size of the text (for k <= 32)
+
+    :param pattern: the pattern (a string containing only A, C, G and T)
+    :param text: the text (a string containing only A, C, G and T, or a PackedSequence)
+    :return: a list of n-k+1 distances, the i-th one being the distance between the pattern and the k-mer at position i
+    """
+    k = len(pattern)
+    return hamming_distances_hashes(hash_kmer(pattern), rolling_kmer_hashes(text, k), k)
+
+
+def hamming_distances_hashes(pattern_hash, hashes, k):
+    """
+    Compute the hamming distance between a hashed k-mer and many other ones at once: the same as
+    hamming_distance_hashes, every operation being done in C by map for all the k-mers
+    :param pattern_hash: the hash of the k-mer
+    :param hashes: the hashes of the other k-mers (an iterable)
+    :param k: the size of the k-mers
+    :return: a list of distances, one for each of the other k-mers
+    """
+    differences = list(map(xor, hashes, repeat(pattern_hash)))
+    folded = map(and_, map(or_, differences, map(rshift, differences, repeat(1))), repeat(_low_bits_mask(k)))
+    return list(map(_popcount, folded))
+
+
 def __main__():
     s1 = "TGACCCGTTATGCTCGAGTTCGGTCAGAGCGTCATTGCGAGTAGTCGTTTGCTTTCTCAAACTCC"
     s2 = "GAGCGATTAAGCGTGACAGCCCCAGGGAACCCACAAAACGTGATCGCAGTCCATCCGATCATACA"
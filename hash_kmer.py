@@ -1,3 +1,7 @@
+from array import array
+from itertools import islice
+
+
 def hash_nucleotide(nucleotide):
     """
     Hash a single nucleotide
@@ -16,6 +20,45 @@ def unhash_nucleotide(hash):
     return "ACGT"[hash]
 
 
+# Translation table from an ASCII character to its hash. Anything that is not a nucleotide is translated to 4.
+_NUCLEOTIDE_CODES = bytes(4 if hash_nucleotide(chr(i)) == -1 else hash_nucleotide(chr(i)) for i in range(256))
+
+
+def encode_nucleotides(sequence, strict=True):
+    """
+    Hash every nucleotide of a sequence at once.
+
+    Example:
+    "ACGTTA"
+    becomes
+    b'\\x00\\x01\\x02\\x03\\x03\\x00'
+
+    Efficiency: O(n), but done in C by bytes.translate, so much faster than calling hash_nucleotide n times
+
+    :param sequence: the sequence (only uppercase A, C, G and T are allowed)
+    :param strict: if False, anything that is not a nucleotide is hashed to 4 instead of raising a ValueError
+    :return: a bytes object with the hash of each nucleotide
+    """
+    if not strict:
+        return sequence.encode('ascii', 'replace').translate(_NUCLEOTIDE_CODES)
+    try:
+        codes = sequence.encode('ascii').translate(_NUCLEOTIDE_CODES)
+    except UnicodeEncodeError:
+        raise ValueError("the sequence can only contain A, C, G and T")
+    if 4 in codes:
+        raise ValueError("the sequence can only contain A, C, G and T")
+    return codes
+
+
+def only_nucleotides(sequence):
+    """
+    Check if a string only contains (uppercase) nucleotides, and can therefore be hashed
+    :param sequence: the string
+    :return: True if the string only contains A, C, G and T
+    """
+    return not sequence.encode('ascii', 'replace').translate(None, b'ACGT')
+
+
 def hash_kmer(kmer):
     """
     Hash a kmer as a number. The size of the k-mer will be lost while hashing, so you will need to store it to
@@ -23,12 +66,16 @@ def hash_kmer(kmer):
     :param kmer: the kmer
     :return: a unique number
     """
-    len_kmer = len(kmer)
-    if len_kmer == 0:
+    if len(kmer) == 0:
         raise ValueError("kmer cannot be null")
-    elif len_kmer == 1:
-        return hash_nucleotide(kmer[0])
-    return 4 * hash_kmer(kmer[:-1]) + hash_kmer(kmer[-1])
+    result = 0
+    for nucleotide in kmer:  # Iterative, so that long k-mers do not hit the recursion limit
+        result = 4 * result + hash_nucleotide(nucleotide)
+    return result
+
+
+# The 4-mer hashed as each possible byte
+_BYTE_TO_KMER = [''.join(unhash_nucleotide((b >> shift) & 3) for shift in (6, 4, 2, 0)) for b in range(256)]
 
 
 def unhash_kmer(hash, size):
@@ -38,10 +85,82 @@ def unhash_kmer(hash, size):
     :param size: the size of the target kmer
     :return:
     """
-    kmer = ""
-    while hash != 0:
-        kmer = unhash_nucleotide(hash % 4) + kmer
-        hash //= 4
+    parts = []
+    while hash != 0:  # We unhash 4 nucleotides at a time
+        parts.append(_BYTE_TO_KMER[hash & 255])
+        hash >>= 8
+    kmer = ''.join(reversed(parts)).lstrip("A")
     len_kmer = len(kmer)
     kmer = "A" * (size - len_kmer) + kmer  # fill with "a" until the size is correct
     return kmer
+
+
+# _REVERSE_COMPLEMENTED_BYTES[b] is the byte b (4 hashed nucleotides) with its nucleotides complemented and in reverse
+# order (the complement of a nucleotide is 3 minus its hash, which is 3 XOR its hash)
+_REVERSE_COMPLEMENTED_BYTES = bytes(sum((3 ^ ((b >> shift) & 3)) << (6 - shift) for shift in (0, 2, 4, 6))
+                                    for b in range(256))
+
+
+def reverse_complement_hash(hash, k):
+    """
+    Compute the hash of the reverse complement of a hashed k-mer, without unhashing it.
+    The hash is converted to bytes (4 nucleotides per byte, the last nucleotides first), every byte is reverse
+    complemented at once by bytes.translate, and the bytes are read back in the opposite order.
+    :param hash: the hashed k-mer
+    :param k: the size of the k-mer
+    :return: the hash of its reverse complement
+    """
+    size = (k + 3) // 4
+    reverse = int.from_bytes(hash.to_bytes(size, 'little').translate(_REVERSE_COMPLEMENTED_BYTES), 'big')
+    return reverse >> (2 * (-k % 4))  # Remove the nucleotides added to fill the last byte
+
+
+def rolling_kmer_hashes(text, k, canonical=False):
+    """
+    Generator to iterate over the hashes of all the k-mers of a text, in a single pass.
+    Instead of hashing every k-mer from scratch, the hash of a k-mer is computed from the hash of the previous one
+    by shifting out its first nucleotide and adding the new one.
+    Generates n-k+1 elements with n being the size of the text.
+
+    Efficiency: O(n)
+
+    :param text: the text (a string containing only A, C, G and T, or a PackedSequence)
+    :param k: the size of the k-mers
+    :param canonical: if True, generate the canonical hash of each k-mer instead, that is the minimum between the hash
+    of the k-mer and the hash of its reverse complement (so that a k-mer and its reverse complement have the same hash)
+    """
+    if k <= 0:
+        raise ValueError("k has to be positive")
+    codes = iter(encode_nucleotides(text) if isinstance(text, str) else text.codes())
+    mask = (1 << (2 * k)) - 1
+    shift = 2 * (k - 1)
+    forward = 0
+    reverse = 0
+    for code in islice(codes, k - 1):  # We hash the first k-1 nucleotides, nothing to generate yet
+        forward = (forward << 2) | code
+        # The complement of a nucleotide is 3 minus its hash (A=0 <-> T=3, C=1 <-> G=2), and it is added at the
+        # beginning of the reverse complement
+        reverse = (reverse >> 2) | ((3 - code) << shift)
+    if not canonical:  # Two separate loops, so that the most common case stays as fast as possible
+        for code in codes:
+            forward = ((forward << 2) | code) & mask
+            yield forward
+    else:
+        for code in codes:
+            forward = ((forward << 2) | code) & mask
+            reverse = (reverse >> 2) | ((3 - code) << shift)
+            yield forward if forward < reverse else reverse
+
+
+def rolling_kmer_hashes_array(text, k, canonical=False):
+    """
+    Same as rolling_kmer_hashes, but return all the hashes at once in a compact array of 64-bit integers (instead of a
+    list of Python integers).
+    :param text: the text (a string containing only A, C, G and T, or a PackedSequence)
+    :param k: the size of the k-mers (at most 32, so that a hash fits in 64 bits)
+    :param canonical: see rolling_kmer_hashes
+    :return: an array('Q') of n-k+1 hashes
+    """
+    if k > 32:
+        raise ValueError("k cannot be greater than 32")
+    return array('Q', rolling_kmer_hashes(text, k, canonical))
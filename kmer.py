@@ -1,5 +1,8 @@
 import itertools
 
+from packed_sequence import PackedSequence
+from sequence_io import MappedSequence
+
 
 def kmer(text, position, k):
     """
@@ -30,7 +33,9 @@ def kmers(text, k):
     Generator to iterate over a text k-mer after k-mer.
     - CASE 1: the fist param is a string, iterates through all the possible k-mers in this string.
     Generates n-k+1 elements with n being the size of the text.
-    - CASE 2: the second param if a list of strings: iterate through all the possible k-mers in this list of strings.
+    - CASE 2: the fist param is a PackedSequence or a MappedSequence, same as CASE 1 but without unpacking (resp.
+    reading) the whole sequence.
+    - CASE 3: the second param if a list of strings: iterate through all the possible k-mers in this list of strings.
     Generates sum(n_i-k+1) elements with n_i being the size of the i-th text.
 
     :param text: the text
@@ -41,6 +46,8 @@ def kmers(text, k):
         stop = len(text) - k
         for i in range(0, stop + 1):
             yield text[i:i + k]
+    elif isinstance(text, (PackedSequence, MappedSequence)):
+        yield from text.kmers(k)
     else:
         for seq in text:
             stop = len(seq) - k
@@ -0,0 +1,76 @@
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import eq
+
+from hash_kmer import rolling_kmer_hashes
+
+# Up to this size, k-mers are counted in a dense array with one cell per possible k-mer (4^k cells of 4 bytes, so
+# 4MB for k=10). Above, the array gets bigger than a bacterial genome and going through it costs more than counting,
+# so only the k-mers that appear are stored.
+DENSE_MAX_K = 10
+
+
+def count_kmer_hashes(sequence, k, canonical=False):
+    """
+    Count all the k-mers of a sequence by their hash, in a single pass over the sequence.
+     - CASE 1: k <= DENSE_MAX_K, the counts are stored in an array of 4^k integers, the count of a k-mer being at the
+     index of its hash.
+     - CASE 2: k > DENSE_MAX_K, the counts are stored in a Counter with the hash of the k-mers as keys (only the k-mers
+     found in the sequence are stored).
+    In both cases, the count of a k-mer is counts[hash_kmer(kmer)].
+
+    Efficiency: O(n) with n being the size of the sequence (plus O(4^k) to allocate the array in CASE 1)
+
+    :param sequence: the sequence (a string containing only A, C, G and T, or a PackedSequence)
+    :param k: the size of the k-mers
+    :param canonical: should a k-mer and its reverse complement be counted together (under the smallest hash)?
+    :return: the counts (an array or a Counter)
+    """
+    if k <= 0:
+        raise ValueError("k has to be positive")
+    if k > DENSE_MAX_K:
+        return Counter(rolling_kmer_hashes(sequence, k, canonical))
+    counts = empty_counts(k)
+    for code in rolling_kmer_hashes(sequence, k, canonical):
+        counts[code] += 1
+    return counts
+
+
+def empty_counts(k):
+    """
+    Create empty counts for k-mers of a certain size, in the same format as count_kmer_hashes
+    :param k: the size of the k-mers
+    :return: an array of 4^k zeros if k <= DENSE_MAX_K, an empty Counter otherwise
+    """
+    if k > DENSE_MAX_K:
+        return Counter()
+    return array('I', bytes(array('I').itemsize * 4 ** k))
+
+
+def hash_frequencies(counts):
+    """
+    Generator to iterate over the k-mers that appear at least once in some counts
+    :param counts: the counts (as returned by count_kmer_hashes)
+    :return: pairs (hash of the k-mer, number of apparitions)
+    """
+    if isinstance(counts, dict):
+        return iter(counts.items())
+    # compress() skips the empty cells without running any Python code for them
+    return compress(enumerate(counts), counts)
+
+
+def most_frequent_hashes(counts):
+    """
+    Find the k-mers that appear the most in some counts
+    :param counts: the counts (as returned by count_kmer_hashes)
+    :return: (the maximum number of apparitions, a list of the hashes of the k-mers appearing that many times)
+    """
+    if len(counts) == 0:
+        return 0, []
+    max_count = max(counts.values()) if isinstance(counts, dict) else max(counts)
+    if max_count == 0:
+        return 0, []
+    if isinstance(counts, dict):
+        return max_count, [code for code, count in counts.items() if count == max_count]
+    return max_count, list(compress(range(len(counts)), map(eq, counts, repeat(max_count))))
@@ -0,0 +1,264 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress, groupby, repeat
+from operator import add, eq, itemgetter
+
+from binary_io import read_array, write_array
+from hash_kmer import hash_kmer, only_nucleotides, reverse_complement_hash, unhash_kmer
+from kmer_counts import DENSE_MAX_K, count_kmer_hashes, hash_frequencies
+from packed_sequence import PackedSequence
+
+_MAGIC = b'KMERTAB1'
+# k, flags, number of (code, count) pairs (0 for a dense table), number of k-mers counted, SHA-256 of the genome
+_HEADER = struct.Struct('<QQQQ32s')
+_CANONICAL = 1
+_SPARSE = 2
+
+# Number of nucleotides hashed at a time by genome_checksum
+_CHUNK_SIZE = 1 << 20
+
+
+def genome_checksum(sequence):
+    """
+    Compute the SHA-256 of a sequence, to check that a table was counted from it
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
+    :return: the digest (32 bytes)
+    """
+    digest = hashlib.sha256()
+    for start in range(0, len(sequence), _CHUNK_SIZE):
+        digest.update(str(sequence[start:start + _CHUNK_SIZE]).encode('ascii'))
+    return digest.digest()
+
+
+class KmerTable:
+    """
+    Counts of the k-mers of a genome, which can be saved in a binary file and reopened without counting again.
+    As in kmer_counts, the table is dense for k <= DENSE_MAX_K (the count of every possible k-mer, at the index of its
+    hash), and sparse otherwise (the hashes of the k-mers found, in ascending order, and their counts).
+    An opened file is memory mapped: nothing is read until it is used, and a k-mer is looked up in O(1) (dense) or
+    O(log n) (sparse) without loading the table.
+    """
+
+    def __init__(self, k, canonical, checksum, total, counts, codes=None, mapped=None):
+        """
+        Use KmerTable.count to count a genome, or KmerTable.open to open a table saved with save
+        """
+        self.k = k
+        self.canonical = canonical
+        self.checksum = checksum
+        self.total = total  # Number of k-mers counted
+        self._counts = counts
+        self._codes = codes
+        self._mapped = mapped
+
+    @classmethod
+    def count(cls, sequence, k, canonical=False):
+        """
+        Count the k-mers of a genome
+        :param sequence: the genome (a string containing only A, C, G and T, a PackedSequence or a MappedSequence)
+        :param k: the size of the k-mers
+        :param canonical: should a k-mer and its reverse complement be counted together (under the smallest hash)?
+        :return: the table
+        """
+        if k > 32:
+            raise ValueError("k cannot be greater than 32")
+        if not isinstance(sequence, PackedSequence):
+            sequence = str(sequence)
+            if not only_nucleotides(sequence):
+                raise ValueError("the genome can only contain A, C, G and T")
+        counts = count_kmer_hashes(sequence, k, canonical)
+        total = max(0, len(sequence) - k + 1)
+        if k <= DENSE_MAX_K:
+            return cls(k, canonical, genome_checksum(sequence), total, counts)
+        codes = array('Q', sorted(counts))
+        return cls(k, canonical, genome_checksum(sequence), total, array('I', map(counts.__getitem__, codes)), codes)
+
+    @property
+    def sparse(self):
+        """
+        True if only the k-mers found are stored
+        """
+        return self._codes is not None
+
+    def __len__(self):
+        """
+        The number of distinct k-mers in the table
+        """
+        return len(self._counts) if self.sparse else sum(map(bool, self._counts))
+
+    def code(self, kmer):
+        """
+        Find the hash under which a k-mer is counted
+        :param kmer: the k-mer (a string, or its hash)
+        :return: the hash (the canonical one if the table is canonical)
+        """
+        code = kmer if isinstance(kmer, int) else hash_kmer(kmer)
+        if self.canonical:
+            code = min(code, reverse_complement_hash(code, self.k))
+        return code
+
+    def __getitem__(self, kmer):
+        """
+        Count the apparitions of a k-mer
+        :param kmer: the k-mer (a string, or its hash)
+        :return: the number of apparitions
+        """
+        if isinstance(kmer, str) and (len(kmer) != self.k or not only_nucleotides(kmer)):
+            return 0
+        code = self.code(kmer)
+        if not self.sparse:
+            return self._counts[code]
+        index = bisect_left(self._codes, code)
+        return self._counts[index] if index < len(self._codes) and self._codes[index] == code else 0
+
+    def items(self):
+        """
+        Generator to iterate over the k-mers of the table, in ascending order of their hashes
+        :return: pairs (hash of the k-mer, number of apparitions)
+        """
+        if self.sparse:
+            return zip(self._codes, self._counts)
+        return hash_frequencies(self._counts)
+
+    def top(self, n):
+        """
+        Find the n most frequent k-mers (the smallest hashes first in case of a tie)
+        :param n: the number of k-mers
+        :return: a list of (k-mer, number of apparitions), most frequent first
+        """
+        return [(unhash_kmer(code, self.k), count) for code, count in heapq.nlargest(n, self.items(), itemgetter(1))]
+
+    def frequent_words(self):
+        """
+        Find the most frequent k-mers, as frequent_words.frequent_words
+        :return: a dictionary {k-mer: number of apparitions} of the k-mers appearing the most
+        """
+        if len(self._counts) == 0:
+            return {}
+        max_count = max(self._counts)
+        if max_count == 0:
+            return {}
+        codes = self._codes if self.sparse else range(len(self._counts))
+        return {unhash_kmer(code, self.k): max_count
+                for code in compress(codes, map(eq, self._counts, repeat(max_count)))}
+
+    def frequencies(self):
+        """
+        The counts of all the k-mers found, as frequent_words.frequency_kmer
+        :return: a Counter with the k-mers as keys and their number of apparitions as values
+        """
+        return Counter({unhash_kmer(code, self.k): count for code, count in self.items()})
+
+    @classmethod
+    def merge(cls, tables):
+        """
+        Add up the counts of several tables (of different genomes for example)
+        :param tables: the tables (with the same k and canonical flag)
+        :return: the merged table, its checksum being the SHA-256 of the checksums of the tables, in order
+        """
+        if not tables:
+            raise ValueError("there is no table to merge")
+        k, canonical = tables[0].k, tables[0].canonical
+        if any((table.k, table.canonical) != (k, canonical) for table in tables):
+            raise ValueError("only tables with the same k and canonical flag can be merged")
+        checksum = hashlib.sha256(b''.join(table.checksum for table in tables)).digest()
+        total = sum(table.total for table in tables)
+        if not tables[0].sparse:
+            counts = array('I', tables[0]._counts)
+            for table in tables[1:]:
+                counts = array('I', map(add, counts, table._counts))
+            return cls(k, canonical, checksum, total, counts)
+        # The k-mers of the tables are sorted, so they are merged in a single pass
+        codes, counts = array('Q'), array('I')
+        for code, group in groupby(heapq.merge(*(table.items() for table in tables), key=itemgetter(0)), itemgetter(0)):
+            codes.append(code)
+            counts.append(sum(map(itemgetter(1), group)))
+        return cls(k, canonical, checksum, total, counts, codes)
+
+    def save(self, filename):
+        """
+        Save the table in a file, to be opened with KmerTable.open
+        :param filename: the name of the file
+        """
+        flags = (_CANONICAL if self.canonical else 0) | (_SPARSE if self.sparse else 0)
+        with open(filename, 'wb') as file:
+            file.write(_MAGIC)
+            file.write(_HEADER.pack(self.k, flags, len(self._counts) if self.sparse else 0, self.total, self.checksum))
+            if self.sparse:
+                write_array(file, array('Q', self._codes))
+            write_array(file, array('I', self._counts))
+
+    @classmethod
+    def open(cls, filename):
+        """
+        Open a table saved with save, through a memory map (see close)
+        :param filename: the name of the file
+        :return: the table
+        """
+        with open(filename, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("{} is not a k-mer table file".format(filename))
+            k, flags, size, total, checksum = _HEADER.unpack(file.read(_HEADER.size))
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = len(_MAGIC) + _HEADER.size
+        codes = None
+        if flags & _SPARSE:
+            codes = read_array(mapped, start, 'Q', size)
+            start += 8 * size
+        else:
+            size = 4 ** k
+        counts = read_array(mapped, start, 'I', size)
+        return cls(k, bool(flags & _CANONICAL), checksum, total, counts, codes, mapped)
+
+    def close(self):
+        """
+        Close the file of a table opened with open (the table cannot be used anymore)
+        """
+        if self._mapped is not None:
+            for view in (self._counts, self._codes):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def load_or_count(filename, sequence, k, canonical=False):
+    """
+    Open the table of a genome if it was saved in a file, or count it and save it otherwise: the table is counted again
+    if the file was saved for another genome, k or canonical flag
+    :param filename: the name of the file
+    :param sequence: the genome
+    :param k: the size of the k-mers
+    :param canonical: see KmerTable.count
+    :return: the table, opened from the file
+    """
+    if os.path.exists(filename):
+        table = KmerTable.open(filename)
+        if (table.k, table.canonical, table.checksum) == (k, canonical, genome_checksum(sequence)):
+            return table
+        table.close()
+    KmerTable.count(sequence, k, canonical).save(filename)
+    return KmerTable.open(filename)
+
+
+def __main__():
+    with open('data/genome.txt') as file:
+        genome = file.read().strip()
+    with load_or_count('genome.9mers', genome, 9) as table:
+        print(table.top(5))
+
+
+if __name__ == '__main__':
+    __main__()
@@ -1,41 +1,136 @@
 from hamming_distance import hamming_distance
+from hash_kmer import only_nucleotides
 from kmer import all_kmers
 
 
+# The nucleotides in the order of all_kmers, so that the k-mers are explored in the same order
+_NUCLEOTIDES = 'ATGC'
+
+
 def median_string(k, dna):
     """
-    Find the a k-mer x that minimizes the HammingDistance(x, dna)
+    Find the a k-mer x that minimizes the HammingDistance(x, dna) (see _branch_and_bound)
     :param k: the size of the k-mer to find
     :param dna: a list of DNA sequences
     :return: a k-mer that minimizes the distance between itself and the list of sequences. If multiple k-mers are found,
-    return only a single one.
+    return only a single one (the first one in the order of all_kmers).
 
-    Efficiency: O(4^k * kns)
+    Efficiency: O(4^k * ns) in the worst case, much less in practice
     """
-    min_distance = (float("inf"), None)
-    for pattern in all_kmers(k):
-        distance = hamming_distance(pattern, dna)
-        if distance < min_distance[0]:
-            min_distance = (distance, pattern)
-    return min_distance[1]
+    patterns = _branch_and_bound(k, dna, all_optimal=False)
+    return patterns[0] if patterns else None
 
 
 def median_strings(k, dna):
     """
-    Find all k-mers x that minimizes the HammingDistance(x, dna)
+    Find all k-mers x that minimizes the HammingDistance(x, dna) (see _branch_and_bound)
     :param k: the size of the k-mer to find
     :param dna: a list of DNA sequences
-    :return: all k-mer that minimizes the distance between themselves and the list of sequences
+    :return: all k-mer that minimizes the distance between themselves and the list of sequences (in the order of
+    all_kmers)
+
+    Efficiency: O(4^k * ns) in the worst case, much less in practice
+    """
+    return _branch_and_bound(k, dna, all_optimal=True)
+
+
+def _branch_and_bound(k, dna, all_optimal, search=None):
+    """
+    Search the k-mers minimizing HammingDistance(x, dna) in the tree of their prefixes (see _search).
+    To prune the tree early, the distance of the last nucleotides of a k-mer to the sequences is bounded by solving the
+    same problem for suffixes: the last r nucleotides of the k-mers are compared to the sequences without their first
+    k-r nucleotides, and the minimum distance found for them cannot be beaten by any k-mer. These problems are solved
+    from the shortest suffix to the longest, each one being bounded by the previous ones.
+    :param all_optimal: should all the k-mers minimizing the distance be returned, or only the first one?
+    :param search: the function searching the tree (_search, or a function splitting the search, with the same
+    parameters and result)
+    :return: a list of k-mers
+    """
+    search = search or _search
+    sequences = list(dna)
+    if k == 0:  # The empty k-mer is at distance 0 of every sequence
+        return ['']
+    if any(len(sequence) < k for sequence in sequences):  # Every k-mer is infinitely far from the shortest sequences
+        return list(all_kmers(k)) if all_optimal else []
+    suffix_bounds = [0]  # suffix_bounds[r] is the minimum distance of the last r nucleotides of a k-mer
+    for r in range(1, k):
+        distance, _ = search(r, [sequence[k - r:] for sequence in sequences], suffix_bounds, all_optimal=False)
+        suffix_bounds.append(distance)
+    return search(k, sequences, suffix_bounds, all_optimal)[1]
+
 
-    Efficiency: O(4^k * kns)
+def _search(k, sequences, suffix_bounds, all_optimal, prefix=''):
     """
-    result = {}
-    for pattern in all_kmers(k):
-        distance = hamming_distance(pattern, dna)
-        result[pattern] = distance
-    min_value = min(result.values())
-    mins = [sequence for sequence, value in result.items() if value == min_value]
-    return mins
+    Search the k-mers minimizing HammingDistance(x, sequences) in the tree of their prefixes (depth first, in the order
+    of all_kmers).
+    For each sequence, the windows of k nucleotides are grouped by the number of mismatches they have with the current
+    prefix (as bit sets, one bit per window), so adding a nucleotide to the prefix only moves the windows that do not
+    match it one group up. The smallest non-empty group of a sequence is a lower bound of its distance to any k-mer
+    starting with the prefix, and their sum plus the bound of the rest of the k-mer is a lower bound for the whole
+    subtree: the subtree is skipped if it is greater than the best distance found so far (or equal to it, when a
+    single k-mer is wanted). The groups too far above the smallest one to change the result are dropped.
+    :param suffix_bounds: suffix_bounds[r] is a lower bound of the distance of the last r nucleotides of a k-mer (for r
+    from 0 to k-1)
+    :param all_optimal: should all the k-mers minimizing the distance be returned, or only the first one?
+    :param prefix: only search the k-mers starting with this prefix
+    :return: (the minimum distance, a list of k-mers). If no k-mer is better than the first k-mers of the sequences,
+    the list is empty
+    """
+    windows = [(1 << (len(sequence) - k + 1)) - 1 for sequence in sequences]
+    # positions[i][c] has the bit p set if the p-th nucleotide of the i-th sequence is c
+    positions = [{c: int(''.join('1' if n == c else '0' for n in reversed(sequence)), 2) for c in _NUCLEOTIDES}
+                 for sequence in sequences]
+    # Any k-mer gives an upper bound of the minimum distance (as the first k-mers of the sequences, which are likely to
+    # be close to the others), to prune the search from the start
+    limit = min([hamming_distance(sequence[:k], sequences) for sequence in sequences if only_nucleotides(sequence[:k])],
+                default=k * len(sequences))
+    best = []
+    best_distance = limit
+    current = []
+
+    def search(depth, states, distance):
+        """
+        :param states: for each sequence, (number of mismatches of its best windows, groups of windows from this number)
+        :param distance: the sum of the numbers of mismatches of the best windows of all the sequences
+        """
+        nonlocal limit, best_distance
+        for c in _NUCLEOTIDES if depth >= len(prefix) else prefix[depth]:
+            # How many mismatches can still be added to the best windows of the sequences without exceeding the limit
+            budget = limit - suffix_bounds[k - depth - 1] - distance
+            next_states = []
+            for i, (mismatches, groups) in enumerate(states):
+                matches = (positions[i][c] >> depth) & windows[i]
+                moved = 0  # The windows of the previous group that have one more mismatch
+                new_groups = []
+                for group in groups[:budget + 1]:
+                    new_groups.append((group & matches) | moved)
+                    moved = group & ~matches
+                if len(new_groups) <= budget:
+                    new_groups.append(moved)
+                while new_groups and not new_groups[0]:  # The best windows have one more mismatch
+                    del new_groups[0]
+                    mismatches += 1
+                    budget -= 1
+                if budget < 0 or not new_groups:
+                    break
+                next_states.append((mismatches, new_groups))
+            else:
+                current.append(c)
+                new_distance = limit - suffix_bounds[k - depth - 1] - budget
+                if depth + 1 < k:
+                    search(depth + 1, next_states, new_distance)
+                else:  # The bound of a k-mer is its distance
+                    pattern = ''.join(current)
+                    if best and new_distance == best_distance:
+                        best.append(pattern)
+                    else:
+                        best[:] = [pattern]
+                        best_distance = new_distance
+                        limit = new_distance if all_optimal else new_distance - 1
+                current.pop()
+
+    search(0, [(0, [window]) for window in windows], 0)
+    return best_distance, best
 
 
 def __main__():
@@ -1,12 +1,23 @@
 import math
 import random
-from bisect import bisect
-from itertools import accumulate
+from itertools import compress, repeat
+from operator import xor
 
-from hamming_distance import hamming_distance
-from hash_kmer import hash_nucleotide, unhash_nucleotide
+from hamming_distance import alternating_mask, hamming_distance
+from hash_kmer import encode_nucleotides, only_nucleotides, rolling_kmer_hashes, unhash_kmer, unhash_nucleotide
 from kmer import kmers
-from neighbors import neighbors
+from neighbors import neighbor_hashes, neighbors
+from profile_matrix import CountMatrix, code_log_probabilities, code_probabilities, count_matrix, \
+    first_most_probable, log_profile, log_weights_to_weights, most_probable_window, profile_from_counts, \
+    window_chunks, window_log_probabilities, window_probabilities
+from sampling import DistributionCache
+
+# Up to this size of k-mers, the neighborhoods of motifs_enumeration can be bitsets over the 4^k k-mers
+_MAX_BITSET_K = 13
+
+# The bitsets are only used if the neighborhoods of the sequences would have at least 4^k / _BITSET_MIN_FILL elements
+# in total as sets: below, allocating and shifting bitsets of 4^k bits costs more than building the sets
+_BITSET_MIN_FILL = 2
 
 
 def profile(motifs, cromwell=False):
@@ -37,83 +48,8 @@ def profile(motifs, cromwell=False):
     A, C, G, T (respectively)
     """
 
-    def transpose(matrix):
-        """
-        Transpose a matrix
-
-        Example:
-        [['A', 'T', 'G', 'C', 'T'],
-         ['A', 'A', 'G', 'C', 'C']]
-        becomes
-        [['A', 'A'],
-         ['T', 'A'],
-         ['G', 'G'],
-         ['C', 'C'],
-         ['T', 'C']]
-
-        :param matrix: the matrix
-        :return: the transposed matrix
-        """
-        return list(zip(*matrix))
-
-    def motifs_list_to_matrix(motifs):
-        """
-        Transform a motif list to a matrix.
-
-        Example:
-        ['ATGCT',
-         'AAGCC']
-        becomes
-        [['A', 'T', 'G', 'C', 'T'],
-         ['A', 'A', 'G', 'C', 'C']]
-
-        :return: the matrix
-        """
-        return [list(motif) for motif in motifs]
-
-    def profile_vector(vector, cromwell):
-        """
-        Return a distribution vector of the nucleotide vector
-
-        Example:
-        ['T', 'A']
-        becomes
-        [1/2, 0, 0, 1/2] (without cromwell)
-        or
-        [2/6, 1/6, 1/6, 2/6] (with cromwell)
-
-        :param vector: the vector
-        :param cromwell: whether the probabilities of the profile matrix should follow Cromwell's rule (to use when
-        generating profile of small set of sequences). Will avoid to have probabilities equal to zero, but instead use small
-        numbers
-        :return: (a, c, g, t) where a is the frequency of A's, t the frequency of T's, and so on
-        """
-
-        if cromwell:
-            # Here we add 4 to the length of the vector, because we fake that every nucleotide appeared at least once
-            # (to avoid null probabilities).
-            len_vec = float(len(vector) + 4)
-            return [
-                (vector.count('A') + 1) / len_vec,
-                (vector.count('C') + 1) / len_vec,
-                (vector.count('G') + 1) / len_vec,
-                (vector.count('T') + 1) / len_vec
-            ]
-        else:
-            # Could be faster to compute 1.0 / len(vector) and to multiply instead of dividing, but gives floating point
-            # imprecision. Probably automatically optimized anyway.
-            len_vec = float(len(vector))
-            return [
-                vector.count('A') / len_vec,
-                vector.count('C') / len_vec,
-                vector.count('G') / len_vec,
-                vector.count('T') / len_vec
-            ]
-
-    matrix = motifs_list_to_matrix(motifs)
-    transposed = transpose(matrix)
-    profile_matrix = [profile_vector(v, cromwell) for v in transposed]
-    return profile_matrix
+    motifs = list(motifs)
+    return profile_from_counts(count_matrix(motifs), len(motifs), cromwell)
 
 
 def probability_from_profile(sequence, profile_matrix):
@@ -124,9 +60,8 @@ def probability_from_profile(sequence, profile_matrix):
     :return: the probability that the given profile matrix generates this sequence
     """
     probability = 1
-    for nucleotide, profile_vector in zip(sequence, profile_matrix):
-        probability_of_nucleotide = profile_vector[hash_nucleotide(nucleotide)]
-        probability *= probability_of_nucleotide
+    for code, profile_vector in zip(encode_nucleotides(sequence, strict=False), profile_matrix):
+        probability *= profile_vector[code] if code < 4 else 0  # Only nucleotides can be generated by the profile
     return probability
 
 
@@ -155,12 +90,57 @@ def motifs_entropy(motifs):
 
 def motifs_enumeration(sequences, k, d):
     """
-    Check if a motif of length k appears in each sequence in strings with at most d mismatches
+    Check if a motif of length k appears in each sequence in strings with at most d mismatches.
+    The k-mers appearing in a sequence with at most d mismatches are the d-neighbors of its k-mers (its neighborhood),
+    so the neighborhood of each sequence is built once, and the (k, d)-motifs are the intersection of the
+    neighborhoods:
+    - for k <= 13, when the neighborhoods cover a large part of the 4^k k-mers, a neighborhood is a bitset over the 4^k
+    k-mers (2 MB for k = 12), widened by one mismatch at a time with shifts of the whole bitset (see
+    _bitset_neighborhood), and the bitsets are intersected with a single AND;
+    - otherwise, a neighborhood is a set of hashes, and once fewer candidates are left than a sequence has k-mers, the
+    neighbors of the candidates are looked up among the k-mers of the sequence instead of building its neighborhood.
     :param sequences: the array of sequences
     :param k: the length of the motif
     :param d: the maximum number of mismatches
     :return: the (k, d)-motifs in string as a set
     """
+    sequences = list(sequences)
+    if not all(isinstance(sequence, str) and only_nucleotides(sequence) for sequence in sequences):
+        return _motifs_enumeration_stupid(sequences, k, d)
+    if not sequences or k <= 0 or any(len(sequence) < k for sequence in sequences):
+        return set()
+    kmers_hashes = sorted((set(rolling_kmer_hashes(sequence, k)) for sequence in sequences), key=len)
+    substitutions = list(neighbor_hashes(0, k, d))  # The XOR masks of all the neighbors of a k-mer
+    neighborhoods_size = sum(map(len, kmers_hashes)) * len(substitutions)
+    if k <= _MAX_BITSET_K and neighborhoods_size * _BITSET_MIN_FILL >= 4 ** k:
+        masks = [alternating_mask(1 << bit, 4 ** k) for bit in range(2 * k)]
+        motifs_bitset = -1
+        for hashes in kmers_hashes:
+            motifs_bitset &= _bitset_neighborhood(hashes, k, d, masks)
+            if not motifs_bitset:
+                return set()
+        motifs_hashes = _bitset_members(motifs_bitset)
+    else:
+        motifs_hashes = _set_neighborhood(kmers_hashes[0], substitutions)
+        for hashes in kmers_hashes[1:]:
+            if len(motifs_hashes) <= len(hashes):
+                candidates = list(motifs_hashes)
+                motifs_hashes = set()
+                for substitution in substitutions:
+                    neighbors_present = map(hashes.__contains__, map(xor, candidates, repeat(substitution)))
+                    motifs_hashes.update(compress(candidates, neighbors_present))
+            else:
+                motifs_hashes &= _set_neighborhood(hashes, substitutions)
+            if not motifs_hashes:
+                return set()
+    return {unhash_kmer(motif_hash, k) for motif_hash in motifs_hashes}
+
+
+def _motifs_enumeration_stupid(sequences, k, d):
+    """
+    Same as motifs_enumeration, by checking if a neighbor of each candidate appears in each sequence (this version also
+    works with other characters than A, C, G and T)
+    """
     motifs = set()
     for kmer in kmers(sequences, k):
         neighborhood = neighbors(kmer, d)
@@ -171,20 +151,82 @@ def motifs_enumeration(sequences, k, d):
     return motifs
 
 
-def most_probable_kmer_from_profile(sequence, k, profile_matrix):
+def _bitset_neighborhood(hashes, k, d, masks):
+    """
+    Build the d-neighborhood of some k-mers as a bitset.
+    Changing the j-th nucleotide of every k-mer of a bitset into any other one is done on the whole bitset at once:
+    flipping the bit b of every hash moves the hashes having this bit equal to 0 by 2^b positions up, and the other
+    ones by 2^b positions down, which is two shifts of the bitset. Flipping bit 2j then bit 2j+1 (keeping both the
+    flipped and the original hashes each time) gives the 4 nucleotides at position j, and doing it for every position
+    adds all the 1-neighbors. This is repeated d times.
+
+    Efficiency: O(d * k * 4^k / 64), whatever the number of k-mers
+
+    :param hashes: the hashes of the k-mers
+    :param k: the size of the k-mers
+    :param d: the maximum number of mismatches
+    :param masks: the bitsets of the hashes having each bit equal to 0 (see hamming_distance.alternating_mask)
+    :return: the bitset of the neighborhood, as an integer whose bit i is set if the hash i is in the neighborhood
+    """
+    bits = bytearray((4 ** k + 7) // 8)
+    for kmer_hash in hashes:
+        bits[kmer_hash >> 3] |= 1 << (kmer_hash & 7)
+    neighborhood = int.from_bytes(bits, 'little')
+    for _ in range(min(d, k)):
+        widened = neighborhood
+        for j in range(k):
+            substituted = neighborhood
+            for bit in (2 * j, 2 * j + 1):
+                shift = 1 << bit
+                substituted |= ((substituted & masks[bit]) << shift) | ((substituted >> shift) & masks[bit])
+            widened |= substituted
+        neighborhood = widened
+    return neighborhood
+
+
+def _bitset_members(bitset):
+    """
+    List the elements of a bitset
+    :param bitset: the bitset, as a non-negative integer
+    :return: the list of the positions of the bits set, in ascending order
+    """
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+    return [8 * i + j for i in compress(range(len(data)), data) for j in range(8) if data[i] >> j & 1]
+
+
+def _set_neighborhood(hashes, substitutions):
+    """
+    Build the neighborhood of some k-mers as a set, by applying each substitution to all the k-mers at once
+    :param hashes: the hashes of the k-mers
+    :param substitutions: the XOR masks of the neighbors of a k-mer (see neighbors.neighbor_hashes)
+    :return: the set of the hashes of the neighborhood
+    """
+    hashes = list(hashes)
+    neighborhood = set()
+    for substitution in substitutions:
+        neighborhood.update(map(xor, hashes, repeat(substitution)))
+    return neighborhood
+
+
+def most_probable_kmer_from_profile(sequence, k, profile_matrix, log_space=False):
     """
     Find the most profile-probable k-mer in a sequence
     :param sequence: the sequence
     :param k: the size of the k-mer
     :param profile_matrix: the profile matrix
+    :param log_space: should the k-mers be scored with sums of log-probabilities instead of products of probabilities
+    (which underflow to 0 for long k-mers)?
     :return: the most probable k-mer in sequence according to the given profile matrix
     """
-    most_probable = (-1, None)
-    for kmer in kmers(sequence, k):
-        probability = probability_from_profile(kmer, profile_matrix)
-        if probability > most_probable[0]:
-            most_probable = (probability, kmer)
-    return most_probable[1]
+    if log_space:
+        probabilities = window_log_probabilities(sequence, log_profile(profile_matrix[:k]))
+    else:
+        probabilities = window_probabilities(sequence, profile_matrix[:k])
+    probabilities = probabilities[:len(sequence) - k + 1]
+    if not probabilities:
+        return None
+    index = first_most_probable(probabilities, log_space)  # The first k-mer if several are the most probable
+    return sequence[index:index + k]
 
 
 def consensus(motifs):
@@ -194,9 +236,8 @@ def consensus(motifs):
     :return: the consensus string
     """
     result = ""
-    profile_motifs = profile(motifs)
-    for distribution in profile_motifs:
-        index = distribution.index(max(distribution))
+    for counts in count_matrix(motifs):  # The most frequent nucleotide is also the most probable one in the profile
+        index = counts.index(max(counts))
         result += unhash_nucleotide(index)
     return result
 
@@ -214,22 +255,54 @@ def score(motifs):
     return hamming_distance(motifs_consensus, motifs)
 
 
-def greedy_motifs_search(sequences, k, cromwell=True):
+# Scores that can be computed from the counts of the motifs (see profile_matrix.CountMatrix)
+_COUNTS_SCORES = {motifs_entropy: CountMatrix.entropy, score: CountMatrix.score}
+
+# Margin under which two entropies are considered equal, when comparing an entropy to a bound
+_ENTROPY_TOLERANCE = 1e-9
+
+
+def greedy_motifs_search(sequences, k, cromwell=True, log_space=False, early_stop=False):
     """
-    Tries to find a collection of motifs in a collection of sequences of DNA
+    Tries to find a collection of motifs in a collection of sequences of DNA.
+    The sequences are hashed once, the counts of the motifs are updated each time a motif is added (see
+    profile_matrix.CountMatrix), and all the k-mers of the next sequence are scored at once (see
+    profile_matrix.most_probable_window). A k-mer already tried as the first motif is not tried again, as it would give
+    the same motifs.
     :param sequences: the collection of sequences
     :param k: the size of the motifs to search for
     :param cromwell: should we use Cromwell's rule when generating the profile matrix?
+    :param log_space: should the k-mers be scored in log-space (see most_probable_kmer_from_profile)?
+    :param early_stop: should the motifs from a first k-mer be abandoned as soon as their entropy cannot beat the best
+    one, whatever the motifs left to add (see profile_matrix.CountMatrix.entropy_bound)? The result is the same, but
+    the search is faster when the sequences share a clear motif
     :return: a collection of the most probable motifs (one motif for each sequence)
     """
-    best_motifs = None
-    for motif1 in kmers(sequences[0], k):
-        motifs = [motif1]
-        for sequence in sequences[1:]:
-            profile_matrix = profile(motifs, cromwell)
-            motifs.append(most_probable_kmer_from_profile(sequence, k, profile_matrix))
-        if not best_motifs or motifs_entropy(motifs) < motifs_entropy(best_motifs):
-            best_motifs = motifs
+    codes = [encode_nucleotides(sequence, strict=False) for sequence in sequences]
+    sequences_chunks = [window_chunks(sequence_codes) for sequence_codes in codes]
+    number_of_motifs = len(sequences)
+    best_motifs, best_entropy = None, None
+    tried = set()
+    for start in range(len(sequences[0]) - k + 1):
+        first_codes = codes[0][start:start + k]
+        if first_codes in tried:
+            continue
+        tried.add(first_codes)
+        counts = CountMatrix.from_codes([first_codes], k)
+        positions = [start]
+        for sequence_codes, chunks in zip(codes[1:], sequences_chunks[1:]):
+            position = most_probable_window(sequence_codes, counts.profile(cromwell), log_space, chunks)
+            counts.add(sequence_codes[position:position + k])
+            positions.append(position)
+            # The bound is only trusted if it is clearly above the best entropy, to be safe from rounding errors
+            if early_stop and best_entropy is not None and \
+                    counts.entropy_bound(number_of_motifs) > best_entropy + _ENTROPY_TOLERANCE:
+                break
+        else:
+            entropy = counts.entropy()
+            if best_entropy is None or entropy < best_entropy:
+                best_motifs = [sequence[position:position + k] for sequence, position in zip(sequences, positions)]
+                best_entropy = entropy
     return best_motifs
 
 
@@ -240,14 +313,45 @@ def random_motifs(sequences, k):
     :param k: the length of the desired motifs
     :return: a random list of motifs
     """
-    result = []
-    for sequence in sequences:
-        index = random.randint(0, len(sequence) - k)
-        result.append(sequence[index:index + k])
-    return result
+    return [sequence[index:index + k] for sequence, index in zip(sequences, random_positions(sequences, k))]
 
 
-def randomized_motifs_search(sequences, k, n=1, cromwell=True):
+def random_positions(sequences, k):
+    """
+    Choose a random position of a k-mer in each sequence of a list
+    :param sequences: the sequences
+    :param k: the length of the k-mers
+    :return: a list of positions
+    """
+    return [random.randint(0, len(sequence) - k) for sequence in sequences]
+
+
+def single_randomized_motifs_search(sequences, k, cromwell=True, log_space=False):
+    """
+    Tries to find a list of motifs in a list of sequences of DNA.
+    This is a Monte Carlo algorithm.
+    :param sequences: the list of sequences
+    :param k: the size of the motifs to search for
+    :param cromwell: should we use Cromwell's rule when generating the profile matrix?
+    :param log_space: should the k-mers be scored in log-space (see most_probable_kmer_from_profile)?
+    :return: (the entropy of the motifs, a probable list of the most-probable motifs)
+    """
+    motifs_list = random_motifs(sequences, k)  # The first list of motifs is randomly sampled from the sequences
+    best_motifs = (motifs_entropy(motifs_list), motifs_list)  # (entropy_of_motifs, list_of_motifs)
+    while True:  # This algorithm will terminate when the entropy stops improving
+        motifs_profile = profile(best_motifs[1], cromwell)  # We get the profile of the current motifs
+        # We generate a new list of motifs based on the profile
+        motifs_list = motifs(motifs_profile, sequences, log_space)
+        entropy = motifs_entropy(motifs_list)  # We compute the entropy of the new list
+        # If the entropy is better, we have a new best motifs list
+        if entropy < best_motifs[0]:
+            best_motifs = (entropy, motifs_list)
+        # If the entropy does not get better, we stop because we do not want to run into an infinite loop
+        else:
+            return best_motifs
+
+
+def randomized_motifs_search(sequences, k, n=1, cromwell=True, log_space=False):
     """
     Tries to find a list of motifs in a list of sequences of DNA. Tries to smooth the results by running multiple times
     This is a Monte Carlo algorithm.
@@ -255,51 +359,30 @@ def randomized_motifs_search(sequences, k, n=1, cromwell=True):
     :param k: the size of the motifs to search for
     :param n: the number of times to run the search (set higher for better results)
     :param cromwell: should we use Cromwell's rule when generating the profile matrix?
+    :param log_space: should the k-mers be scored in log-space (see most_probable_kmer_from_profile)?
     :return: a probable list of the most-probable motifs
     """
-
-    def single_randomized_motifs_search(sequences, k, cromwell=True):
-        """
-        Tries to find a list of motifs in a list of sequences of DNA.
-        This is a Monte Carlo algorithm.
-        :param sequences: the list of sequences
-        :param k: the size of the motifs to search for
-        :param cromwell: should we use Cromwell's rule when generating the profile matrix?
-        :return: a probable list of the most-probable motifs
-        """
-        motifs_list = random_motifs(sequences, k)  # The first list of motifs is randomly sampled from the sequences
-        best_motifs = (motifs_entropy(motifs_list), motifs_list)  # (entropy_of_motifs, list_of_motifs)
-        while True:  # This algorithm will terminate when the entropy stops improving
-            motifs_profile = profile(best_motifs[1], cromwell)  # We get the profile of the current motifs
-            motifs_list = motifs(motifs_profile, sequences)  # We generate a new list of motifs based on the profile
-            entropy = motifs_entropy(motifs_list)  # We compute the entropy of the new list
-            # If the entropy is better, we have a new best motifs list
-            if entropy < best_motifs[0]:
-                best_motifs = (entropy, motifs_list)
-            # If the entropy does not get better, we stop because we do not want to run into an infinite loop
-            else:
-                return best_motifs
-
-    best_motifs = single_randomized_motifs_search(sequences, k, cromwell)
+    best_motifs = single_randomized_motifs_search(sequences, k, cromwell, log_space)
     for i in range(0, n - 1):  # n - 1, because we already performed a first search
-        next_motifs = single_randomized_motifs_search(sequences, k, cromwell)
+        next_motifs = single_randomized_motifs_search(sequences, k, cromwell, log_space)
         if next_motifs[0] < best_motifs[0]:  # If the entropy is better, we have a new best motifs list
             best_motifs = next_motifs
     return best_motifs[1]  # We return only the list of motifs, not the entropy
 
 
-def motifs(profile, sequences):
+def motifs(profile, sequences, log_space=False):
     """
     Get the profile-most probable motifs in a list of sequences
     :param profile: the profile matrix
     :param sequences: some sequences of DNA
+    :param log_space: should the k-mers be scored in log-space (see most_probable_kmer_from_profile)?
     :return: a list of the profile most probable motifs in the sequences according
     """
 
     k = len(profile)  # The profile matrix has the same length as the researched k-mer
     result = []
     for sequence in sequences:
-        result.append(most_probable_kmer_from_profile(sequence, k, profile))
+        result.append(most_probable_kmer_from_profile(sequence, k, profile, log_space))
     return result
 
 
@@ -309,41 +392,34 @@ def biased_random(sequence):
     :param sequence: the sequence of probabilities. If it does not sum to one, it will be adjusted accordingly.
     :return: an index in the sequence
     """
-
-    def sequence_to_distribution(sequence):
-        """
-        Transform a list of integers in [0; +inf[ to a probability distribution that sums to 1
-        :param sequence:
-        :return:
-        """
-        multiplier = 1.0 / sum(sequence)  # We use multiplication instead of division
-        return [x * multiplier for x in sequence]
-
-    if sequence not in biased_random.cache:  # If the accumulated distribution is stored in cache
-        distribution = sequence_to_distribution(sequence)  # We normalize the sequence
-        biased_random.cache[sequence] = list(accumulate(distribution))  # We store the accumulated distribution
-    dist = biased_random.cache[sequence]
-    return bisect(dist, random.uniform(0, dist[-1]))
+    return biased_random.cache.sample(sequence)
 
 
-biased_random.cache = {}  # Cache for biased random
+# Cache for biased random: the distributions sampled more than once get an alias table, the least recently used
+# tables being dropped (see sampling.DistributionCache)
+biased_random.cache = DistributionCache()
 
 
-def profile_random_kmer(profile, sequence):
+def profile_random_kmer(profile, sequence, log_space=False):
     """
     Generate a profile-randomly chosen k-mer in a sequence.
     The size of the kmer will be deducted from profile.
     :param profile: the profile
     :param sequence: the sequence to search in
+    :param log_space: should the k-mers be weighted in log-space? The log-probabilities are converted back to weights
+    relative to the most probable k-mer (log-sum-exp), so they do not underflow to 0 for long k-mers
     :return:
     """
     k = len(profile)
-    distribution = tuple(probability_from_profile(kmer, profile) for kmer in kmers(sequence, k))
+    if log_space:
+        distribution = tuple(log_weights_to_weights(window_log_probabilities(sequence, log_profile(profile))))
+    else:
+        distribution = tuple(window_probabilities(sequence, profile))
     index = biased_random(distribution)
     return sequence[index:index + k]
 
 
-def gibbs_motifs_search(sequences, k, n, N=1, cromwell=True, score=motifs_entropy):
+def single_gibbs_motifs_search(sequences, k, n, cromwell=True, score=motifs_entropy, log_space=False):
     """
     Tries to find a list of repeated motifs in a list of sequences.
     This is a Monte Carlo algorithm, but it is different from randomized_motifs_search because it uses
@@ -351,44 +427,69 @@ def gibbs_motifs_search(sequences, k, n, N=1, cromwell=True, score=motifs_entrop
     :param sequences: ths list of sequences
     :param k: the wanted size of the motifs
     :param n: the number of iterations
-    :param N: the number of time ro run the algorithm
     :param score: the scoring function to rate motifs. This function should return a number in [0; +inf[, going towards
     0 as the motifs improve
-    :return: a list of repeated motifs
+    :param log_space: should the k-mers be weighted in log-space (see profile_random_kmer)?
+    :return: (the score of the motifs, a list of repeated motifs)
     """
-
-    def single_gibbs_motifs_search(sequences, k, n, cromwell=True, score=motifs_entropy):
+    codes = [encode_nucleotides(sequence, strict=False) for sequence in sequences]  # Hashed once for all iterations
+    # The first list of motifs is randomly sampled from the sequences
+    positions = random_positions(sequences, k)
+    motifs_list = [sequence[p:p + k] for sequence, p in zip(sequences, positions)]
+    motifs_codes = [sequence_codes[p:p + k] for sequence_codes, p in zip(codes, positions)]
+    number_of_motifs = len(motifs_list)
+    # The counts of the motifs are updated when one of them is replaced, instead of counting all of them again, and
+    # the usual scores are computed from them
+    counts = CountMatrix.from_codes(motifs_codes, k)
+    score_counts = _COUNTS_SCORES.get(score)
+    best_motifs = (score_counts(counts) if score_counts else score(motifs_list), motifs_list)
+    # The distribution of the k-mers of a sequence only depends on the other motifs, so their positions identify it
+    distributions = DistributionCache()
+
+    def weights(index):
         """
-        Tries to find a list of repeated motifs in a list of sequences.
-        This is a Monte Carlo algorithm, but it is different from randomized_motifs_search because it uses
-        Gibbs sampling.
-        :param sequences: ths list of sequences
-        :param k: the wanted size of the motifs
-        :param n: the number of iterations
-        :param score: the scoring function to rate motifs. This function should return a number in [0; +inf[, going towards
-    0 as the motifs improve
-        :return: a list of repeated motifs
+        Weight the k-mers of a sequence by the profile of all the motifs except the one from this sequence (to avoid
+        biasing the randomness to choose it again)
         """
-        motifs_list = random_motifs(sequences, k)  # The first list of motifs is randomly sampled from the sequences
-        number_of_motifs = len(motifs_list)
-        best_motifs = (score(motifs_list), motifs_list)  # (score_of_motifs, list_of_motifs)
-        for j in range(n):
-            index = random.randint(0, number_of_motifs - 1)  # We choose one of the motifs
-            # All the motifs, except the chosen one
-            motifs_except_chosen = [m for i, m in enumerate(motifs_list) if i != index]
-            # Compute the profile of the motifs (without the chosen motif to avoid biasing the randomness
-            # to choose it again)
-            motifs_profile = profile(motifs_except_chosen, cromwell)
-            # We replace the chosen motif bu a new one which is "randomly" selected but biased by the profile
-            motifs_list[index] = profile_random_kmer(motifs_profile, sequences[index])
-            s = score(motifs_list)
-            if s < best_motifs[0]:  # If the scor of the new motifs list is better than the current best
-                best_motifs = (s, list(motifs_list))
-        return best_motifs
-
-    best_motifs = single_gibbs_motifs_search(sequences, k, n, cromwell, score=score)
+        motifs_profile = counts.profile_without(motifs_codes[index], cromwell)
+        if log_space:
+            return log_weights_to_weights(code_log_probabilities(codes[index], log_profile(motifs_profile)))
+        return code_probabilities(codes[index], motifs_profile)
+
+    for j in range(n):
+        index = random.randint(0, number_of_motifs - 1)  # We choose one of the motifs
+        # We replace the chosen motif bu a new one which is "randomly" selected but biased by the profile (see
+        # profile_random_kmer)
+        key = (index, tuple(positions[:index]), tuple(positions[index + 1:]))
+        position = distributions.sample_key(key, lambda: weights(index))
+        positions[index] = position
+        new_codes = codes[index][position:position + k]
+        counts.replace(motifs_codes[index], new_codes)
+        motifs_codes[index] = new_codes
+        motifs_list[index] = sequences[index][position:position + k]
+        s = score_counts(counts) if score_counts else score(motifs_list)
+        if s < best_motifs[0]:  # If the scor of the new motifs list is better than the current best
+            best_motifs = (s, list(motifs_list))
+    return best_motifs
+
+
+def gibbs_motifs_search(sequences, k, n, N=1, cromwell=True, score=motifs_entropy, log_space=False):
+    """
+    Tries to find a list of repeated motifs in a list of sequences.
+    This is a Monte Carlo algorithm, but it is different from randomized_motifs_search because it uses
+    Gibbs sampling.
+    :param sequences: ths list of sequences
+    :param k: the wanted size of the motifs
+    :param n: the number of iterations
+    :param N: the number of time ro run the algorithm
+    :param score: the scoring function to rate motifs. This function should return a number in [0; +inf[, going towards
+    0 as the motifs improve
+    :param log_space: should the k-mers be weighted in log-space (see profile_random_kmer)?
+    :return: a list of repeated motifs
+    """
+    best_motifs = single_gibbs_motifs_search(sequences, k, n, cromwell, score=score, log_space=log_space)
     for i in range(0, N - 1):  # N - 1, because we already performed a first search
-        next_motifs = single_gibbs_motifs_search(sequences, k, n, cromwell, score=score)
+        next_motifs = single_gibbs_motifs_search(sequences, k, n, cromwell, score=score, log_space=log_space)
         if next_motifs[0] < best_motifs[0]:  # If the score is better, we have a new best motifs list
             best_motifs = next_motifs
     return best_motifs[1]  # We return only the list of motifs, not the score
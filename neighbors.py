@@ -1,4 +1,7 @@
+from itertools import combinations, product
+
 from hamming_distance import hamming_distance
+from hash_kmer import hash_kmer, only_nucleotides, unhash_kmer
 
 
 def immediate_neighbors(kmer):
@@ -12,6 +15,40 @@ def immediate_neighbors(kmer):
     return neighbors
 
 
+def neighbor_hashes(kmer_hash, k, distance):
+    """
+    Generator to iterate over the hashes of all the neighbors of a hashed k-mer, each one exactly once.
+    The neighbors are enumerated directly: for each set of at most `distance` mismatch positions, every nucleotide is
+    substituted by each of the 3 other ones, which is a XOR of its 2 bits with 1, 2 or 3. No distance is computed and no
+    intermediate set is built.
+    :param kmer_hash: the hash of the k-mer (see hash_kmer)
+    :param k: the size of the k-mer
+    :param distance: the maximum distance between two k-mers for them to be neighbors
+    :return: a generator of hashes, the k-mer itself first
+    """
+    # substitutions[i] are the XOR masks changing the i-th nucleotide into the 3 other ones
+    substitutions = [(1 << shift, 2 << shift, 3 << shift) for shift in range(2 * (k - 1), -1, -2)]
+    for mismatches in range(min(distance, k) + 1):
+        for positions in combinations(substitutions, mismatches):
+            for masks in product(*positions):
+                yield kmer_hash ^ sum(masks)  # The masks do not overlap, so their sum is their union
+
+
+def iter_neighbors(kmer, distance, hashes=False):
+    """
+    Generator to iterate over all the neighbors of a k-mer, without building the neighborhood
+    :param kmer: the k-mer (a string containing only A, C, G and T)
+    :param distance: the maximum distance between two k-mers for them to be neighbors
+    :param hashes: if True, generate the hashes of the neighbors instead of strings (see hash_kmer)
+    :return: a generator of neighbors, each one exactly once
+    """
+    k = len(kmer)
+    codes = neighbor_hashes(hash_kmer(kmer), k, distance)
+    if hashes:
+        return codes
+    return (unhash_kmer(code, k) for code in codes)
+
+
 def neighbors(kmer, distance):
     """
     Return a set of all the neighbors of a k-mer
@@ -19,6 +56,20 @@ def neighbors(kmer, distance):
     :param distance: the maximum distance between two k-mers for them to be neighbors
     :return: the set of all neighbors
     """
+    if len(kmer) == 0:
+        return {}
+    if distance == 0:
+        return {kmer}
+    if not only_nucleotides(kmer):
+        return _recursive_neighbors(kmer, distance)
+    return set(iter_neighbors(kmer, distance))
+
+
+def _recursive_neighbors(kmer, distance):
+    """
+    Return a set of all the neighbors of a k-mer, built from the neighbors of its suffix (this version also works with
+    other characters than A, C, G and T)
+    """
     k = len(kmer)
     if k == 0:
         return {}
@@ -27,7 +78,7 @@ def neighbors(kmer, distance):
     if k == 1:
         return {'A', 'T', 'C', 'G'}
     suffix = kmer[1:]
-    suffix_neighbors = neighbors(suffix, distance)
+    suffix_neighbors = _recursive_neighbors(suffix, distance)
     result = set()
     for suffix_neighbor in suffix_neighbors:
         if hamming_distance(suffix_neighbor, suffix) == distance:
@@ -0,0 +1,172 @@
+from itertools import chain, islice
+
+from hash_kmer import encode_nucleotides, rolling_kmer_hashes, unhash_nucleotide
+
+# Every byte stores 4 nucleotides, the first one being in the 2 most significant bits.
+# These tables give, for each possible byte, the 4 hashes (resp. the 4 nucleotides) it contains.
+_UNPACKED_CODES = [((b >> 6) & 3, (b >> 4) & 3, (b >> 2) & 3, b & 3) for b in range(256)]
+_UNPACKED_NUCLEOTIDES = [''.join(unhash_nucleotide(c) for c in codes) for codes in _UNPACKED_CODES]
+
+# Number of nucleotides decoded at once when iterating over a packed sequence
+_BLOCK_SIZE = 1 << 16
+
+
+def _pack4(c1, c2, c3, c4):
+    return (c1 << 6) | (c2 << 4) | (c3 << 2) | c4
+
+
+class PackedSequence:
+    """
+    A DNA sequence stored with 2 bits per nucleotide (A=0, C=1, G=2, T=3, see hash_kmer.hash_nucleotide), so it
+    takes 4 times less memory than the same sequence stored as a string.
+
+    It behaves like a read-only string: it has a length, can be indexed, sliced and iterated over nucleotide after
+    nucleotide. Slicing does not copy anything, the slice is a view sharing the memory of the original sequence.
+    """
+
+    def __init__(self, data, start, length):
+        """
+        Create a view over packed data. Use PackedSequence.from_string to pack a string.
+        :param data: the packed data (4 nucleotides per byte)
+        :param start: the index of the first nucleotide of the sequence in the data
+        :param length: the number of nucleotides in the sequence
+        """
+        self._data = data
+        self._start = start
+        self._length = length
+
+    @classmethod
+    def from_string(cls, sequence):
+        """
+        Pack a string
+        :param sequence: the sequence (only uppercase A, C, G and T are allowed)
+        :return: the packed sequence
+        """
+        codes = encode_nucleotides(sequence)
+        padding = -len(codes) % 4
+        if padding:
+            codes += bytes(padding)
+        data = bytearray(map(_pack4, codes[0::4], codes[1::4], codes[2::4], codes[3::4]))
+        return cls(data, 0, len(sequence))
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes used to store the nucleotides of the whole underlying sequence
+        """
+        return len(self._data)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._length)
+            if step != 1:
+                return str(self)[item]
+            return PackedSequence(self._data, self._start + start, max(0, stop - start))
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError("index out of range")
+        return unhash_nucleotide(self.code(item))
+
+    def __iter__(self):
+        for block in self._blocks(_BLOCK_SIZE, 0):
+            yield from block
+
+    def __str__(self):
+        return self._decode(0, self._length)
+
+    def __repr__(self):
+        if self._length > 20:
+            return "PackedSequence('{}...', length={})".format(self._decode(0, 20), self._length)
+        return "PackedSequence('{}')".format(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (str, PackedSequence)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))  # So that a packed sequence and the equivalent string are the same dictionary key
+
+    def code(self, position):
+        """
+        Return the hash of the nucleotide at a certain position
+        :param position: the position in the sequence
+        :return: the hash of the nucleotide
+        """
+        position += self._start
+        return (self._data[position >> 2] >> (6 - 2 * (position & 3))) & 3
+
+    def codes(self):
+        """
+        Generator to iterate over the hashes of the nucleotides of the sequence
+        """
+        first_byte = self._start >> 2
+        last_byte = (self._start + self._length + 3) >> 2
+        unpacked = chain.from_iterable(map(_UNPACKED_CODES.__getitem__, memoryview(self._data)[first_byte:last_byte]))
+        offset = self._start & 3
+        return islice(unpacked, offset, offset + self._length)
+
+    def kmer_code(self, position, k):
+        """
+        Return the hash of the k-mer at a certain position (same as hash_kmer.hash_kmer, without building the k-mer)
+        :param position: the position of the k-mer
+        :param k: the size of the k-mer
+        :return: the hash of the k-mer
+        """
+        if position < 0 or position + k > self._length:
+            raise IndexError("k-mer out of range")
+        result = 0
+        for i in range(position, position + k):
+            result = (result << 2) | self.code(i)
+        return result
+
+    def kmer_codes(self, k):
+        """
+        Generator to iterate over the hashes of all the k-mers of the sequence, without building any k-mer.
+        Generates n-k+1 elements with n being the size of the sequence.
+        :param k: the size of the k-mers
+        """
+        return rolling_kmer_hashes(self, k)
+
+    def kmers(self, k):
+        """
+        Generator to iterate over the sequence k-mer after k-mer (as strings).
+        Only a block of the sequence is decoded at a time, so the sequence is never unpacked as a whole.
+        :param k: the size of the k-mers
+        """
+        for block in self._blocks(_BLOCK_SIZE, k - 1):
+            for i in range(0, len(block) - k + 1):
+                yield block[i:i + k]
+
+    def _blocks(self, size, overlap):
+        """
+        Generator to iterate over the sequence decoded as strings of a given size, each block starting with the last
+        `overlap` nucleotides of the previous one.
+        :param size: the number of new nucleotides in each block
+        :param overlap: the number of nucleotides shared between two consecutive blocks
+        """
+        for start in range(0, self._length, size):
+            begin = max(0, start - overlap)
+            yield self._decode(begin, min(start + size, self._length))
+            if start + size >= self._length:
+                return
+
+    def _decode(self, start, stop):
+        """
+        Unpack a part of the sequence as a string
+        :param start: the start of the part (included)
+        :param stop: the end of the part (excluded)
+        :return: the string
+        """
+        if stop <= start:
+            return ""
+        start += self._start
+        stop += self._start
+        data = memoryview(self._data)[start >> 2:(stop + 3) >> 2]
+        decoded = ''.join(map(_UNPACKED_NUCLEOTIDES.__getitem__, data))
+        offset = start & 3
+        return decoded[offset:offset + stop - start]
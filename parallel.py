@@ -0,0 +1,156 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import median_string as sequential_median
+from motifs import motifs_entropy, single_gibbs_motifs_search, single_randomized_motifs_search
+
+# Each worker gets about this number of tasks, so that a worker finishing early can take over the work of the others
+_TASKS_PER_WORKER = 4
+
+
+def median_string(k, dna, workers=None):
+    """
+    Same as median_string.median_string, on multiple processes: the k-mers are split by their first nucleotides, and
+    the subtrees of the search are explored in parallel.
+    :param k: the size of the k-mer to find
+    :param dna: a list of DNA sequences
+    :param workers: the number of processes (None for the number of processors)
+    :return: the same k-mer as median_string.median_string
+    """
+    patterns = _parallel_branch_and_bound(k, dna, False, workers)
+    return patterns[0] if patterns else None
+
+
+def median_strings(k, dna, workers=None):
+    """
+    Same as median_string.median_strings, on multiple processes (see median_string)
+    :param k: the size of the k-mer to find
+    :param dna: a list of DNA sequences
+    :param workers: the number of processes (None for the number of processors)
+    :return: the same k-mers as median_string.median_strings, in the same order
+    """
+    return _parallel_branch_and_bound(k, dna, True, workers)
+
+
+def _parallel_branch_and_bound(k, dna, all_optimal, workers):
+    """
+    Run median_string._branch_and_bound, with each search of the tree split between processes by prefix
+    """
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        return sequential_median._branch_and_bound(k, dna, all_optimal)
+    tasks = workers * _TASKS_PER_WORKER
+    with ProcessPoolExecutor(workers) as executor:
+
+        def search(k, sequences, suffix_bounds, all_optimal):
+            """
+            Search each subtree in a process, and merge the results in the order of the prefixes (which is the order of
+            the sequential search)
+            """
+            prefix_length = 0
+            while 4 ** prefix_length < tasks and prefix_length < k:
+                prefix_length += 1
+            prefixes = [''.join(p) for p in product(sequential_median._NUCLEOTIDES, repeat=prefix_length)]
+            futures = [executor.submit(sequential_median._search, k, sequences, suffix_bounds, all_optimal, prefix)
+                       for prefix in prefixes]
+            best_distance, best = None, []
+            for distance, patterns in (future.result() for future in futures):
+                if not patterns:  # Nothing better than the upper bound in this subtree
+                    continue
+                if best_distance is None or distance < best_distance:
+                    best_distance, best = distance, list(patterns)
+                elif distance == best_distance and all_optimal:
+                    best.extend(patterns)
+            return best_distance, best
+
+        return sequential_median._branch_and_bound(k, dna, all_optimal, search)
+
+
+def randomized_motifs_search(sequences, k, n=1, cromwell=True, log_space=False, workers=None, seed=None):
+    """
+    Same as motifs.randomized_motifs_search, with the n searches distributed between processes.
+    Each search is seeded with its own seed derived from `seed` (see restart_seeds), so the result only depends on the
+    seed, not on the number of processes nor on the order in which the searches end.
+    :param sequences: the list of sequences
+    :param k: the size of the motifs to search for
+    :param n: the number of times to run the search (set higher for better results)
+    :param cromwell: should we use Cromwell's rule when generating the profile matrix?
+    :param log_space: should the k-mers be scored in log-space (see motifs.most_probable_kmer_from_profile)?
+    :param workers: the number of processes (None for the number of processors)
+    :param seed: the seed of the searches (None for a random one)
+    :return: a probable list of the most-probable motifs
+    """
+    return _parallel_restarts(single_randomized_motifs_search, (sequences, k, cromwell, log_space), n, workers, seed)
+
+
+def gibbs_motifs_search(sequences, k, n, N=1, cromwell=True, score=motifs_entropy, log_space=False, workers=None,
+                        seed=None):
+    """
+    Same as motifs.gibbs_motifs_search, with the N searches distributed between processes (see
+    randomized_motifs_search).
+    :param sequences: ths list of sequences
+    :param k: the wanted size of the motifs
+    :param n: the number of iterations
+    :param N: the number of time ro run the algorithm
+    :param score: the scoring function to rate motifs (it has to be defined at the top level of a module, to be sent to
+    the other processes)
+    :param log_space: should the k-mers be weighted in log-space (see motifs.profile_random_kmer)?
+    :param workers: the number of processes (None for the number of processors)
+    :param seed: the seed of the searches (None for a random one)
+    :return: a list of repeated motifs
+    """
+    return _parallel_restarts(single_gibbs_motifs_search, (sequences, k, n, cromwell, score, log_space), N, workers,
+                              seed)
+
+
+def restart_seeds(seed, n):
+    """
+    Derive the seeds of n independent runs of a randomized search from a single seed
+    :param seed: the seed (None for a random one)
+    :param n: the number of runs
+    :return: a list of n seeds
+    """
+    generator = random.Random(seed)
+    return [generator.getrandbits(64) for _ in range(n)]
+
+
+def _parallel_restarts(single_search, arguments, n, workers, seed):
+    """
+    Run n times a randomized search in parallel, and keep the best result (the first one in case of a tie, as the
+    sequential version)
+    :param single_search: the search, returning (score, result)
+    :param arguments: the arguments of the search
+    :return: the best result
+    """
+    workers = workers or os.cpu_count()
+    seeds = restart_seeds(seed, max(n, 1))
+    if workers == 1:  # The searches run in this process: the random state of the caller is restored afterwards
+        state = random.getstate()
+        try:
+            return _run_restarts(single_search, arguments, seeds, 0)[2]
+        finally:
+            random.setstate(state)
+    number_of_tasks = min(len(seeds), workers * _TASKS_PER_WORKER)
+    bounds = [i * len(seeds) // number_of_tasks for i in range(number_of_tasks + 1)]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_run_restarts, single_search, arguments, seeds[start:stop], start)
+                   for start, stop in zip(bounds, bounds[1:])]
+        # Results are (score, index of the run, result): the best score wins, then the first run
+        return min((future.result() for future in futures), key=lambda result: result[:2])[2]
+
+
+def _run_restarts(single_search, arguments, seeds, first_index):
+    """
+    Run a randomized search once for each seed (in a worker process)
+    :param first_index: the index of the first run among all the runs
+    :return: (best score, index of the run, best result)
+    """
+    best = None
+    for index, seed in enumerate(seeds, first_index):
+        random.seed(seed)  # Functions of motifs use the global generator, which is not shared between processes
+        score, result = single_search(*arguments)
+        if best is None or score < best[0]:
+            best = (score, index, result)
+    return best
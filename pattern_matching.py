@@ -1,13 +1,17 @@
-from hamming_distance import hamming_distance
+from approximate_matching import approximate_matches
+from genome_index import FMIndex
+from sequence_io import read_sequence
 
 
 def pattern_matching(genome, sequence):
     """
     Return a set of starting positions where sequence is found in genome
-    :param genome: the genome
+    :param genome: the genome, or its FMIndex (much faster when searching many sequences in the same genome)
     :param sequence: the sequence
     :return: a ascending sorted list of positions
     """
+    if isinstance(genome, FMIndex):
+        return genome.locate(sequence)
     result = set()
     index = genome.find(sequence)
     while index != -1:
@@ -19,21 +23,16 @@ def pattern_matching(genome, sequence):
 def general_pattern_matching(genome, sequence, distance):
     """
     Return a set of starting positions where sequence is found in genome
-    :param genome: the genome
+    :param genome: the genome (a string or a PackedSequence)
     :param sequence: the sequence
+    :param distance: the maximum number of mismatches
     :return: a ascending sorted list of positions
     """
-    result = set()
-    len_sequence = len(sequence)
-    max = len(genome) - len_sequence
-    for i in range(0, max + 1):
-        if hamming_distance(genome[i:i + len_sequence], sequence) <= distance:
-            result.add(i)
-    return sorted(result)
+    return approximate_matches(genome, sequence, distance)
 
 
 def __main__():
-    genome = open("genome.txt", "r").read()
+    genome = str(read_sequence("genome.txt"))
     pattern = "CTTGATCAT"
 
     print(' '.join(str(x) for x in pattern_matching(genome, pattern)))
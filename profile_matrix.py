@@ -0,0 +1,371 @@
+import math
+from itertools import chain, compress, repeat
+from operator import add, mul
+
+from hash_kmer import encode_nucleotides
+
+
+def count_matrix(motifs):
+    """
+    Count the nucleotides in each column of a list of motifs.
+    The motifs are hashed once and concatenated, so that a column is a single slice (one motif every k bytes) and its
+    nucleotides are counted in C, instead of transposing a matrix of characters.
+
+    Example:
+    ['ATGCT',
+     'AAGCC']
+    becomes
+    [[2, 0, 0, 0],
+     [1, 0, 0, 1],
+     [0, 0, 2, 0],
+     [0, 2, 0, 0],
+     [0, 1, 0, 1]]
+
+    :param motifs: the list of motifs (a list of strings, cut to the size of the shortest one)
+    :return: a list with the counts of A, C, G and T (respectively) for each column
+    """
+    motifs = list(motifs)
+    if not motifs:
+        return []
+    k = min(len(motif) for motif in motifs)
+    codes = b''.join(encode_nucleotides(motif[:k], strict=False) for motif in motifs)
+    return [[column.count(code) for code in range(4)] for column in (codes[j::k] for j in range(k))]
+
+
+def profile_from_counts(counts, number_of_motifs, cromwell=False):
+    """
+    Compute a profile matrix from the counts of the nucleotides of some motifs (see motifs.profile)
+    :param counts: the counts (see count_matrix)
+    :param number_of_motifs: the number of motifs counted
+    :param cromwell: whether the probabilities should follow Cromwell's rule (see motifs.profile)
+    :return: the profile matrix, a list with the probabilities of A, C, G and T (respectively) for each column
+    """
+    if cromwell:
+        # Every nucleotide is considered to appear once more, to avoid null probabilities
+        len_vec = float(number_of_motifs + 4)
+        return [[(count + 1) / len_vec for count in column] for column in counts]
+    len_vec = float(number_of_motifs)
+    return [[count / len_vec for count in column] for column in counts]
+
+
+def window_probabilities(sequence, profile_matrix):
+    """
+    Compute the probability of every k-mer of a sequence to be generated by a profile matrix (k being the size of the
+    profile).
+    The sequence is hashed once, then each column of the profile is applied to all the k-mers at once: the
+    probabilities of the nucleotides facing the column are gathered and multiplied with the products of the previous
+    columns (in C, by map). The products are done in the same order as motifs.probability_from_profile, so the results
+    are exactly the same.
+
+    Efficiency: O(kn) with n being the size of the sequence, but with only k Python-level steps
+
+    :param sequence: the sequence
+    :param profile_matrix: the profile matrix
+    :return: a list of n-k+1 probabilities, the i-th one being the probability of the k-mer at position i
+    """
+    return code_probabilities(encode_nucleotides(sequence, strict=False), profile_matrix)
+
+
+def code_probabilities(codes, profile_matrix):
+    """
+    Same as window_probabilities, for a sequence already hashed (to hash a sequence once and use it with many profiles)
+    :param codes: the hashed sequence (see hash_kmer.encode_nucleotides, with strict=False)
+    :param profile_matrix: the profile matrix
+    :return: a list of n-k+1 probabilities, the i-th one being the probability of the k-mer at position i
+    """
+    k = len(profile_matrix)
+    number_of_windows = len(codes) - k + 1
+    if number_of_windows <= 0:
+        return []
+    probabilities = [1] * number_of_windows
+    for j, vector in enumerate(profile_matrix):
+        lookup = list(vector) + [0]  # Something else than a nucleotide cannot be generated by the profile
+        probabilities = list(map(mul, probabilities, map(lookup.__getitem__, codes[j:j + number_of_windows])))
+    return probabilities
+
+
+def log_profile(profile_matrix):
+    """
+    Convert a profile matrix to log-probabilities, to score k-mers with sums instead of products (see
+    code_log_probabilities)
+    :param profile_matrix: the profile matrix
+    :return: a list with the natural logarithms of the probabilities of A, C, G and T (respectively) for each column,
+    -inf for a null probability
+    """
+    return [[math.log(p) if p > 0 else -math.inf for p in vector] for vector in profile_matrix]
+
+
+def window_log_probabilities(sequence, log_profile_matrix):
+    """
+    Same as window_probabilities, in log-space: the log-probability of a k-mer is the sum of the log-probabilities of
+    its nucleotides. Unlike the products of probabilities, the sums do not underflow to 0 for long k-mers.
+    :param sequence: the sequence
+    :param log_profile_matrix: the profile matrix in log-space (see log_profile)
+    :return: a list of n-k+1 log-probabilities, the i-th one being the log-probability of the k-mer at position i
+    """
+    return code_log_probabilities(encode_nucleotides(sequence, strict=False), log_profile_matrix)
+
+
+def code_log_probabilities(codes, log_profile_matrix):
+    """
+    Same as window_log_probabilities, for a sequence already hashed
+    :param codes: the hashed sequence (see hash_kmer.encode_nucleotides, with strict=False)
+    :param log_profile_matrix: the profile matrix in log-space (see log_profile)
+    :return: a list of n-k+1 log-probabilities, the i-th one being the log-probability of the k-mer at position i
+    """
+    k = len(log_profile_matrix)
+    number_of_windows = len(codes) - k + 1
+    if number_of_windows <= 0:
+        return []
+    scores = [0.0] * number_of_windows
+    for j, vector in enumerate(log_profile_matrix):
+        lookup = list(vector) + [-math.inf]  # Something else than a nucleotide cannot be generated by the profile
+        scores = list(map(add, scores, map(lookup.__getitem__, codes[j:j + number_of_windows])))
+    return scores
+
+
+def log_weights_to_weights(log_weights):
+    """
+    Convert log-weights to weights proportional to them, normalized by the biggest one (log-sum-exp trick): the biggest
+    weight is 1, so the weights do not all underflow to 0 even if the probabilities they come from do
+    :param log_weights: the log-weights
+    :return: a list of weights in [0; 1]
+    """
+    maximum = max(log_weights, default=-math.inf)
+    if maximum == -math.inf:  # Every weight is null
+        return [0.0] * len(log_weights)
+    return [math.exp(x - maximum) for x in log_weights]
+
+
+# Number of columns of a profile scored at once by most_probable_window (a table of 4^4 products per chunk of columns)
+_CHUNK = 4
+
+# Relative margin under which the approximate score of a window is close enough to the best one to be checked exactly
+_MARGIN = 1e-9
+
+# Below this probability, the products of probabilities may lose precision (subnormal numbers)
+_SMALLEST_PROBABILITY = 1e-250
+
+
+def first_most_probable(scores, log_space=False):
+    """
+    Find the position of the first of the most probable k-mers.
+    Sums of log-probabilities are rounded differently depending on the order of the nucleotides, so k-mers with the
+    same probability can get log-probabilities differing by rounding errors: in log-space, the first k-mer with a score
+    within _MARGIN of the best one is chosen, as the products of probabilities would tie
+    :param scores: the probabilities (or log-probabilities) of the k-mers
+    :param log_space: are the scores log-probabilities?
+    :return: the position of the first most probable k-mer
+    """
+    best = max(scores)
+    if not log_space or best == -math.inf:
+        return scores.index(best)
+    threshold = best - _MARGIN * (1 - best)  # Log-probabilities are negative
+    return next(compress(range(len(scores)), map(threshold.__le__, scores)))
+
+
+def window_chunks(codes):
+    """
+    Hash the nucleotides of a sequence by chunks of 4 (see most_probable_window): the i-th hash is the hash of the
+    4-mer at position i (the sequence being padded with A), so that 4 columns of a profile can be applied at once.
+    :param codes: the hashed sequence (see hash_kmer.encode_nucleotides, with strict=False)
+    :return: a list of len(codes) hashes, or None if the sequence contains something else than nucleotides
+    """
+    if 4 in codes:
+        return None
+    padded = codes + bytes(_CHUNK - 1)
+    chunks = list(padded[:len(codes)])
+    for j in range(1, _CHUNK):
+        chunks = list(map(add, map(mul, chunks, repeat(4)), padded[j:j + len(codes)]))
+    return chunks
+
+
+def most_probable_window(codes, profile_matrix, log_space=False, chunks=None):
+    """
+    Find the position of the most profile-probable k-mer in a hashed sequence, the first one if several are the most
+    probable: the same position as the maximum of code_probabilities (or of code_log_probabilities, up to rounding
+    errors, see first_most_probable).
+    If the chunks of the sequence are given (see window_chunks), the products of 4 probabilities of the profile are
+    computed once for every 4-mer, and every window is scored with k/4 products instead of k. As the products are not
+    done in the same order, these scores can differ from code_probabilities by rounding errors, so the windows with a
+    score close to the best one are scored again exactly, in the same order as code_probabilities.
+
+    Efficiency: O(kn), but about 4 times faster with the chunks
+
+    :param codes: the hashed sequence (see hash_kmer.encode_nucleotides, with strict=False)
+    :param profile_matrix: the profile matrix
+    :param log_space: should the k-mers be scored in log-space (see code_log_probabilities)?
+    :param chunks: the chunks of the sequence (see window_chunks), None to score the windows column by column
+    :return: the position of the most probable k-mer, None if the sequence is shorter than the profile
+    """
+    k = len(profile_matrix)
+    number_of_windows = len(codes) - k + 1
+    if number_of_windows <= 0:
+        return None
+    if log_space:
+        profile_matrix = log_profile(profile_matrix)
+    exact_scores = code_log_probabilities if log_space else code_probabilities
+    if chunks is not None and k > _CHUNK:
+        operation, neutral = (add, 0.0) if log_space else (mul, 1)
+        scores = None
+        for start in range(0, k, _CHUNK):
+            columns = list(profile_matrix[start:start + _CHUNK])
+            columns += [[neutral] * 4] * (_CHUNK - len(columns))  # The last chunk is completed by neutral columns
+            table = list(columns[0])  # table[hash of a 4-mer] is the product of the probabilities of its nucleotides
+            for vector in columns[1:]:
+                products = chain.from_iterable(zip(table, table, table, table))  # Each product once per nucleotide
+                table = list(map(operation, products, list(vector) * len(table)))
+            chunk_scores = map(table.__getitem__, chunks[start:start + number_of_windows])
+            scores = list(chunk_scores) if scores is None else list(map(operation, scores, chunk_scores))
+        best = max(scores)
+        if log_space and best > -math.inf:
+            threshold = best - _MARGIN * (1 - best)  # Log-probabilities are negative
+        elif not log_space and best >= _SMALLEST_PROBABILITY:
+            threshold = best * (1 - _MARGIN)
+        else:
+            threshold = None  # Precision is lost: every window is scored exactly
+        if threshold is not None:
+            candidates = list(compress(range(number_of_windows), map(threshold.__le__, scores)))
+            candidates_scores = [exact_scores(codes[i:i + k], profile_matrix)[0] for i in candidates]
+            return candidates[first_most_probable(candidates_scores, log_space)]
+    return first_most_probable(exact_scores(codes, profile_matrix), log_space)
+
+
+class CountMatrix:
+    """
+    Counts of the nucleotides in each column of a list of motifs (see count_matrix), updated in O(k) when a motif is
+    added or removed, instead of counting all the motifs again.
+    The scores of the motifs are computed from the counts, and the entropy of a column is only computed again when the
+    column changes.
+    """
+
+    def __init__(self, k):
+        """
+        Create the counts of an empty list of motifs
+        :param k: the size of the motifs
+        """
+        self.counts = [[0, 0, 0, 0] for _ in range(k)]
+        self.number_of_motifs = 0
+        self._entropies = [None] * k  # The entropy of each column, None if it has to be computed again
+
+    @classmethod
+    def from_codes(cls, motifs_codes, k):
+        """
+        Count a list of motifs
+        :param motifs_codes: the hashed motifs (see hash_kmer.encode_nucleotides, with strict=False)
+        :param k: the size of the motifs
+        :return: the counts
+        """
+        counts = cls(k)
+        for codes in motifs_codes:
+            counts.add(codes)
+        return counts
+
+    def add(self, codes):
+        """
+        Count a new motif
+        :param codes: the hashed motif
+        """
+        self._update(codes, 1)
+
+    def remove(self, codes):
+        """
+        Stop counting a motif
+        :param codes: the hashed motif
+        """
+        self._update(codes, -1)
+
+    def _update(self, codes, delta):
+        self._entropies = [None] * len(self.counts)  # The entropy of every column depends on the number of motifs
+        self.number_of_motifs += delta
+        for column, code in zip(self.counts, codes):
+            if code < 4:
+                column[code] += delta
+
+    def replace(self, old_codes, new_codes):
+        """
+        Replace a counted motif by another one (only the columns where they differ change)
+        :param old_codes: the hashed motif to remove
+        :param new_codes: the hashed motif to add
+        """
+        for j, (old, new) in enumerate(zip(old_codes, new_codes)):
+            if old != new:
+                if old < 4:
+                    self.counts[j][old] -= 1
+                if new < 4:
+                    self.counts[j][new] += 1
+                self._entropies[j] = None
+
+    def profile(self, cromwell=False):
+        """
+        Compute the profile matrix of the counted motifs (see motifs.profile)
+        :param cromwell: whether the probabilities should follow Cromwell's rule
+        :return: the profile matrix
+        """
+        return profile_from_counts(self.counts, self.number_of_motifs, cromwell)
+
+    def profile_without(self, codes, cromwell=False):
+        """
+        Compute the profile matrix of the counted motifs except one, without changing the counts
+        :param codes: the hashed motif to leave out (it has to be counted)
+        :param cromwell: whether the probabilities should follow Cromwell's rule
+        :return: the profile matrix
+        """
+        counts = [list(column) for column in self.counts]
+        for column, code in zip(counts, codes):
+            if code < 4:
+                column[code] -= 1
+        return profile_from_counts(counts, self.number_of_motifs - 1, cromwell)
+
+    def entropy(self):
+        """
+        Compute the entropy of the counted motifs, exactly as motifs.motifs_entropy
+        :return: the entropy
+        """
+        entropies = self._entropies
+        len_vec = float(self.number_of_motifs)
+        for j, column in enumerate(self.counts):
+            if entropies[j] is None:
+                entropies[j] = _column_entropy(column, len_vec)
+        return sum(entropies)
+
+    def entropy_bound(self, number_of_motifs):
+        """
+        Compute a lower bound of the entropy of the counted motifs once other motifs are added to them, whatever these
+        motifs are: the entropy of a column is the lowest when all the added motifs have its most frequent nucleotide
+        (or, because of other characters, none of them has a nucleotide there)
+        :param number_of_motifs: the number of motifs once the other motifs are added
+        :return: the lower bound
+        """
+        missing = number_of_motifs - self.number_of_motifs
+        len_vec = float(number_of_motifs)
+        bound = 0
+        for column in self.counts:
+            most_frequent = column.index(max(column))
+            completed = list(column)
+            completed[most_frequent] += missing
+            bound += min(_column_entropy(column, len_vec), _column_entropy(completed, len_vec))
+        return bound
+
+    def score(self):
+        """
+        Compute the score of the counted motifs, exactly as motifs.score: the hamming distance between the motifs and
+        their consensus is the number of nucleotides different from the most frequent one in each column
+        :return: the score
+        """
+        return sum(self.number_of_motifs - max(column) for column in self.counts)
+
+
+def _column_entropy(column, len_vec):
+    """
+    Compute the entropy of a column of counts (see motifs.motifs_entropy)
+    :param column: the counts of A, C, G and T
+    :param len_vec: the number of motifs
+    :return: the entropy
+    """
+    column_entropy = 0
+    for count in column:
+        if count != 0:  # We avoid to compute log_2(0), and we consider it to be zero
+            x = count / len_vec
+            column_entropy += x * math.log(x, 2)
+    return -column_entropy
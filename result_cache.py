@@ -0,0 +1,248 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import struct
+import tempfile
+import time
+
+from packed_sequence import PackedSequence
+from sequence_io import MappedSequence
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: the processes sharing a cache do not lock it while evicting
+    fcntl = None
+
+# Directory of the default cache, relative to the working directory
+DEFAULT_DIRECTORY = os.environ.get('RESULT_CACHE', '.result_cache')
+
+_SUFFIX = '.pickle'
+_TEMPORARY_PREFIX = '.tmp-'
+
+# A temporary file older than this (in seconds) was left by a process that died while writing it
+_STALE_TEMPORARY = 3600
+
+# Number of nucleotides hashed at a time in the key of a sequence
+_CHUNK_SIZE = 1 << 20
+
+
+class ResultCache:
+    """
+    Cache of the results of expensive analyses on disk, one pickle file per result, named after the SHA-256 of the
+    function and of its arguments (sequences are hashed by content, so a genome read again from its file gets the same
+    key).
+    Several processes can use the same directory: a result is written in a temporary file, then renamed (atomically)
+    to its name, so a result is either complete or missing. Reading a result updates its modification time, and when
+    the results take more than max_bytes, the least recently used ones are removed (under a lock file).
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=1 << 30):
+        """
+        :param directory: the directory of the cache (created if needed)
+        :param max_bytes: the maximum size of the results kept, in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, function, args=(), kwargs=None, version=0):
+        """
+        Compute the key of a call
+        :param function: the function called
+        :param args: its positional arguments
+        :param kwargs: its keyword arguments (the arguments are matched with the signature of the function, so passing
+        an argument by position, by name or not passing its default value gives the same key)
+        :param version: to change when the results of the function change, so that the old results are not used
+        :return: the key (an hexadecimal string)
+        :raise ValueError: if an argument is a lambda or a function defined in another function (their names do not
+        identify them)
+        """
+        arguments = inspect.signature(function).bind(*args, **(kwargs or {}))
+        arguments.apply_defaults()
+        digest = hashlib.sha256()
+        _feed(digest, (function.__module__, function.__qualname__, version))
+        _feed(digest, dict(arguments.arguments))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key):
+        """
+        Read a result
+        :param key: the key of the result (see key)
+        :return: (True, the result) if the result is in the cache, (False, None) otherwise
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)  # Most recently used
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):  # Missing, or evicted while reading
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        """
+        Write a result, and remove the least recently used ones if the cache gets too big
+        :param key: the key of the result (see key)
+        :param value: the result (anything that can be pickled)
+        """
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=_TEMPORARY_PREFIX)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+            if os.path.getsize(temporary) > self.max_bytes:  # Would evict everything, and itself
+                os.remove(temporary)
+                return
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used results until they take at most max_bytes
+        """
+        with _Lock(os.path.join(self.directory, '.lock')):
+            entries, total = [], 0
+            now = time.time()
+            with os.scandir(self.directory) as scanned:
+                for entry in scanned:
+                    try:
+                        stat = entry.stat()
+                        if entry.name.startswith(_TEMPORARY_PREFIX) and now - stat.st_mtime > _STALE_TEMPORARY:
+                            os.remove(entry.path)
+                        elif entry.name.endswith(_SUFFIX):
+                            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                            total += stat.st_size
+                    except FileNotFoundError:  # Removed by another process
+                        pass
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def size(self):
+        """
+        The size of the results in the cache, in bytes
+        """
+        with os.scandir(self.directory) as scanned:
+            return sum(entry.stat().st_size for entry in scanned if entry.name.endswith(_SUFFIX))
+
+    def clear(self):
+        """
+        Remove all the results from the cache
+        """
+        with _Lock(os.path.join(self.directory, '.lock')):
+            with os.scandir(self.directory) as scanned:
+                for entry in scanned:
+                    if entry.name.endswith(_SUFFIX):
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+
+
+class _Lock:
+    """
+    Exclusive lock on a file, shared between processes (does nothing without fcntl)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exception):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def _feed(digest, value):
+    """
+    Add a value to a hash, so that equal values (sequences with the same nucleotides, sets with the same elements...)
+    are always hashed the same way
+    """
+    if isinstance(value, (str, MappedSequence, PackedSequence)):
+        digest.update(b's' + struct.pack('<Q', len(value)))
+        for start in range(0, len(value), _CHUNK_SIZE):
+            digest.update(str(value[start:start + _CHUNK_SIZE]).encode('utf-8'))
+    elif isinstance(value, bytes):
+        digest.update(b'b' + struct.pack('<Q', len(value)) + value)
+    elif value is None or isinstance(value, (bool, int, float)):
+        digest.update(b'n' + repr(value).encode('ascii') + b';')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'l' + struct.pack('<Q', len(value)))
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, (set, frozenset, dict)):
+        # The order of the elements is not defined: they are hashed in the order of their own hashes
+        items = value.items() if isinstance(value, dict) else ((item,) for item in value)
+        hashes = []
+        for item in items:
+            item_digest = hashlib.sha256()
+            _feed(item_digest, item)
+            hashes.append(item_digest.digest())
+        digest.update(b'd' + struct.pack('<Q', len(hashes)) + b''.join(sorted(hashes)))
+    elif callable(value) and hasattr(value, '__qualname__'):  # A function, e.g. the score of a motif search
+        # A function is known by its name: lambdas and functions defined in other functions share their names
+        if '<lambda>' in value.__qualname__ or '<locals>' in value.__qualname__:
+            raise ValueError("{} has no unique name, its results cannot be cached".format(value.__qualname__))
+        digest.update(b'f' + '{}.{}'.format(value.__module__, value.__qualname__).encode('utf-8') + b';')
+        owner = getattr(value, '__self__', None)
+        if owner is not None and not inspect.ismodule(owner):  # A method of an object depends on the object
+            _feed(digest, owner)
+    else:
+        serialized = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        digest.update(b'p' + struct.pack('<Q', len(serialized)) + serialized)
+
+
+def cached(cache=None, version=0):
+    """
+    Decorator to store the results of a function in a ResultCache, and return them instead of calling the function
+    again with the same arguments. For example, to run find_clumps only once per genome:
+        cached_find_clumps = cached()(find_clumps)
+    The function itself is still available as the attribute `uncached` of the decorated function.
+    :param cache: the cache (a ResultCache in DEFAULT_DIRECTORY if None, created at the first call)
+    :param version: to change when the results of the function change (see ResultCache.key)
+    :return: the decorator
+    """
+
+    def decorate(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            nonlocal cache
+            if cache is None:
+                cache = ResultCache()
+            key = cache.key(function, args, kwargs, version)
+            found, value = cache.get(key)
+            if not found:
+                value = function(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        wrapper.uncached = function
+        return wrapper
+
+    return decorate
@@ -1,14 +1,62 @@
+from hash_kmer import reverse_complement_hash  # The reverse complement of a hashed k-mer, for the rolling hashes
+from sequence_io import read_sequence
+
+# Complement of every nucleotide and IUPAC ambiguity code (a code standing for some nucleotides is complemented to the
+# code standing for their complements), lowercase (soft-masked) letters staying lowercase. U (RNA) is complemented to
+# A, and any other character is kept as is.
+_COMPLEMENTS = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'U': 'A', 'R': 'Y', 'Y': 'R', 'S': 'S', 'W': 'W', 'K': 'M',
+                'M': 'K', 'B': 'V', 'V': 'B', 'D': 'H', 'H': 'D', 'N': 'N'}
+_COMPLEMENTS.update({c.lower(): complement.lower() for c, complement in _COMPLEMENTS.items()})
+_STR_TABLE = str.maketrans(_COMPLEMENTS)
+_BYTES_TABLE = bytes.maketrans(''.join(_COMPLEMENTS).encode('ascii'), ''.join(_COMPLEMENTS.values()).encode('ascii'))
+
+# Number of nucleotides read at a time by write_reverse_complement
+_CHUNK_SIZE = 1 << 20
+
+
 def reverse_complement(text):
     """
-    Find the reverse complement of a DNA sequence
-    :param text: the dna sequence
-    :return: the reverse complement
+    Find the reverse complement of a DNA sequence.
+    Every character is complemented at once by str.translate, then the result is reversed by slicing: both are done in
+    C, in linear time.
+
+    Efficiency: O(n)
+
+    :param text: the dna sequence (a string, bytes, or a sequence convertible to a string like a PackedSequence), which
+    can contain lowercase letters and IUPAC codes
+    :return: the reverse complement (bytes if text is bytes, a string otherwise)
+    """
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        return reverse_complement_bytes(text)
+    if not isinstance(text, str):
+        text = str(text)
+    return text.translate(_STR_TABLE)[::-1]
+
+
+def reverse_complement_bytes(data):
+    """
+    Same as reverse_complement, for a sequence stored as ASCII bytes (as read from a file in binary mode)
+    :param data: the dna sequence (bytes-like)
+    :return: the reverse complement, as bytes
+    """
+    return bytes(data).translate(_BYTES_TABLE)[::-1]
+
+
+def write_reverse_complement(filename, output, record=None, chunk_size=_CHUNK_SIZE):
+    """
+    Write the reverse complement of a sequence file in another file, without loading the whole sequence in memory: the
+    sequence is read chunk by chunk from its end (through a memory map, see sequence_io.read_sequence), and the reverse
+    complement of each chunk is written after the previous one.
+    Gzipped and FASTQ files cannot be memory mapped, so they are loaded in memory.
+    :param filename: the name of the sequence file (plain text or FASTA, see sequence_io.read_records)
+    :param output: the name of the file to write the reverse complement to (as plain text, on a single line)
+    :param record: the name of the record to reverse (the first record by default)
+    :param chunk_size: the number of nucleotides read at a time
     """
-    complements = {"a": "t", "g": "c", "t": "a", "c": "g", "A": "T", "G": "C", "T": "A", "C": "G"}
-    result = ""
-    for c in text:
-        result = complements[c] + result
-    return result
+    sequence = read_sequence(filename, record)
+    with open(output, 'w') as file:
+        for stop in range(len(sequence), 0, -chunk_size):
+            file.write(reverse_complement(sequence[max(0, stop - chunk_size):stop]))
 
 
 def __main__():
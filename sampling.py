@@ -0,0 +1,167 @@
+import random
+import sys
+from array import array
+from bisect import bisect
+from collections import OrderedDict
+from itertools import accumulate
+
+
+def cumulative_sample(weights):
+    """
+    Return a random index from some weights, with a probability proportional to its weight, by searching a random number
+    in the cumulative sums of the weights.
+    This is the fastest way to sample a distribution used only once.
+
+    Efficiency: O(n)
+
+    :param weights: the weights (numbers in [0; +inf[, not all null)
+    :return: an index in the weights
+    """
+    multiplier = 1.0 / sum(weights)  # We use multiplication instead of division
+    cumulative = list(accumulate(x * multiplier for x in weights))
+    return bisect(cumulative, random.uniform(0, cumulative[-1]))
+
+
+def alias_table(weights):
+    """
+    Build the alias table of some weights (Vose's version of Walker's method): each index i gets a probability prob[i]
+    and an alias alias[i], so that picking a uniform random index then keeping it with probability prob[i] (or taking
+    its alias otherwise) follows the distribution of the weights.
+    Building the table costs O(n), but then each sample costs O(1), so it is the fastest way to sample a distribution
+    used many times.
+    :param weights: the weights (numbers in [0; +inf[, not all null)
+    :return: (prob, alias), an array of floats and an array of indexes
+    """
+    n = len(weights)
+    multiplier = n / sum(weights)
+    scaled = [x * multiplier for x in weights]  # The average of the scaled weights is 1
+    prob = array('d', bytes(8 * n))
+    alias = array('L', bytes(array('L').itemsize * n))
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    while small and large:  # Each small weight is filled up to 1 with a part of a large one
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1
+        (small if scaled[l] < 1 else large).append(l)
+    for i in large + small:  # What is left is (up to rounding errors) exactly 1
+        prob[i] = 1
+    return prob, alias
+
+
+def alias_sample(table):
+    """
+    Return a random index from an alias table
+    :param table: the alias table (see alias_table)
+    :return: an index
+    """
+    prob, alias = table
+    u = random.random() * len(prob)  # A single random number gives both the index and the coin
+    i = int(u)
+    return i if u - i < prob[i] else alias[i]
+
+
+class DistributionCache:
+    """
+    Bounded cache of the distributions sampled by biased_random.
+    A distribution seen for the first time is sampled with cumulative_sample and only its key is remembered; if it is
+    seen again, its alias table is built and kept, so that the following samples cost O(1). The tables are evicted in
+    least recently used order, to keep at most max_entries tables and max_bytes bytes.
+    The key of a distribution is the tuple of its weights by default, but a cheaper key (something that identifies the
+    distribution, e.g. the parameters it is computed from) can be given with sample_key, so that the weights are not
+    even computed when their table is cached.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 << 20):
+        """
+        :param max_entries: the maximum number of alias tables kept
+        :param max_bytes: the maximum size in bytes of the alias tables kept (with their keys)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._tables = OrderedDict()  # Key -> (alias table, size in bytes), least recently used first
+        self._seen = OrderedDict()  # Hashes of the keys seen once, least recently seen first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def sample(self, weights, key=None):
+        """
+        Return a random index from some weights, with a probability proportional to its weight
+        :param weights: the weights (numbers in [0; +inf[, not all null)
+        :param key: the key of the distribution (the tuple of the weights if None)
+        :return: an index in the weights
+        """
+        if key is None:
+            key = weights if isinstance(weights, tuple) else tuple(weights)
+        return self.sample_key(key, lambda: weights)
+
+    def sample_key(self, key, make_weights):
+        """
+        Return a random index from the distribution identified by a key
+        :param key: the key of the distribution (hashable)
+        :param make_weights: a function returning the weights of the distribution, only called if its alias table is
+        not cached
+        :return: an index in the weights
+        """
+        table = self._tables.get(key)
+        if table is not None:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return alias_sample(table[0])
+        self.misses += 1
+        weights = make_weights()
+        key_hash = hash(key)
+        if key_hash not in self._seen:  # Probably used only once: not worth building a table
+            self._seen[key_hash] = None
+            if len(self._seen) > 4 * self.max_entries:
+                self._seen.popitem(last=False)
+            return cumulative_sample(weights)
+        del self._seen[key_hash]
+        table = alias_table(weights)
+        size = _size(table, key)
+        if size <= self.max_bytes and self.max_entries > 0:
+            self._tables[key] = (table, size)
+            self._bytes += size
+            while len(self._tables) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._tables.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return alias_sample(table)
+
+    def clear(self):
+        """
+        Remove all the distributions from the cache (the statistics are kept)
+        """
+        self._tables.clear()
+        self._seen.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        """
+        The number of alias tables in the cache
+        """
+        return len(self._tables)
+
+    def stats(self):
+        """
+        Statistics of the cache
+        :return: a dictionary with the number of hits and misses, the number of tables evicted, the number of tables
+        kept and their size in bytes
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self._tables),
+                'bytes': self._bytes}
+
+
+def _size(table, key):
+    """
+    Estimate the memory used by an alias table and its key, in bytes
+    """
+    prob, alias = table
+    size = prob.itemsize * len(prob) + alias.itemsize * len(alias) + sys.getsizeof(key)
+    if isinstance(key, tuple):  # The items of the key are kept alive too (e.g. the weights)
+        size += sum(sys.getsizeof(item) for item in key)
+    return size
@@ -0,0 +1,389 @@
+import gzip
+import mmap
+from bisect import bisect
+from functools import partial
+
+from hash_kmer import encode_nucleotides, only_nucleotides
+from packed_sequence import PackedSequence
+
+# Number of bytes read at a time when a file is streamed
+_BLOCK_SIZE = 1 << 20
+
+# Number of lines checked at a time when checking that all the lines of a record have the same length
+_LINES_PER_CHECK = 1 << 16
+
+
+def hashable_sequence(sequence):
+    """
+    Check if the k-mers of a sequence can be hashed (see hash_kmer.rolling_kmer_hashes), whatever its type
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
+    :return: True if the sequence only contains A, C, G and T
+    """
+    if isinstance(sequence, PackedSequence):
+        return True
+    if isinstance(sequence, str):
+        return only_nucleotides(sequence)
+    return all(only_nucleotides(sequence[start:start + _BLOCK_SIZE]) for start in range(0, len(sequence), _BLOCK_SIZE))
+
+
+def _open(filename):
+    """
+    Open a sequence file in binary mode, decompressing it on the fly if it is gzipped
+    :param filename: the name of the file
+    :return: (the file object, True if the file is gzipped)
+    """
+    file = open(filename, 'rb')
+    if file.peek(2)[:2] == b'\x1f\x8b':  # Magic number of gzip files
+        return gzip.open(file), True
+    return file, False
+
+
+def read_records(filename):
+    """
+    Generator to iterate over the records of a sequence file. Supported formats are:
+     - plain text (like data/genome.txt): a single record without name, line breaks are ignored
+     - FASTA: one record for each header line ('>name'), the sequence can span multiple lines
+     - FASTQ: one record for each read ('@name', the sequence, '+' and the qualities), qualities are ignored
+    Any of these can be gzipped.
+
+    If the file is neither gzipped nor FASTQ, the sequences are MappedSequence objects, reading the file through a
+    memory map: nothing is loaded in memory until the sequence is used. Otherwise, the sequences are strings.
+
+    :param filename: the name of the file
+    :return: pairs (name of the record, sequence), the name being None for plain text files
+    """
+    file, compressed = _open(filename)
+    with file:
+        first = file.peek(1)[:1]
+        if first == b'@':
+            yield from _fastq_records(file)
+            return
+        if not compressed:
+            if len(first) == 0:  # An empty file cannot be memory mapped
+                return
+            yield from _mapped_records(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            return
+        name, pieces = None, []
+        for header, piece in _pieces(file, _BLOCK_SIZE):
+            if header:
+                if pieces or name is not None:
+                    yield name, ''.join(pieces)
+                name, pieces = piece, []
+            else:
+                pieces.append(piece)
+        if pieces or name is not None:
+            yield name, ''.join(pieces)
+
+
+def read_sequence(filename, record=None):
+    """
+    Read a single sequence from a sequence file (see read_records for the supported formats)
+    :param filename: the name of the file
+    :param record: the name of the record to read (the first record by default)
+    :return: the sequence (a MappedSequence if possible, a string otherwise)
+    """
+    for name, sequence in read_records(filename):
+        if record is None or name == record:
+            return sequence
+    raise KeyError("record {} not found in {}".format(record, filename))
+
+
+def read_chunks(filename, size=_BLOCK_SIZE, overlap=0, record=None):
+    """
+    Generator to iterate over a sequence of a file chunk by chunk, without ever loading the whole sequence in memory.
+    Each chunk starts with the last `overlap` nucleotides of the previous one, so that using an overlap of k-1, every
+    k-mer of the sequence is in exactly one chunk.
+    :param filename: the name of the file (see read_records for the supported formats)
+    :param size: the number of new nucleotides in each chunk (the last one can be smaller)
+    :param overlap: the number of nucleotides shared between two consecutive chunks
+    :param record: the name of the record to read (the first record by default)
+    """
+    file, compressed = _open(filename)
+    with file:
+        if file.peek(1)[:1] == b'@':
+            pieces = (sequence for name, sequence in _fastq_records(file) if record is None or name == record)
+            yield from _rechunk(_first_record(pieces, record is None), size, overlap)
+            return
+        pieces = _record_pieces(_pieces(file, _BLOCK_SIZE), record)
+        yield from _rechunk(pieces, size, overlap)
+
+
+def _first_record(sequences, only_first):
+    """
+    Keep only the first sequence if asked to
+    """
+    for sequence in sequences:
+        yield sequence
+        if only_first:
+            return
+
+
+def _record_pieces(pieces, record):
+    """
+    Filter the pieces of sequences of a file to keep only the ones of a record
+    :param pieces: the pieces, as generated by _pieces
+    :param record: the name of the record (None for the first record)
+    """
+    found = False
+    for header, piece in pieces:
+        if header:
+            if found:
+                return
+            found = record is None or piece == record
+        elif found:
+            yield piece
+
+
+def _rechunk(pieces, size, overlap):
+    """
+    Transform pieces of sequence of any size into chunks of a fixed size, overlapping each other
+    :param pieces: the pieces of sequence
+    :param size: the number of new nucleotides in each chunk
+    :param overlap: the number of nucleotides shared between two consecutive chunks
+    """
+    pending = ''  # The nucleotides read, but not yielded yet
+    previous = ''  # The end of the previous chunk
+    for piece in pieces:
+        pending += piece
+        while len(pending) >= size:
+            chunk = previous + pending[:size]
+            yield chunk
+            previous = chunk[len(chunk) - overlap:] if overlap else ''
+            pending = pending[size:]
+    if pending:
+        yield previous + pending
+
+
+def _pieces(file, size):
+    """
+    Parse a plain text or FASTA file block by block.
+    Sequences are generated in pieces (line breaks removed), so that a file made of a single huge line does not need to
+    be loaded at once.
+    :param file: the file, opened in binary mode
+    :param size: the number of bytes to read at a time
+    :return: pairs (True, name of the record) for the start of each record, (False, piece of sequence) for the sequences
+    """
+    remaining = b''  # The beginning of a header line, that continues in the next block
+    in_line = False  # Whether the previous block stopped in the middle of a line of sequence
+    started = False
+    for block in iter(partial(file.read, size), b''):
+        data = remaining + block
+        remaining = b''
+        if not started:
+            data = data.lstrip() or data  # Blank lines before the first header
+            started = True
+            if not data.startswith(b'>'):  # Plain text file, a single record without name
+                yield True, None
+        if b'>' not in data:  # Fast path: the whole block is sequence
+            yield False, data.translate(None, b'\r\n').decode('ascii')
+            in_line = not data.endswith(b'\n')
+            continue
+        pieces = []
+        position = 0
+        while position < len(data):
+            end = data.find(b'\n', position)
+            if not in_line and data[position] == ord('>'):  # A header line
+                if end == -1:
+                    remaining = data[position:]
+                    break
+                if pieces:
+                    yield False, b''.join(pieces).decode('ascii')
+                    pieces = []
+                yield True, data[position + 1:end].decode('ascii').strip().split(' ')[0]
+            else:
+                pieces.append(data[position:len(data) if end == -1 else end].rstrip(b'\r'))
+            in_line = end == -1
+            position = len(data) if end == -1 else end + 1
+        if pieces:
+            yield False, b''.join(pieces).decode('ascii')
+    if remaining:  # Header without sequence at the end of the file
+        yield True, remaining[1:].decode('ascii').strip().split(' ')[0]
+
+
+def _fastq_records(file):
+    """
+    Parse a FASTQ file, read after read
+    :param file: the file, opened in binary mode
+    :return: pairs (name of the read, sequence)
+    """
+    lines = (line.rstrip(b'\r\n') for line in file)
+    for header in lines:
+        if not header:
+            continue
+        pieces = []
+        for line in lines:
+            if line.startswith(b'+'):
+                break
+            pieces.append(line)
+        sequence = b''.join(pieces).decode('ascii')
+        qualities = 0
+        while qualities < len(sequence):  # The qualities can span multiple lines too
+            qualities += len(next(lines))
+        yield header[1:].decode('ascii').strip().split(' ')[0], sequence
+
+
+def _mapped_records(mapped):
+    """
+    Find the records of a memory mapped plain text or FASTA file
+    :param mapped: the memory mapped file
+    :return: pairs (name of the record, MappedSequence)
+    """
+    position = 0
+    while position < len(mapped) and mapped[position] in b' \t\r\n':  # Blank lines before the first header
+        position += 1
+    if position == len(mapped):  # A blank file holds an empty sequence
+        position = 0
+    while position < len(mapped):
+        name = None
+        if mapped[position] == ord('>'):
+            end = mapped.find(b'\n', position)
+            end = len(mapped) if end == -1 else end
+            name = mapped[position + 1:end].decode('ascii').strip().split(' ')[0]
+            position = end + 1
+        end = mapped.find(b'\n>', max(0, position - 1))  # From the line break before, for empty sequences
+        end = len(mapped) if end == -1 else end + 1
+        yield name, MappedSequence(mapped, position, end)
+        position = end
+
+
+class MappedSequence:
+    """
+    A sequence stored in a memory mapped file, with line breaks. It behaves like a read-only string (it has a length,
+    can be indexed, sliced and iterated over), but only the parts that are used are read from the file.
+
+    If all the lines of the sequence have the same length (as in most FASTA files), finding a position in the file takes
+    O(1) time and memory. Otherwise, the position of each line is stored in an index.
+    """
+
+    def __init__(self, mapped, start, stop):
+        """
+        :param mapped: the memory mapped file
+        :param start: the position of the first byte of the sequence in the file
+        :param stop: the position after the last byte of the sequence in the file
+        """
+        self._mapped = mapped
+        self._start = start
+        self._width, self._stride, self._length = self._regular_lines(start, stop)
+        if self._width is None:
+            self._line_starts, self._line_positions = self._index_lines(start, stop)
+            self._length = self._line_positions[-1]
+
+    def _regular_lines(self, start, stop):
+        """
+        Check if all the lines (except the last one) of a part of the file have the same length
+        :return: (number of nucleotides per line, number of bytes per line, length of the sequence), or
+        (None, None, None) if the lines do not have the same length
+        """
+        mapped = self._mapped
+        end_of_line = mapped.find(b'\n', start, stop)
+        if end_of_line == -1:  # A single line
+            length = len(mapped[start:stop].rstrip(b'\r'))
+            return length, length, length
+        separator = b'\r\n' if end_of_line > start and mapped[end_of_line - 1] == ord('\r') else b'\n'
+        width = end_of_line + 1 - len(separator) - start
+        stride = width + len(separator)
+        if width == 0:
+            return None, None, None
+        full_lines = (stop - start) // stride
+        # We check that there is a line break at the end of each line, and nowhere else
+        for first_line in range(0, full_lines, _LINES_PER_CHECK):
+            lines = min(_LINES_PER_CHECK, full_lines - first_line)
+            data = mapped[start + first_line * stride:start + (first_line + lines) * stride]
+            if data[width:len(data):stride] != separator[0:1] * lines or data.count(b'\n') != lines:
+                return None, None, None
+        last_line = mapped[start + full_lines * stride:stop]
+        if last_line.endswith(separator):
+            last_line = last_line[:-len(separator)]
+        if b'\n' in last_line or b'\r' in last_line:
+            return None, None, None
+        return width, stride, full_lines * width + len(last_line)
+
+    def _index_lines(self, start, stop):
+        """
+        Find the position of every line of a part of the file
+        :return: (the positions of the lines in the file, the positions of the lines in the sequence), the second list
+        having an additional element, the length of the sequence
+        """
+        mapped = self._mapped
+        line_starts, line_positions = [], [0]
+        while start < stop:
+            end = mapped.find(b'\n', start, stop)
+            end = stop if end == -1 else end
+            length = len(mapped[start:end].rstrip(b'\r'))
+            if length:
+                line_starts.append(start)
+                line_positions.append(line_positions[-1] + length)
+            start = end + 1
+        return line_starts, line_positions
+
+    def _offset(self, position):
+        """
+        Find the position in the file of a position in the sequence
+        :param position: the position in the sequence (between 0 and the length of the sequence)
+        :return: the position in the file
+        """
+        if self._width is not None:
+            if self._width == 0:
+                return self._start
+            return self._start + (position // self._width) * self._stride + position % self._width
+        line = max(0, bisect(self._line_positions, position) - 1)
+        if line == len(self._line_starts):  # The end of the sequence
+            line -= 1
+        return self._line_starts[line] + position - self._line_positions[line]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._length)
+            if step != 1:
+                positions = range(start, stop, step)
+                if not positions:
+                    return ''
+                first = min(positions[0], positions[-1])  # Read the part covered by the slice, then apply the step
+                return self[first:max(positions[0], positions[-1]) + 1][positions[0] - first::step]
+            if stop <= start:
+                return ''
+            data = self._mapped[self._offset(start):self._offset(stop - 1) + 1]
+            return data.translate(None, b'\r\n').decode('ascii')
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError("index out of range")
+        return chr(self._mapped[self._offset(item)])
+
+    def __iter__(self):
+        for chunk in self.chunks(_BLOCK_SIZE):
+            yield from chunk
+
+    def __str__(self):
+        return self[:]
+
+    def __repr__(self):
+        return "MappedSequence(length={})".format(self._length)
+
+    def chunks(self, size=_BLOCK_SIZE, overlap=0):
+        """
+        Generator to iterate over the sequence chunk by chunk (see read_chunks)
+        :param size: the number of new nucleotides in each chunk (the last one can be smaller)
+        :param overlap: the number of nucleotides shared between two consecutive chunks
+        """
+        for start in range(0, self._length, size):
+            yield self[max(0, start - overlap):start + size]
+
+    def codes(self):
+        """
+        Generator to iterate over the hashes of the nucleotides of the sequence (see hash_kmer.hash_nucleotide)
+        """
+        for chunk in self.chunks():
+            yield from encode_nucleotides(chunk)
+
+    def kmers(self, k):
+        """
+        Generator to iterate over the sequence k-mer after k-mer
+        :param k: the size of the k-mers
+        """
+        for chunk in self.chunks(overlap=k - 1):
+            for i in range(0, len(chunk) - k + 1):
+                yield chunk[i:i + k]
@@ -0,0 +1,371 @@
+import heapq
+import math
+import re
+import struct
+from array import array
+from itertools import accumulate, chain, compress
+from operator import ne
+
+from binary_io import read_array, write_array
+from hash_kmer import rolling_kmer_hashes
+from sequence_io import read_records
+
+_MASK = (1 << 64) - 1
+
+# Runs of nucleotides: the k-mers containing any other character (N, IUPAC codes...) are not sketched
+_NUCLEOTIDE_RUNS = re.compile('[ACGT]+')
+
+# Number of nucleotides read at a time from a sequence
+_CHUNK_SIZE = 1 << 20
+
+_MAGIC = b'SKETCH1'
+_HEADER = struct.Struct('<8Q')
+
+
+def mix_hash(code, seed=0):
+    """
+    Scramble the hash of a k-mer into a pseudo-random 64-bit integer (finalizer of splitmix64).
+    Hashes of k-mers are ordered like the k-mers, so keeping the smallest ones would keep the k-mers starting with A:
+    the mixed hashes are spread uniformly instead. The mixing is a bijection, so two different k-mers (k <= 32) never
+    get the same mixed hash.
+    :param code: the hash of the k-mer (see hash_kmer.hash_kmer)
+    :param seed: the seed of the mixing (sketches can only be compared if they use the same seed)
+    :return: the mixed hash
+    """
+    z = (code + (seed + 1) * 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _hashed_runs(sequence, k, canonical, seed, chunk_size=_CHUNK_SIZE):
+    """
+    Generator to iterate over the mixed hashes of the k-mers of a sequence, reading it chunk by chunk.
+    The k-mers are grouped by runs of consecutive k-mers: a run is interrupted by any character other than A, C, G and
+    T, and at the end of a chunk (the next run then starts right after it).
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence, lowercase nucleotides are allowed)
+    :param chunk_size: the number of nucleotides read at a time
+    :return: pairs (position of the first k-mer of the run, list of the mixed hashes of the k-mers of the run)
+    """
+    mix = (lambda code: mix_hash(code, seed)) if seed else mix_hash
+    carry = ''  # The end of the last run of the previous chunk, too short to contain a k-mer
+    for start in range(0, len(sequence), chunk_size):
+        text = carry + str(sequence[start:start + chunk_size]).upper()
+        offset = start - len(carry)
+        carry = ''
+        for run in _NUCLEOTIDE_RUNS.finditer(text):
+            run_start, run_end = run.span()
+            if run_end == len(text):  # The run may go on in the next chunk
+                carry = text[max(run_start, run_end - k + 1):]
+            if run_end - run_start >= k:
+                yield offset + run_start, list(map(mix, rolling_kmer_hashes(run.group(), k, canonical)))
+
+
+def _window_minima(values, w):
+    """
+    Compute the minimum of every window of w consecutive values (van Herk/Gil-Werman): the values are split in blocks of
+    w, so that each window is the end of a block followed by the beginning of the next one, and the minima of all the
+    beginnings and ends of blocks are running minima.
+    :return: the list of the len(values) - w + 1 minima
+    """
+    if len(values) < w:
+        return []
+    prefix, suffix = [], []  # Minimum since the beginning of the block, until the end of the block
+    for start in range(0, len(values), w):
+        block = values[start:start + w]
+        prefix.extend(accumulate(block, min))
+        suffix.extend(reversed(list(accumulate(reversed(block), min))))
+    return list(map(min, suffix[:len(values) - w + 1], prefix[w - 1:]))
+
+
+class _Windows:
+    """
+    Windows of w consecutive k-mers over successive runs of k-mers: a run following the previous one without gap
+    continues its windows.
+    """
+
+    def __init__(self, w):
+        self.w = w
+        self._end = None  # Position after the last k-mer of the previous run
+        self._carry = []  # The last w - 1 hashes of the previous run
+
+    def minima(self, position, hashes):
+        """
+        Compute the minimum of the windows ending in a run
+        :param position: the position of the first k-mer of the run
+        :param hashes: the hashes of the k-mers of the run
+        :return: (position of the first k-mer of the first window, hashes of the windows, minima of the windows)
+        """
+        if position == self._end:
+            position -= len(self._carry)
+            hashes = self._carry + hashes
+        self._end = position + len(hashes)
+        self._carry = hashes[max(0, len(hashes) - self.w + 1):] if self.w > 1 else []
+        return position, hashes, _window_minima(hashes, self.w)
+
+
+def minimizers(sequence, k, w, canonical=True, seed=0, chunk_size=_CHUNK_SIZE):
+    """
+    Generator to iterate over the (w,k)-minimizers of a sequence: in every window of w consecutive k-mers, the k-mer
+    with the smallest mixed hash (the leftmost one in case of a tie). A minimizer is generated once for all the
+    consecutive windows it is the minimizer of.
+    Two sequences sharing a substring of w + k - 1 nucleotides share its minimizer, and about 2 / (w + 1) of the k-mers
+    are minimizers, which makes them good seeds to compare or align sequences.
+
+    Efficiency: O(n)
+
+    :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
+    :param k: the size of the k-mers (at most 32)
+    :param w: the number of k-mers in a window
+    :param canonical: should a k-mer and its reverse complement have the same hash?
+    :param seed: the seed of the hashes (see mix_hash)
+    :param chunk_size: the number of nucleotides read at a time
+    :return: pairs (position of the minimizer, mixed hash)
+    """
+    _check_parameters(k, w)
+    if w == 0:
+        raise ValueError("w has to be positive")
+    windows = _Windows(w)
+    last = None  # Position of the last minimizer (the windows continued from the previous run can still have it)
+    for position, hashes in _hashed_runs(sequence, k, canonical, seed, chunk_size):
+        start, hashes, minima = windows.minima(position, hashes)
+        changes = list(compress(range(len(minima)), chain([True], map(ne, minima[1:], minima))))
+        for run_start, run_end in zip(changes, changes[1:] + [len(minima)]):
+            # The windows of this run of equal minima have the same minimizer until it leaves them (low-complexity
+            # sequences repeat the same k-mer, the leftmost one in each window is the minimizer)
+            i = run_start
+            while i < run_end:
+                minimizer = start + hashes.index(minima[i], i, i + w)
+                if minimizer != last:
+                    yield minimizer, minima[i]
+                    last = minimizer
+                i = minimizer - start + 1
+
+
+def _check_parameters(k, w):
+    """
+    Check the sizes of the k-mers and of the windows
+    """
+    if not 0 < k <= 32:
+        raise ValueError("k has to be between 1 and 32")
+    if w < 0:
+        raise ValueError("w cannot be negative")
+
+
+class Sketch:
+    """
+    Sketch of the k-mers of one or more sequences, to estimate how similar two genomes are without storing all their
+    k-mers:
+     - the bottom-s MinHash sketch, the `size` smallest mixed hashes of the k-mers (see mix_hash), estimates the Jaccard
+     index and the containment of the sets of k-mers of two genomes
+     - if w is not 0, the set of the (w,k)-minimizers (see minimizers), about 2 / (w + 1) of the distinct k-mers, gives
+     the same measures with a much better precision, at the cost of a bigger sketch
+    Both are computed in a single pass over the sequences, which are read chunk by chunk. K-mers containing other
+    characters than A, C, G and T are ignored.
+    """
+
+    def __init__(self, k, size=1000, w=0, canonical=True, seed=0):
+        """
+        :param k: the size of the k-mers (at most 32)
+        :param size: the number of hashes of the MinHash sketch
+        :param w: the number of k-mers of the windows of the minimizers (0 to only compute the MinHash sketch)
+        :param canonical: should a k-mer and its reverse complement be counted as the same k-mer?
+        :param seed: the seed of the hashes (only sketches with the same k, canonical and seed can be compared)
+        """
+        _check_parameters(k, w)
+        if size <= 0:
+            raise ValueError("the size of the sketch has to be positive")
+        self.k = k
+        self.size = size
+        self.w = w
+        self.canonical = canonical
+        self.seed = seed & _MASK
+        self.length = 0  # Number of k-mers sketched (repeated k-mers included)
+        self._heap = []  # Opposites of the smallest hashes (heapq is a min-heap, the largest hash is first)
+        self._members = set()  # The smallest hashes
+        self.minimizers = set()
+
+    @classmethod
+    def from_sequence(cls, sequence, k, size=1000, w=0, canonical=True, seed=0):
+        """
+        Sketch a sequence
+        :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
+        :return: the sketch (see Sketch for the other parameters)
+        """
+        sketch = cls(k, size, w, canonical, seed)
+        sketch.add(sequence)
+        return sketch
+
+    @classmethod
+    def from_file(cls, filename, k, size=1000, w=0, canonical=True, seed=0):
+        """
+        Sketch all the records of a sequence file (an assembly with all its contigs for example)
+        :param filename: the name of the file (see sequence_io.read_records for the supported formats)
+        :return: the sketch (see Sketch for the other parameters)
+        """
+        sketch = cls(k, size, w, canonical, seed)
+        for name, sequence in read_records(filename):
+            sketch.add(sequence)
+        return sketch
+
+    def add(self, sequence, chunk_size=_CHUNK_SIZE):
+        """
+        Add the k-mers of a sequence to the sketch (the sequence is not joined to the previous ones)
+        :param sequence: the sequence (a string, a PackedSequence or a MappedSequence)
+        :param chunk_size: the number of nucleotides read at a time
+        """
+        heap, members = self._heap, self._members
+        windows = _Windows(self.w) if self.w else None
+        for position, hashes in _hashed_runs(sequence, self.k, self.canonical, self.seed, chunk_size):
+            self.length += len(hashes)
+            if len(heap) < self.size:
+                for h in hashes:
+                    if h not in members:
+                        members.add(h)
+                        heapq.heappush(heap, -h)
+                        if len(heap) == self.size:
+                            break
+            # Only the hashes smaller than the largest hash of the sketch can get in, which is rare once it is full
+            if len(heap) == self.size:
+                for h in filter((-heap[0]).__gt__, hashes):
+                    if h < -heap[0] and h not in members:
+                        members.add(h)
+                        members.discard(-heapq.heappushpop(heap, -h))
+            if windows is not None:
+                self.minimizers.update(windows.minima(position, hashes)[2])
+
+    @property
+    def hashes(self):
+        """
+        The hashes of the MinHash sketch, in ascending order
+        """
+        return array('Q', sorted(self._members))
+
+    def cardinality(self):
+        """
+        Estimate the number of distinct k-mers sketched (exact if there are less of them than the size of the sketch)
+        """
+        if len(self._heap) < self.size:
+            return len(self._heap)
+        return round((self.size - 1) * (_MASK + 1) / -self._heap[0])
+
+    def _check_compatible(self, other):
+        """
+        Check that two sketches can be compared
+        """
+        if (self.k, self.canonical, self.seed) != (other.k, other.canonical, other.seed):
+            raise ValueError("sketches with different k, canonical or seed cannot be compared")
+
+    def jaccard(self, other, minimizers=False):
+        """
+        Estimate the Jaccard index of the sets of k-mers of two sketches (the number of k-mers they share divided by the
+        number of distinct k-mers they contain): the bottom-s sketch of the union is the s smallest hashes of both
+        sketches, and the proportion of them found in both sketches estimates the Jaccard index.
+        :param other: the other sketch
+        :param minimizers: compare the sets of minimizers (exact on the minimizers) instead of the MinHash sketches
+        :return: the Jaccard index, between 0 and 1
+        """
+        self._check_compatible(other)
+        if minimizers:
+            union = len(self.minimizers | other.minimizers)
+            return len(self.minimizers & other.minimizers) / union if union else 0.0
+        size = min(self.size, other.size)
+        union = heapq.nsmallest(size, self._members | other._members)
+        if not union:
+            return 0.0
+        shared = sum(1 for h in union if h in self._members and h in other._members)
+        return shared / len(union)
+
+    def containment(self, other, minimizers=False):
+        """
+        Estimate the proportion of the k-mers of this sketch found in another one (1 if this genome is contained in the
+        other one): every hash smaller than the largest hashes of both sketches is in a sketch if and only if its k-mer
+        is in the genome, so these hashes are compared (a sketch that is not full has all the hashes of its genome).
+        :param other: the other sketch
+        :param minimizers: compare the sets of minimizers instead of the MinHash sketches
+        :return: the containment, between 0 and 1
+        """
+        self._check_compatible(other)
+        if minimizers:
+            return len(self.minimizers & other.minimizers) / len(self.minimizers) if self.minimizers else 0.0
+        if not self._heap or not other._heap:
+            return 0.0
+        threshold = -self._heap[0]
+        if len(other._heap) == other.size:
+            threshold = min(threshold, -other._heap[0])
+        compared = [h for h in self._members if h <= threshold]
+        if not compared:  # All the hashes of this sketch are above those of the other one: no k-mer can be compared
+            return 0.0
+        return sum(1 for h in compared if h in other._members) / len(compared)
+
+    def distance(self, other, minimizers=False):
+        """
+        Estimate the proportion of nucleotides differing between two genomes from their Jaccard index (Mash distance),
+        assuming the mutations are independent substitutions
+        :param other: the other sketch
+        :param minimizers: compare the sets of minimizers instead of the MinHash sketches
+        :return: the distance, between 0 and 1
+        """
+        jaccard = self.jaccard(other, minimizers)
+        if jaccard == 0:
+            return 1.0
+        return min(1.0, -math.log(2 * jaccard / (1 + jaccard)) / self.k)
+
+    def save(self, filename):
+        """
+        Save the sketch in a file, to be loaded with Sketch.load
+        :param filename: the name of the file
+        """
+        hashes = self.hashes
+        with open(filename, 'wb') as file:
+            file.write(_MAGIC)
+            file.write(_HEADER.pack(self.k, self.size, self.w, self.canonical, self.seed, self.length, len(hashes),
+                                    len(self.minimizers)))
+            write_array(file, hashes)
+            write_array(file, array('Q', sorted(self.minimizers)))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a sketch saved with save
+        :param filename: the name of the file
+        :return: the sketch
+        """
+        with open(filename, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("{} is not a sketch file".format(filename))
+            k, size, w, canonical, seed, length, number_of_hashes, number_of_minimizers = \
+                _HEADER.unpack(file.read(_HEADER.size))
+            data = file.read()
+        hashes = read_array(data, 0, 'Q', number_of_hashes)
+        minimizers = read_array(data, 8 * number_of_hashes, 'Q', number_of_minimizers)
+        sketch = cls(k, size, w, bool(canonical), seed)
+        sketch.length = length
+        sketch._members = set(hashes)
+        sketch._heap = [-h for h in reversed(hashes)]  # Descending opposites: already a heap
+        sketch.minimizers = set(minimizers)
+        return sketch
+
+
+def closest(query, sketches, n=10, minimizers=False):
+    """
+    Find the sketches most similar to a query sketch, to only run the exact algorithms on them
+    :param query: the sketch of the query
+    :param sketches: a dictionary {name: sketch}
+    :param n: the number of sketches to return
+    :param minimizers: compare the sets of minimizers instead of the MinHash sketches
+    :return: a list of (distance, name), closest first
+    """
+    return heapq.nsmallest(n, ((query.distance(sketch, minimizers), name) for name, sketch in sketches.items()))
+
+
+def __main__():
+    with open('data/genome.txt') as file:
+        genome = file.read().strip()
+    half = len(genome) // 2
+    first, second = (Sketch.from_sequence(part, 21, w=10) for part in (genome[:half + 100000], genome[half:]))
+    print(first.jaccard(second), first.jaccard(second, minimizers=True))
+
+
+if __name__ == '__main__':
+    __main__()
@@ -1,4 +1,14 @@
-import matplotlib
+from array import array
+from itertools import accumulate, compress, repeat
+from operator import eq
+
+from packed_sequence import PackedSequence
+
+# How much each nucleotide changes the skew (other nucleotides do not change it)
+_SKEW_DELTAS = {'C': -1, 'G': 1}
+
+# Number of nucleotides processed at once when the skew is computed chunk by chunk
+_CHUNK_SIZE = 1 << 20
 
 
 def skew_values(genome):
@@ -7,21 +17,98 @@ def skew_values(genome):
     :param genome: the genome
     :return: a list of skew values for each nucleotide
     """
-    skew = [0]
-    for nucleotide in genome:
-        if nucleotide == "C":
-            skew.append(skew[-1] - 1)
-        elif nucleotide == "G":
-            skew.append(skew[-1] + 1)
-        else:
-            skew.append(skew[-1])
-    return skew
+    return list(_skew_values(genome, 0))
+
+
+def skew_array(genome):
+    """
+    Same as skew_values, but the skew values are stored in a compact array of 32-bit integers instead of a list (4 bytes
+    per value instead of the 8 bytes of a pointer plus an integer object)
+    :param genome: the genome
+    :return: an array('i') of skew values for each nucleotide
+    """
+    return array('i', _skew_values(genome, 0))
+
+
+def _skew_values(genome, initial):
+    """
+    Return an iterator over the skew values of a genome, the cumulative sum being computed in C by accumulate()
+    :param genome: the genome
+    :param initial: the skew before the first nucleotide
+    :return: an iterator over the len(genome) + 1 skew values
+    """
+    return accumulate(map(_SKEW_DELTAS.get, genome, repeat(0)), initial=initial)
+
+
+def skew_extrema(chunks):
+    """
+    Find the minimum and maximum skew values of a genome, and where they are, without ever holding all the skew values
+    in memory. The genome is given as consecutive chunks, so that it does not have to be loaded at once either.
+
+    Efficiency: O(n) time, O(c) memory with c being the size of a chunk
+
+    :param chunks: an iterable of consecutive parts of the genome (strings)
+    :return: ((minimum, positions of the minimum), (maximum, positions of the maximum)), with the positions being
+    indices in the list returned by skew_values
+    """
+    minimum, maximum = 0, 0
+    min_positions, max_positions = [0], [0]
+    position = 0  # The position of the last skew value of the previous chunk
+    current = 0  # The last skew value of the previous chunk
+    for chunk in chunks:
+        values = array('i', _skew_values(chunk, current))
+        chunk_minimum, chunk_maximum = min(values), max(values)
+        if chunk_minimum <= minimum:
+            positions = _positions(values, chunk_minimum, position)
+            if chunk_minimum < minimum:
+                minimum, min_positions = chunk_minimum, positions
+            else:
+                min_positions.extend(positions)
+        if chunk_maximum >= maximum:
+            positions = _positions(values, chunk_maximum, position)
+            if chunk_maximum > maximum:
+                maximum, max_positions = chunk_maximum, positions
+            else:
+                max_positions.extend(positions)
+        position += len(values) - 1
+        current = values[-1]
+    return (minimum, min_positions), (maximum, max_positions)
+
+
+def _positions(values, value, offset):
+    """
+    Find where a value is in the skew values of a chunk (except the first one, which belongs to the previous chunk)
+    :param values: the skew values of the chunk
+    :param value: the value to search for
+    :param offset: the position of the first skew value of the chunk in the genome
+    :return: the list of positions
+    """
+    return list(compress(range(offset + 1, offset + len(values)), map(eq, values[1:], repeat(value))))
+
+
+def _is_sequence(genome):
+    """
+    Check if a genome is a whole sequence (anything with a length that is sliced into strings, like a MappedSequence)
+    rather than an iterable of chunks
+    """
+    if isinstance(genome, (str, PackedSequence)):
+        return True
+    return hasattr(genome, '__len__') and hasattr(genome, '__getitem__') and isinstance(genome[0:0], str)
 
 
 def find_minimum_skew(genome):
-    skew = skew_values(genome)
-    minimum = min(skew)
-    return [i for i, val in enumerate(skew) if val == minimum]
+    """
+    Find where the skew of a genome is minimal
+    :param genome: the genome (a string, a PackedSequence, a MappedSequence, or an iterable of consecutive parts of the
+    genome, see skew_extrema)
+    :return: the list of positions where the skew is minimal
+    """
+    if _is_sequence(genome):
+        chunks = (str(genome[i:i + _CHUNK_SIZE]) for i in range(0, len(genome), _CHUNK_SIZE))
+    else:
+        chunks = genome
+    (minimum, positions), _ = skew_extrema(chunks)
+    return positions
 
 
 def __main2__():
@@ -31,6 +118,7 @@ def __main2__():
     sequence = "CATTCCAGTACTTCATGATGGCGTGAAGA"
     skew = skew_values(sequence)
     print(skew)
+    import matplotlib
     matplotlib.use('Agg')
     from matplotlib import pyplot
 
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from approximate_matching import approximate_matches, approximate_matches_many
+from pattern_matching import general_pattern_matching
+
+
+class TestApproximateMatching(TestCase):
+    genome = "CGCCCGAATCCAGAACGCATTCCCATATTTCGGGACCACTGGCCTCCACGGTACGGACGTCAATCAAATGCCTAGCGGCTTGTGGTTTCTCCTACGCTCC"
+
+    def test_general_pattern_matching(self):
+        self.assertEqual(general_pattern_matching(self.genome, "ATTCTGGA", 3), [6, 7, 26, 27, 78])
+
+    def test_seeds_and_bit_parallel(self):
+        """
+        Long patterns are searched with seeds, short ones with the bit-parallel algorithm: both must agree
+        """
+        pattern = "CCTCCACGGTACG"
+        expected = [i for i in range(len(self.genome) - len(pattern) + 1)
+                    if sum(a != b for a, b in zip(self.genome[i:i + len(pattern)], pattern)) <= 4]
+        self.assertEqual(approximate_matches(self.genome, pattern, 4), expected)
+        self.assertEqual(approximate_matches(self.genome, pattern, 1), [42])
+
+    def test_both_strands(self):
+        """
+        GGAGGCC is the reverse complement of GGCCTCC, found at position 40
+        """
+        self.assertEqual(approximate_matches(self.genome, "GGAGGCC", 0), [])
+        self.assertEqual(approximate_matches(self.genome, "GGAGGCC", 0, both_strands=True), [40])
+
+    def test_many_patterns(self):
+        self.assertEqual(approximate_matches_many(self.genome, ["ATTCTGGA", "GGAGGCC"], 0, both_strands=True),
+                         {"ATTCTGGA": [], "GGAGGCC": [40]})
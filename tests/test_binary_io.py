@@ -0,0 +1,21 @@
+import io
+from array import array
+from unittest import TestCase
+
+from binary_io import read_array, write_array
+
+
+class TestBinaryIO(TestCase):
+    def test_write_read(self):
+        """
+        Arrays are written in little-endian order, and read back from any position of the data
+        """
+        file = io.BytesIO(b'head')
+        file.seek(0, io.SEEK_END)
+        write_array(file, array('I', [1, 2, 3]))
+        write_array(file, array('Q', [2 ** 40]))
+        data = file.getvalue()
+        self.assertEqual(data[4:8], b'\x01\x00\x00\x00')
+        self.assertEqual(list(read_array(data, 4, 'I', 3)), [1, 2, 3])
+        self.assertEqual(list(read_array(data, 16, 'Q', 1)), [2 ** 40])
+        self.assertEqual(list(read_array(data, 16, 'Q', 0)), [])
@@ -0,0 +1,39 @@
+import random
+from unittest import TestCase
+
+from count_hamming import _count_hamming_stupid, _neighborhood_counts, count_hamming, count_hamming_many
+from hash_kmer import unhash_kmer
+from kmer_counts import count_kmer_hashes
+from reverse_complement import reverse_complement
+
+
+class TestCountHamming(TestCase):
+    def test_count_hamming(self):
+        self.assertEqual(count_hamming("CATGCCATTCGCATTGTCCCAGTGA", "CCC", 2), 15)
+        self.assertEqual(count_hamming("AACAAGCATAAACATTAAAGAG", "AAAAA", 1), 4)
+        self.assertEqual(count_hamming("AANAA", "AA", 0), 2)
+        self.assertEqual(count_hamming("ACGT", "", 0), 5)
+        self.assertEqual(count_hamming("ACGT", "", -1), 0)
+
+    def test_count_hamming_many(self):
+        """
+        The counts of many patterns are the same as counting each pattern, on one or both strands
+        """
+        random.seed(22)
+        genome = ''.join(random.choice("ACGT") for _ in range(500))
+        patterns = [''.join(random.choice("ACGT") for _ in range(6)) for _ in range(50)] + ["ACG", "ACGTACGTA"]
+        self.assertEqual(list(count_hamming_many(genome, patterns, 2)),
+                         [_count_hamming_stupid(genome, pattern, 2) for pattern in patterns])
+        self.assertEqual(list(count_hamming_many(genome, patterns, 1, both_strands=True)),
+                         [_count_hamming_stupid(genome, pattern, 1) +
+                          _count_hamming_stupid(genome, reverse_complement(pattern), 1) for pattern in patterns])
+
+    def test_neighborhood_counts(self):
+        """
+        Each k-mer gets the number of k-mers of the genome at most d mismatches away
+        """
+        random.seed(3)
+        genome = ''.join(random.choice("ACGT") for _ in range(200))
+        counts = _neighborhood_counts(count_kmer_hashes(genome, 4), 4, 2)
+        self.assertEqual([counts[code] for code in range(256)],
+                         [_count_hamming_stupid(genome, unhash_kmer(code, 4), 2) for code in range(256)])
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from find_clumps import find_clumps
+
+
+class TestFindClumps(TestCase):
+    sequence = "CGGACTCGACAGATGTGAAGAACGACAATGTGAAGACTCGACACGACAGAGTGAAGAGAAGAGGAAACATTGTAA"
+
+    def test_find_clumps(self):
+        self.assertEqual(find_clumps(self.sequence, 50, 4, 5), {'CGACA', 'GAAGA'})
+
+    def test_find_clumps_positions(self):
+        """
+        The positions are the starts of the windows where the k-mers reach t repetitions
+        """
+        clumps = find_clumps(self.sequence, 50, 4, 5, positions=True)
+        self.assertEqual(clumps, {'CGACA': [0], 'GAAGA': [12]})
+
+    def test_window_too_large(self):
+        with self.assertRaises(ValueError):
+            find_clumps("ACGT", 5, 1, 2)
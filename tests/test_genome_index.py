@@ -0,0 +1,36 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from genome_index import suffix_array, FMIndex
+from pattern_count import pattern_count
+from pattern_matching import pattern_matching
+
+
+class TestGenomeIndex(TestCase):
+    genome = "GATATATGCATATACTTATAC"
+
+    def test_suffix_array(self):
+        self.assertEqual(list(suffix_array("GATTACA")), [7, 6, 4, 1, 5, 0, 3, 2])
+        with self.assertRaises(ValueError):
+            suffix_array("acgt")
+
+    def test_count(self):
+        index = FMIndex.build(self.genome)
+        self.assertEqual(index.count("ATA"), pattern_count(self.genome, "ATA"))
+        self.assertEqual(pattern_count(index, "ATA"), 5)
+        self.assertEqual(pattern_count(index, "CCC"), 0)
+
+    def test_locate(self):
+        index = FMIndex.build(self.genome, sample_rate=4)
+        self.assertEqual(pattern_matching(index, "ATAT"), [1, 3, 9])
+        self.assertEqual(pattern_matching(index, "ATA"), pattern_matching(self.genome, "ATA"))
+
+    def test_save_load(self):
+        index = FMIndex.build(self.genome)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "genome.fmi")
+            index.save(filename)
+            loaded = FMIndex.load(filename)
+        self.assertEqual(len(loaded), len(self.genome))
+        self.assertEqual(loaded.locate("TAC"), [12, 18])
@@ -1,6 +1,7 @@
 from unittest import TestCase
 
-from hamming_distance import hamming_distance
+from hamming_distance import hamming_distance, hamming_distance_hashes, hamming_distances
+from hash_kmer import hash_kmer
 
 
 class TestHamming_distance(TestCase):
@@ -35,3 +36,22 @@ class TestHamming_distance(TestCase):
                                                   'ACGGCGTTCG',
                                                   'CCCTAAAGAG',
                                                   'CGTCAGAGGT']), 5)
+
+    def test_hamming_distance_hashes(self):
+        """
+        Test the bit-parallel distance between two hashed k-mers
+        """
+        self.assertEqual(hamming_distance_hashes(hash_kmer("GGGCCGTTGGT"), hash_kmer("GGACCGTTGAC"), 11), 3)
+        self.assertEqual(hamming_distance_hashes(hash_kmer("A" * 40), hash_kmer("T" * 40), 40), 40)
+
+    def test_hamming_distances(self):
+        """
+        Test the distances between a pattern and all the k-mers of a text
+        """
+        self.assertEqual(hamming_distances("GAT", "GATTACA"), [0, 2, 3, 2, 3])
+
+    def test_hamming_distance_lowercase(self):
+        """
+        Sequences that cannot be hashed are compared character by character
+        """
+        self.assertEqual(hamming_distance("gattctca", "gcaaagacgctgaccaa"), 3)
@@ -1,6 +1,9 @@
 from unittest import TestCase
 
-from hash_kmer import hash_nucleotide, unhash_nucleotide, hash_kmer, unhash_kmer
+from hash_kmer import hash_nucleotide, unhash_nucleotide, hash_kmer, unhash_kmer, rolling_kmer_hashes, \
+    rolling_kmer_hashes_array
+from kmer import kmers
+from reverse_complement import reverse_complement
 
 
 class TestHash(TestCase):
@@ -21,3 +24,23 @@ class TestHash(TestCase):
 
     def test_unhash_kmer(self):
         self.assertEqual(unhash_kmer(3727810282, 16), "TCTGATACTCTGTGGG")
+
+    def test_hash_long_kmer(self):
+        """
+        Hashing a long k-mer should not hit the recursion limit
+        """
+        self.assertEqual(hash_kmer("A" * 5000 + "T"), 3)
+
+    def test_rolling_kmer_hashes(self):
+        text = "TCTGATACTCTGTGGGA"
+        self.assertEqual(list(rolling_kmer_hashes(text, 16)), [3727810282, hash_kmer(text[1:])])
+        self.assertEqual(list(rolling_kmer_hashes(text, 5)), [hash_kmer(kmer) for kmer in kmers(text, 5)])
+        self.assertEqual(list(rolling_kmer_hashes_array(text, 5)), [hash_kmer(kmer) for kmer in kmers(text, 5)])
+
+    def test_canonical_rolling_kmer_hashes(self):
+        """
+        The canonical hash of a k-mer is the minimum between its hash and the hash of its reverse complement
+        """
+        text = "TCTGATACTCTGTGGGA"
+        expected = [min(hash_kmer(kmer), hash_kmer(reverse_complement(kmer))) for kmer in kmers(text, 5)]
+        self.assertEqual(list(rolling_kmer_hashes(text, 5, canonical=True)), expected)
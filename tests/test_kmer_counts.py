@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from frequent_words import frequent_words, frequent_words_mismatch
+from hash_kmer import hash_kmer
+from kmer_counts import count_kmer_hashes, most_frequent_hashes
+
+
+class TestKmerCounts(TestCase):
+    text = "ACGTTGCATGTCGCATGATGCATGAGAGCT"
+
+    def test_dense_counts(self):
+        counts = count_kmer_hashes(self.text, 4)
+        self.assertEqual(len(counts), 4 ** 4)
+        self.assertEqual(counts[hash_kmer("GCAT")], 3)
+        self.assertEqual(counts[hash_kmer("AAAA")], 0)
+
+    def test_sparse_counts(self):
+        counts = count_kmer_hashes(self.text * 2, 14)
+        self.assertEqual(counts[hash_kmer(self.text[:14])], 2)
+        self.assertEqual(sum(counts.values()), len(self.text) * 2 - 14 + 1)
+
+    def test_most_frequent_hashes(self):
+        self.assertEqual(most_frequent_hashes(count_kmer_hashes(self.text, 4)),
+                         (3, [hash_kmer("CATG"), hash_kmer("GCAT")]))
+
+    def test_frequent_words(self):
+        self.assertEqual(frequent_words(self.text, 4), {"CATG": 3, "GCAT": 3})
+        self.assertEqual(frequent_words(self.text, 3), {"ATG": 4})
+
+    def test_frequent_words_mismatch(self):
+        self.assertEqual(frequent_words_mismatch(self.text, 4, 1), {"ATGC": 5, "ATGT": 5, "GATG": 5})
+        self.assertEqual(frequent_words_mismatch(self.text, 4, 1, reverse=True), {"ACAT": 9, "ATGT": 9})
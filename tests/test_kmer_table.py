@@ -0,0 +1,57 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from frequent_words import frequency_kmer, frequent_words
+from kmer_table import KmerTable, load_or_count
+
+
+class TestKmerTable(TestCase):
+    text = "ACGTTGCATGTCGCATGATGCATGAGAGCT"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_count(self):
+        for k in (4, 12):
+            table = KmerTable.count(self.text, k)
+            self.assertEqual(table.sparse, k == 12)
+            self.assertEqual(table.frequent_words(), frequent_words(self.text, k))
+            self.assertEqual(table.frequencies(), frequency_kmer(self.text, k))
+        table = KmerTable.count(self.text, 4, canonical=True)
+        self.assertEqual(table["GCAT"], 4)  # GCAT 3 times, and its reverse complement ATGC once
+        self.assertEqual(table["ATGC"], 4)
+        self.assertEqual(table["NNNN"], 0)
+        self.assertEqual(table.top(2), [("ATGC", 4), ("CATG", 3)])
+
+    def test_save_open(self):
+        filename = os.path.join(self.directory.name, "text.kmers")
+        for k in (3, 11):
+            table = KmerTable.count(self.text, k)
+            table.save(filename)
+            with KmerTable.open(filename) as opened:
+                self.assertEqual((opened.k, opened.sparse, opened.checksum), (k, table.sparse, table.checksum))
+                self.assertEqual(len(opened), len(table))
+                self.assertEqual(list(opened.items()), list(table.items()))
+                self.assertEqual(opened[self.text[:k]], table[self.text[:k]])
+                self.assertEqual(opened.top(3), table.top(3))
+
+    def test_merge(self):
+        for k in (4, 12):
+            tables = [KmerTable.count(self.text[:20], k), KmerTable.count(self.text[10:], k)]
+            merged = KmerTable.merge(tables)
+            self.assertEqual(merged.frequencies(), tables[0].frequencies() + tables[1].frequencies())
+            self.assertEqual(merged.total, 40 - 2 * k + 2)
+        with self.assertRaises(ValueError):
+            KmerTable.merge([KmerTable.count(self.text, 4), KmerTable.count(self.text, 5)])
+
+    def test_load_or_count(self):
+        filename = os.path.join(self.directory.name, "text.kmers")
+        with load_or_count(filename, self.text, 5) as table:
+            self.assertEqual(table["CATGA"], 2)
+        with load_or_count(filename, self.text[:10], 5) as table:  # Another genome: counted again
+            self.assertEqual(table["CATGA"], 0)
+            self.assertEqual(table.total, 6)
@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+from hamming_distance import hamming_distance
+from kmer import all_kmers
 from median_string import median_string, median_strings
 
 
@@ -19,3 +21,18 @@ class TestMedianString(TestCase):
                'GCTTTGACAAAC',
                'AGTTTCGGAAAG']
         self.assertEqual(set(median_strings(3, dna)), {'TTT', 'AAA'})
+
+    def test_median_strings_brute_force(self):
+        """
+        The branch and bound search finds the same k-mers as trying all of them, in the same order
+        """
+        dna = ['TGATGATAACGTGACGGGACTCAGCGGCGATGAAGGATGAGT',
+               'CAGCGACAGACAATTTCAATAATATCCGCGGTAAGCGGCGTA',
+               'TGCAGAGGTTGGTAACGCCGGCGACTCGGAGAGCTTTTCGCT',
+               'TTTGTCATGAACTCAGATACCATAGAGCACCACGCGAGACTC']
+        distances = {pattern: hamming_distance(pattern, dna) for pattern in all_kmers(5)}
+        minimum = min(distances.values())
+        self.assertEqual(median_strings(5, dna), [pattern for pattern, d in distances.items() if d == minimum])
+        self.assertEqual(median_string(5, dna), median_strings(5, dna)[0])
+        self.assertEqual(median_string(0, dna), '')
+        self.assertEqual(median_strings(0, dna), [''])
@@ -1,7 +1,9 @@
 from unittest import TestCase
 
 from motifs import profile, probability_from_profile, most_probable_kmer_from_profile, greedy_motifs_search, motifs, \
-    randomized_motifs_search, consensus, score, biased_random, profile_random_kmer, gibbs_motifs_search
+    randomized_motifs_search, consensus, score, biased_random, profile_random_kmer, gibbs_motifs_search, \
+    motifs_enumeration, _motifs_enumeration_stupid
+from neighbors import neighbors
 
 
 class TestMotifs(TestCase):
@@ -80,6 +82,19 @@ class TestMotifs(TestCase):
         sequence = "ACCTGTTTATTGCCTAAGTTCCGAACAAACCCAATATAGCCCGAGGGCCT"
         self.assertEqual(most_probable_kmer_from_profile(sequence, k, profile_matrix), "CCGAG")
 
+    def test_motifs_enumeration(self):
+        sequences = ['ATTTGGC', 'TGCCTTA', 'CGGTATC', 'GAAAATT']
+        self.assertEqual(motifs_enumeration(sequences, 3, 1), {'ATA', 'ATT', 'GTT', 'TTT'})
+        self.assertEqual(motifs_enumeration(sequences, 3, 0), set())
+        self.assertEqual(motifs_enumeration(['ACGT', 'ACGA'], 15, 1), set())
+        # Long k-mers use sets instead of bitsets, and other characters than nucleotides the original algorithm
+        self.assertEqual(motifs_enumeration(['AAAAAAAAAAAAAAAC', 'GAAAAAAAAAAAAAAA'], 15, 1),
+                         neighbors('AAAAAAAAAAAAAAA', 1) | {'GAAAAAAAAAAAAAC'})
+        self.assertEqual(motifs_enumeration(['ANTT', 'ATT'], 2, 0), {'TT'})
+        # Few k-mers for 4^k possible ones: sets are used even for a short k
+        sequences = ['GATTACAGATTACAGATTA', 'GATTACAGTTTACAGATTC']
+        self.assertEqual(motifs_enumeration(sequences, 13, 1), _motifs_enumeration_stupid(sequences, 13, 1))
+
     def test_greedy_motif_search_no_cromwell(self):
         sequences = [
             'GGCGTTCAGGCA',
@@ -91,6 +106,7 @@ class TestMotifs(TestCase):
         k = 3
         motifs = greedy_motifs_search(sequences, k, False)
         self.assertEqual(motifs, ['CAG', 'CAG', 'CAA', 'CAA', 'CAA'])
+        self.assertEqual(greedy_motifs_search(sequences, k, False, early_stop=True), motifs)
 
     def test_greedy_motif_search_cromwell(self):
         sequences = """CCGTGGGGGGTATGTTCCCATTTCAAATGCAGACTAGCCGCGATACCCATCCTGTAACCATGGCTGCAACGTCCCTATCGTGCGGTTTGAATAGGAGAGTGCTATCTAATCGGGGAATGTTGGTTTTATGGTGTGCAACCGCACATTTGAAACCGT
@@ -243,3 +259,14 @@ TCATATTAATTGACCTCAACCACATCTCTTTAAGACGATTACCATAGCGGTCAAGTCAACGACGAGATTCCCCGGCGTCA
         motifs = gibbs_motifs_search(sequences, k=8, n=1000, N=100, score=score)
         print('\n'.join(motifs))
         self.assertLessEqual(score(motifs), 9)
+
+    def test_log_space(self):
+        """
+        The probability of a 1000-mer underflows to 0, but not its log-probability
+        """
+        motif = ('ACGTTGCA' * 125)
+        profile = [[0.4 if n == c else 0.2 for n in 'ACGT'] for c in motif]
+        sequence = 'T' * 300 + motif + 'G' * 300
+        self.assertEqual(probability_from_profile(motif, profile), 0)
+        self.assertEqual(most_probable_kmer_from_profile(sequence, 1000, profile, log_space=True), motif)
+        self.assertEqual(profile_random_kmer(profile, sequence, log_space=True), motif)
@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from hash_kmer import hash_kmer
+from neighbors import neighbors, iter_neighbors, neighbor_hashes
+
+
+class TestNeighbors(TestCase):
+    def test_neighbors(self):
+        self.assertEqual(neighbors("ACG", 1), {'ACG', 'CCG', 'GCG', 'TCG', 'AAG', 'AGG', 'ATG', 'ACA', 'ACC', 'ACT'})
+        self.assertEqual(len(neighbors("ACGT", 2)), 1 + 4 * 3 + 6 * 9)
+        self.assertEqual(len(neighbors("AC", 5)), 16)
+
+    def test_iter_neighbors(self):
+        """
+        Each neighbor is generated exactly once, the k-mer first
+        """
+        generated = list(iter_neighbors("GATTACA", 2))
+        self.assertEqual(generated[0], "GATTACA")
+        self.assertEqual(len(generated), len(set(generated)))
+        self.assertEqual(set(generated), neighbors("GATTACA", 2))
+        self.assertEqual(set(iter_neighbors("GATTACA", 2, hashes=True)), {hash_kmer(kmer) for kmer in generated})
+
+    def test_neighbor_hashes(self):
+        self.assertEqual(sorted(neighbor_hashes(hash_kmer("A"), 1, 1)), [0, 1, 2, 3])
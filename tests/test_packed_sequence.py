@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from frequent_words import frequency_kmer
+from hash_kmer import hash_kmer
+from kmer import kmers
+from packed_sequence import PackedSequence
+
+
+class TestPackedSequence(TestCase):
+    sequence = "ATTGCTCAGGCATTAGCA"
+
+    def test_unpack(self):
+        """
+        Packing then unpacking a sequence should give the same sequence
+        """
+        packed = PackedSequence.from_string(self.sequence)
+        self.assertEqual(len(packed), len(self.sequence))
+        self.assertEqual(str(packed), self.sequence)
+        self.assertEqual(''.join(packed), self.sequence)
+        self.assertEqual(packed[4], 'C')
+        self.assertEqual(packed[-1], 'A')
+
+    def test_slice(self):
+        """
+        Slicing a packed sequence should behave like slicing a string
+        """
+        packed = PackedSequence.from_string(self.sequence)
+        self.assertEqual(str(packed[3:13]), self.sequence[3:13])
+        self.assertEqual(str(packed[3:13][2:5]), self.sequence[3:13][2:5])
+        self.assertEqual(packed[5:], self.sequence[5:])
+
+    def test_kmer_codes(self):
+        packed = PackedSequence.from_string(self.sequence)[1:]
+        self.assertEqual(list(packed.kmer_codes(4)), [hash_kmer(kmer) for kmer in kmers(self.sequence[1:], 4)])
+
+    def test_kmers(self):
+        """
+        The k-mers of a packed sequence should be the same as the ones of the string
+        """
+        packed = PackedSequence.from_string(self.sequence)
+        self.assertEqual(list(kmers(packed, 3)), list(kmers(self.sequence, 3)))
+        self.assertEqual(frequency_kmer(packed, 3), frequency_kmer(self.sequence, 3))
+
+    def test_invalid_nucleotide(self):
+        with self.assertRaises(ValueError):
+            PackedSequence.from_string("ACGN")
@@ -0,0 +1,44 @@
+import random
+from unittest import TestCase
+
+import parallel
+from median_string import median_string, median_strings
+from motifs import score
+
+
+class TestParallel(TestCase):
+    sequences = ['CGCCCCTCTCGGGGGTGTTCAGTAACCGGCCA',
+                 'GGGCGAGGTATGTGTAAGTGCCAAGGTGCCAG',
+                 'TAGTACCGAGACCGAAAGAAGTATACAGGCGT',
+                 'TAGATCAAGTTTCAGGTGCACGTCGGTGAACC',
+                 'AATCCACCAGCTCCACGTGCAATGTTGGCCTA']
+
+    def test_median_string(self):
+        """
+        Splitting the search between processes gives the same result as the sequential search
+        """
+        self.assertEqual(parallel.median_string(5, self.sequences, workers=2), median_string(5, self.sequences))
+        self.assertEqual(parallel.median_strings(4, self.sequences, workers=2), median_strings(4, self.sequences))
+        self.assertEqual(parallel.median_string(0, self.sequences, workers=2), '')
+
+    def test_gibbs_motifs_search(self):
+        """
+        The result only depends on the seed, not on the number of processes
+        """
+        sequential = parallel.gibbs_motifs_search(self.sequences, 8, 100, N=8, score=score, workers=1, seed=42)
+        self.assertEqual(parallel.gibbs_motifs_search(self.sequences, 8, 100, N=8, score=score, workers=2, seed=42),
+                         sequential)
+
+    def test_randomized_motifs_search(self):
+        self.assertEqual(parallel.randomized_motifs_search(self.sequences, 8, 20, workers=2, seed=42),
+                         parallel.randomized_motifs_search(self.sequences, 8, 20, workers=1, seed=42))
+
+    def test_random_state(self):
+        """
+        Running the searches in this process does not change the random state of the caller
+        """
+        random.seed(7)
+        expected = random.random()
+        random.seed(7)
+        parallel.randomized_motifs_search(self.sequences, 8, 5, workers=1, seed=42)
+        self.assertEqual(random.random(), expected)
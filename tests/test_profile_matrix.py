@@ -0,0 +1,81 @@
+from math import inf, log
+from unittest import TestCase
+
+from hash_kmer import encode_nucleotides
+from motifs import most_probable_kmer_from_profile, probability_from_profile, motifs_entropy, profile, score
+from profile_matrix import CountMatrix, code_probabilities, count_matrix, log_profile, log_weights_to_weights, \
+    most_probable_window, profile_from_counts, window_chunks, window_log_probabilities, window_probabilities
+
+
+class TestProfileMatrix(TestCase):
+    def test_count_matrix(self):
+        self.assertEqual(count_matrix(['ATGCT', 'AAGCC']),
+                         [[2, 0, 0, 0], [1, 0, 0, 1], [0, 0, 2, 0], [0, 2, 0, 0], [0, 1, 0, 1]])
+
+    def test_profile_from_counts(self):
+        counts = count_matrix(['ACCT', 'ATGT', 'ACGG', 'ACGA'])
+        self.assertEqual(profile_from_counts(counts, 4, cromwell=True)[0], [0.625, 0.125, 0.125, 0.125])
+        self.assertEqual(profile_from_counts(counts, 4)[3], [0.25, 0, 0.25, 0.5])
+
+    def test_window_probabilities(self):
+        """
+        The probabilities of all the k-mers at once are exactly the ones computed k-mer by k-mer
+        """
+        profile = [[0.2, 0.4, 0.3, 0.1], [0.2, 0.3, 0.3, 0.2], [0.3, 0.1, 0.5, 0.1]]
+        sequence = "ACCTGTTTATTGCCTAAG"
+        self.assertEqual(window_probabilities(sequence, profile),
+                         [probability_from_profile(sequence[i:i + 3], profile) for i in range(len(sequence) - 2)])
+        self.assertEqual(window_probabilities("AC", profile), [])
+
+    def test_incremental_count_matrix(self):
+        """
+        Replacing a motif updates the counts and the scores exactly as computing them from scratch
+        """
+        motifs = ['TCGGGGGTTTTT', 'CCGGTGACTTAC', 'ACGGGGATTTTC', 'TTGGGGACTTTT', 'AAGGGGACTTCC']
+        counts = CountMatrix.from_codes([encode_nucleotides(motif) for motif in motifs], 12)
+        self.assertEqual(counts.entropy(), motifs_entropy(motifs))
+        self.assertEqual(counts.profile_without(encode_nucleotides(motifs[1]), cromwell=True),
+                         profile(motifs[:1] + motifs[2:], cromwell=True))
+        counts.replace(encode_nucleotides(motifs[1]), encode_nucleotides('TCGGGGATTCAT'))
+        motifs[1] = 'TCGGGGATTCAT'
+        self.assertEqual(counts.counts, count_matrix(motifs))
+        self.assertEqual(counts.entropy(), motifs_entropy(motifs))
+        self.assertEqual(counts.score(), score(motifs))
+
+    def test_most_probable_window(self):
+        """
+        Scoring the windows by chunks finds the same k-mer as scoring them column by column, even with ties
+        """
+        profile = [[0.2, 0.4, 0.3, 0.1], [0.2, 0.3, 0.3, 0.2], [0.3, 0.1, 0.5, 0.1]] * 3
+        for sequence in ("ACCTGTTTATTGCCTAAGCCGAC", "CCACCACCACCACCAC", "ACGTACGTACNACGTACGT"):
+            codes = encode_nucleotides(sequence, strict=False)
+            probabilities = code_probabilities(codes, profile)
+            expected = probabilities.index(max(probabilities))
+            for log_space in (False, True):
+                self.assertEqual(most_probable_window(codes, profile, log_space, window_chunks(codes)), expected)
+        self.assertIsNone(window_chunks(encode_nucleotides("ACGTN", strict=False)))
+        self.assertIsNone(most_probable_window(encode_nucleotides("ACG"), profile))
+
+    def test_log_space_ties(self):
+        """
+        AAA and CCC are equally probable, but their log-probabilities are rounded differently: the first one is chosen
+        """
+        profile = [[0.2, 0.15, 0.01, 0.64], [0.15, 0.1, 0.01, 0.74], [0.1, 0.2, 0.01, 0.69]]
+        codes = encode_nucleotides("AAAGGGCCC")
+        self.assertEqual(most_probable_window(codes, profile, log_space=True), 0)
+        self.assertEqual(most_probable_kmer_from_profile("AAAGGGCCC", 3, profile, log_space=True), "AAA")
+
+    def test_entropy_bound(self):
+        motifs = ['TCGGGGGTTTTT', 'CCGGTGACTTAC', 'ACGGGGATTTTC', 'TTGGGGACTTTT', 'AAGGGGACTTCC']
+        counts = CountMatrix.from_codes([encode_nucleotides(motif) for motif in motifs[:2]], 12)
+        self.assertLessEqual(counts.entropy_bound(5), motifs_entropy(motifs))
+        self.assertEqual(counts.entropy_bound(5), motifs_entropy(motifs[:2] + ['TCGGGGGTTTTT'] * 3))
+
+    def test_window_log_probabilities(self):
+        profile = [[0.2, 0.4, 0.3, 0.1], [0.2, 0.3, 0.3, 0.2], [0.3, 0.1, 0.5, 0]]
+        sequence = "ACCTGTTTATTGCCTAAG"
+        expected = [log(p) if p else -inf for p in window_probabilities(sequence, profile)]
+        for log_probability, expected_log_probability in zip(window_log_probabilities(sequence, log_profile(profile)),
+                                                             expected):
+            self.assertAlmostEqual(log_probability, expected_log_probability)
+        self.assertEqual(log_weights_to_weights([log(0.5), log(0.25), -inf]), [1.0, 0.5, 0.0])
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+from find_clumps import find_clumps
+from packed_sequence import PackedSequence
+from result_cache import ResultCache, cached
+
+
+def _put_and_get(directory, value):
+    """
+    Write a result in a cache and read it back (in a worker process)
+    """
+    cache = ResultCache(directory, max_bytes=1 << 20)
+    cache.put(cache.key(find_clumps, (value, 3, 10, 2)), value)
+    return cache.get(cache.key(find_clumps, (value, 3, 10, 2)))[1]
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key(self):
+        """
+        Equal arguments give the same key, however they are passed
+        """
+        key = self.cache.key(find_clumps, ("ACGTACGT", 3, 5, 2))
+        self.assertEqual(self.cache.key(find_clumps, ("ACGTACGT",), {'L': 3, 't': 5, 'k': 2}), key)
+        self.assertEqual(self.cache.key(find_clumps, (PackedSequence.from_string("ACGTACGT"), 3, 5, 2)), key)
+        self.assertNotEqual(self.cache.key(find_clumps, ("ACGTACGA", 3, 5, 2)), key)
+        self.assertNotEqual(self.cache.key(find_clumps, ("ACGTACGT", 3, 5, 2), version=1), key)
+
+    def test_key_functions(self):
+        """
+        Functions are known by their name, so lambdas and local functions are refused
+        """
+        self.assertNotEqual(self.cache.key(_put_and_get, ("a", len)), self.cache.key(_put_and_get, ("a", sorted)))
+        with self.assertRaises(ValueError):
+            self.cache.key(_put_and_get, ("a", lambda m: m + 1))
+
+        def local(m):
+            return m * 100
+
+        with self.assertRaises(ValueError):
+            self.cache.key(_put_and_get, ("a", local))
+
+    def test_cached(self):
+        calls = []
+
+        @cached(self.cache)
+        def frequent(text, k):
+            calls.append(text)
+            return {text[:k]: {1, 2}}
+
+        self.assertEqual(frequent("ACGT", 2), {"AC": {1, 2}})
+        self.assertEqual(frequent("ACGT", k=2), {"AC": {1, 2}})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        frequent("ACGA", 2)
+        self.assertEqual(len(calls), 2)
+
+    def test_eviction(self):
+        """
+        The least recently used results are removed first
+        """
+        cache = ResultCache(self.directory.name, max_bytes=2500)
+        for name in ("a", "b", "c"):
+            cache.put(name, "A" * 1000)
+            time.sleep(0.01)
+        self.assertEqual(cache.get("a"), (False, None))  # Evicted when c was written
+        self.assertTrue(cache.get("b")[0])
+        time.sleep(0.01)
+        cache.put("d", "A" * 1000)
+        self.assertEqual([cache.get(name)[0] for name in "bcd"], [True, False, True])
+        self.assertLessEqual(cache.size(), 2500)
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+
+    def test_processes(self):
+        values = ["ACGT" * n for n in range(1, 9)]
+        with ProcessPoolExecutor(4) as executor:
+            results = list(executor.map(_put_and_get, [self.directory.name] * len(values), values))
+        self.assertEqual(results, values)
+        self.assertFalse([name for name in os.listdir(self.directory.name) if name.startswith('.tmp')])
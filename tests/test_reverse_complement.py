@@ -0,0 +1,40 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from hash_kmer import hash_kmer
+from kmer import kmers
+from packed_sequence import PackedSequence
+from reverse_complement import reverse_complement, reverse_complement_bytes, reverse_complement_hash, \
+    write_reverse_complement
+
+
+class TestReverseComplement(TestCase):
+    def test_reverse_complement(self):
+        self.assertEqual(reverse_complement("GCTAGCTT"), "AAGCTAGC")
+        self.assertEqual(reverse_complement(""), "")
+        self.assertEqual(reverse_complement(PackedSequence.from_string("AACG")), "CGTT")
+
+    def test_iupac_and_soft_masking(self):
+        self.assertEqual(reverse_complement("ACGTacgtNRYKMBDHVSWn-"), "-nWSBDHVKMRYNacgtACGT")
+        self.assertEqual(reverse_complement_bytes(b"AAcgN"), b"NcgTT")
+        self.assertEqual(reverse_complement(bytearray(b"GATTACA")), b"TGTAATC")
+
+    def test_reverse_complement_hash(self):
+        text = "ACGTTGCATGTCGCATGATGCATGAGAGCTTAGACCGATTACA"
+        for k in (1, 3, 4, 5, 8, 13, 32, 33):
+            for kmer in kmers(text, k):
+                self.assertEqual(reverse_complement_hash(hash_kmer(kmer), k), hash_kmer(reverse_complement(kmer)))
+
+    def test_write_reverse_complement(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "sequences.fa")
+            with open(filename, 'w') as file:
+                file.write(">seq1\nACGTACGTAC\nGTTCCATG\n>seq2\nTTGCA\nTTG\n")
+            output = os.path.join(directory, "reverse.txt")
+            write_reverse_complement(filename, output, chunk_size=3)
+            with open(output) as file:
+                self.assertEqual(file.read(), "CATGGAACGTACGTACGT")
+            write_reverse_complement(filename, output, record='seq2')
+            with open(output) as file:
+                self.assertEqual(file.read(), "CAATGCAA")
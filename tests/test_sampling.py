@@ -0,0 +1,43 @@
+import random
+from unittest import TestCase
+
+from sampling import DistributionCache, alias_sample, alias_table, cumulative_sample
+
+
+class TestSampling(TestCase):
+    weights = (0.5, 0, 2, 1.5)
+
+    def frequencies(self, sample, n=20000):
+        picks = [sample() for _ in range(n)]
+        return [picks.count(i) / n for i in range(len(self.weights))]
+
+    def test_cumulative_sample(self):
+        random.seed(0)
+        frequencies = self.frequencies(lambda: cumulative_sample(self.weights))
+        for frequency, expected in zip(frequencies, (0.125, 0, 0.5, 0.375)):
+            self.assertAlmostEqual(frequency, expected, delta=0.02)
+
+    def test_alias_sample(self):
+        random.seed(0)
+        table = alias_table(self.weights)
+        for frequency, expected in zip(self.frequencies(lambda: alias_sample(table)), (0.125, 0, 0.5, 0.375)):
+            self.assertAlmostEqual(frequency, expected, delta=0.02)
+
+    def test_cache(self):
+        """
+        A distribution gets a table the second time it is sampled, and the least recently used tables are evicted
+        """
+        cache = DistributionCache(max_entries=2)
+        for weights in [(1, 2), (1, 2), (1, 2), (3, 4), (3, 4), (5, 6), (5, 6), (5, 6)]:
+            cache.sample(weights)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 6)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_cache_size(self):
+        cache = DistributionCache(max_bytes=1000)
+        for _ in range(2):
+            cache.sample(tuple(range(1, 1000)))  # Too big to be kept
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['bytes'], 0)
@@ -0,0 +1,77 @@
+import gzip
+import os
+import tempfile
+from unittest import TestCase
+
+from count_hamming import count_hamming
+from find_clumps import find_clumps
+from frequent_words import frequency_kmer, frequent_words, frequent_words_mismatch
+from kmer import kmers
+from sequence_io import read_records, read_sequence, read_chunks, MappedSequence
+
+
+class TestSequenceIO(TestCase):
+    fasta = ">seq1 first sequence\nACGTACGTAC\nGTACGTAC\n>seq2\nTTGCA\nTTG\nCA\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content, compress=False):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(gzip.compress(content.encode()) if compress else content.encode())
+        return path
+
+    def test_read_fasta(self):
+        """
+        Lines of the same length are read without an index, lines of different lengths with an index
+        """
+        records = list(read_records(self.write("seqs.fa", self.fasta)))
+        self.assertEqual([name for name, sequence in records], ['seq1', 'seq2'])
+        self.assertTrue(all(isinstance(sequence, MappedSequence) for name, sequence in records))
+        self.assertEqual(str(records[0][1]), "ACGTACGTACGTACGTAC")
+        self.assertEqual(str(records[1][1]), "TTGCATTGCA")
+        self.assertEqual(records[0][1][8:12], "ACGT")
+        self.assertEqual(records[1][1][4:7], "ATT")
+        for item in (slice(None, None, -1), slice(5, 1, -1), slice(1, None, 3), slice(9, 2, -2), slice(2, 5, -1)):
+            self.assertEqual(records[1][1][item], "TTGCATTGCA"[item])
+        self.assertEqual(list(kmers(records[1][1], 8)), list(kmers("TTGCATTGCA", 8)))
+
+    def test_read_gzip(self):
+        path = self.write("seqs.fa.gz", self.fasta, compress=True)
+        self.assertEqual(list(read_records(path)), [('seq1', "ACGTACGTACGTACGTAC"), ('seq2', "TTGCATTGCA")])
+
+    def test_read_plain_text(self):
+        self.assertEqual(str(read_sequence(self.write("genome.txt", "ACGTTGCA\n"))), "ACGTTGCA")
+        for compress in (False, True):
+            records = read_records(self.write("blank.fa", "\n\n" + self.fasta, compress))
+            self.assertEqual([(name, str(sequence)) for name, sequence in records][0], ('seq1', "ACGTACGTACGTACGTAC"))
+        self.assertEqual(str(read_sequence(self.write("blank.txt", "\nACGTTGCA\n"))), "ACGTTGCA")
+
+    def test_read_fastq(self):
+        path = self.write("reads.fq", "@read1\nACGT\n+\nIIII\n@read2\nGGCA\n+\nIIII\n")
+        self.assertEqual(read_sequence(path, 'read2'), "GGCA")
+
+    def test_read_chunks(self):
+        """
+        With an overlap of k-1, every k-mer is in exactly one chunk
+        """
+        path = self.write("seqs.fa", self.fasta)
+        self.assertEqual(list(read_chunks(path, size=7, overlap=2)), ["ACGTACG", "CGTACGTAC", "ACGTAC"])
+        self.assertEqual(list(read_chunks(path, size=7, record='seq2')), ["TTGCATT", "GCA"])
+
+    def test_kmer_functions(self):
+        """
+        The k-mer functions accept a sequence read from a file, with or without other characters than A, C, G and T
+        """
+        for text in ("ACGTTGCATGTCGCATGATGCATGAGAGCT", "ACGTTGCATGTCGCANGATGCATGAGAGCT"):
+            sequence = read_sequence(self.write("genome.fa", ">genome\n" + text[:12] + "\n" + text[12:24] + "\n" +
+                                                text[24:] + "\n"))
+            self.assertEqual(frequency_kmer(sequence, 4), frequency_kmer(text, 4))
+            self.assertEqual(frequent_words(sequence, 4), frequent_words(text, 4))
+            self.assertEqual(frequent_words_mismatch(sequence, 4, 1), frequent_words_mismatch(text, 4, 1))
+            self.assertEqual(count_hamming(sequence, "GCAT", 1), count_hamming(text, "GCAT", 1))
+            self.assertEqual(find_clumps(sequence, 10, 2, 3), find_clumps(text, 10, 2, 3))
@@ -0,0 +1,92 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+from hash_kmer import hash_kmer
+from sketch import Sketch, closest, minimizers, mix_hash
+
+
+class TestSketch(TestCase):
+    genome = ''.join(random.Random(23).choices("ACGT", k=5000))
+
+    def test_minimizers(self):
+        """
+        Each window of w k-mers (without N) has its leftmost smallest k-mer among the minimizers, generated once for
+        the consecutive windows sharing it
+        """
+        k, w = 7, 5
+        sequences = [self.genome[:1000] + "NN" + self.genome[1000:2000].lower(), "A" * 40, "CA" * 20,
+                     "CA" * 10 + "N" + "CA" * 10]
+        for sequence in sequences:
+            expected = []
+            sequence = sequence.upper()
+            for start in range(len(sequence) - w - k + 2):
+                window = [sequence[i:i + k] for i in range(start, start + w)]
+                if any('N' in kmer for kmer in window):
+                    continue
+                hashes = [mix_hash(hash_kmer(kmer)) for kmer in window]
+                minimizer = (start + hashes.index(min(hashes)), min(hashes))
+                if not expected or expected[-1] != minimizer:
+                    expected.append(minimizer)
+            self.assertEqual(list(minimizers(sequence, k, w, canonical=False)), expected)
+
+    def test_chunks(self):
+        """
+        Reading the sequence in small chunks gives the same minimizers, even when a chunk holds less than a window
+        """
+        sequences = ["GTCNCATCATCATTTTAACGTTTCACCAGAACC", self.genome[:300] + "N" + self.genome[300:600]]
+        for sequence in sequences:
+            expected = list(minimizers(sequence, 8, 5))
+            sketch = Sketch.from_sequence(sequence, 8, w=5)
+            for chunk_size in (7, 10, 64):
+                self.assertEqual(list(minimizers(sequence, 8, 5, chunk_size=chunk_size)), expected)
+                chunked = Sketch(8, w=5)
+                chunked.add(sequence, chunk_size)
+                self.assertEqual((chunked.hashes, chunked.minimizers), (sketch.hashes, sketch.minimizers))
+
+    def test_sketch(self):
+        """
+        The MinHash sketch keeps the smallest hashes of the distinct k-mers
+        """
+        sketch = Sketch.from_sequence(self.genome, 11, size=100, canonical=False)
+        expected = sorted({mix_hash(hash_kmer(self.genome[i:i + 11])) for i in range(len(self.genome) - 10)})[:100]
+        self.assertEqual(list(sketch.hashes), expected)
+        self.assertEqual(sketch.length, len(self.genome) - 10)
+
+    def test_similarity(self):
+        whole = Sketch.from_sequence(self.genome, 15, size=500, w=8)
+        part = Sketch.from_sequence(self.genome[1000:4000], 15, size=500, w=8)
+        other = Sketch.from_sequence(''.join(random.Random(24).choices("ACGT", k=5000)), 15, size=500, w=8)
+        self.assertEqual(part.containment(whole), 1.0)
+        self.assertEqual(part.containment(whole, minimizers=True), 1.0)
+        self.assertAlmostEqual(whole.jaccard(part), 0.6, delta=0.1)
+        self.assertAlmostEqual(whole.jaccard(part, minimizers=True), 0.6, delta=0.05)
+        self.assertEqual(whole.jaccard(other), 0.0)
+        self.assertEqual(whole.distance(other), 1.0)
+        self.assertEqual(closest(whole, {'part': part, 'other': other}, n=1)[0][1], 'part')
+        with self.assertRaises(ValueError):
+            whole.jaccard(Sketch(15, canonical=False))
+
+    def test_containment(self):
+        """
+        A sketch that is not full holds all the hashes of its genome, even the ones above the largest hash of the other
+        sketch
+        """
+        longer = Sketch.from_sequence(self.genome[:30], 15, size=100)  # 16 k-mers, 6 of them in shorter
+        shorter = Sketch.from_sequence(self.genome[:20], 15, size=100)
+        self.assertEqual(longer.containment(shorter), 6 / 16)
+        self.assertEqual(shorter.containment(longer), 1.0)
+        whole = Sketch.from_sequence(self.genome, 15, size=100)
+        self.assertEqual(Sketch.from_sequence(self.genome[2000:2020], 15, size=100).containment(whole), 0.0)
+
+    def test_save_load(self):
+        sketch = Sketch.from_sequence(self.genome, 21, size=200, w=10, seed=7)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "genome.sketch")
+            sketch.save(filename)
+            loaded = Sketch.load(filename)
+        self.assertEqual(loaded.hashes, sketch.hashes)
+        self.assertEqual(loaded.minimizers, sketch.minimizers)
+        self.assertEqual((loaded.k, loaded.w, loaded.seed, loaded.length), (21, 10, 7, sketch.length))
+        self.assertEqual(loaded.jaccard(sketch), 1.0)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from sequence_io import read_sequence
+from skew import skew_values, skew_array, skew_extrema, find_minimum_skew
+
+
+class TestSkew(TestCase):
+    def test_skew_values(self):
+        self.assertEqual(skew_values("CATGGGCATCGGCCATACGCC"),
+                         [0, -1, -1, -1, 0, 1, 2, 1, 1, 1, 0, 1, 2, 1, 0, 0, 0, 0, -1, 0, -1, -2])
+        self.assertEqual(list(skew_array("CATGGGCATCGGCCATACGCC")), skew_values("CATGGGCATCGGCCATACGCC"))
+
+    def test_find_minimum_skew(self):
+        genome = "TAAAGACTGCCGAGAGGCCAACACGAGTGCTAGAACGAGGGGCGTAAACGCGGGTCCGAT"
+        self.assertEqual(find_minimum_skew(genome), [11, 24])
+        self.assertEqual(find_minimum_skew([genome[:30], genome[30:]]), [11, 24])
+
+    def test_find_minimum_skew_mapped(self):
+        """
+        A sequence read from a file is sliced in chunks, not iterated over nucleotide by nucleotide
+        """
+        genome = "TAAAGACTGCCGAGAGGCCAACACGAGTGCTAGAACGAGGGGCGTAAACGCGGGTCCGAT"
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "genome.fa")
+            with open(filename, 'w') as file:
+                file.write(">genome\n" + genome[:25] + "\n" + genome[25:50] + "\n" + genome[50:] + "\n")
+            self.assertEqual(find_minimum_skew(read_sequence(filename)), [11, 24])
+
+    def test_skew_extrema_chunks(self):
+        """
+        Computing the skew chunk by chunk should give the same result as on the whole genome
+        """
+        genome = "TAAAGACTGCCGAGAGGCCAACACGAGTGCTAGAACGAGGGGCGTAAACGCGGGTCCGAT"
+        chunks = [genome[i:i + 7] for i in range(0, len(genome), 7)]
+        values = skew_values(genome)
+        self.assertEqual(skew_extrema(chunks), (
+            (min(values), [i for i, value in enumerate(values) if value == min(values)]),
+            (max(values), [i for i, value in enumerate(values) if value == max(values)])
+        ))